@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# 画面/API の応答と CSS/JS だけを圧縮する。画像やプロファイル(.prof)などは対象外
+COMPRESSIBLE_TYPES = (
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/csv",
+    "text/calendar",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+)
+
+
+def _is_compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+    return content_type in COMPRESSIBLE_TYPES
+
+
+class GzipMiddleware:
+    """Accept-Encoding: gzip の要求に対し、HTML/JSON 等の応答を gzip で返す ASGI ミドルウェア。
+
+    Content-Length のある応答は本文を揃えてから、minimum_size バイト以上のときだけ圧縮する
+    （BaseHTTPMiddleware を通った応答は複数チャンクに分かれて届くため）。Content-Length のない
+    ストリーミング応答（一覧の STREAM_LISTS など）はチャンクごとに Z_SYNC_FLUSH し、圧縮器に
+    溜めずにすぐ送る。
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, level: int = 6):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or "gzip" not in Headers(scope=scope).get("accept-encoding", ""):
+            await self.app(scope, receive, send)
+            return
+        await _GzipResponder(self.minimum_size, self.level, send)(self.app, scope, receive)
+
+
+class _GzipResponder:
+    def __init__(self, minimum_size: int, level: int, send: Send):
+        self.minimum_size = minimum_size
+        self.send = send
+        self.start_message: Message | None = None
+        self.buffer: list[bytes] = []
+        self.mode = "pending"  # pending / passthrough / buffered / streaming
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    async def __call__(self, app: ASGIApp, scope: Scope, receive: Receive) -> None:
+        await app(scope, receive, self.send_with_gzip)
+
+    async def send_with_gzip(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            if not _is_compressible(headers):
+                self.mode = "passthrough"
+            elif "content-length" in headers:
+                self.mode = "buffered"
+            else:
+                self.mode = "streaming"
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.mode == "passthrough":
+            await self._send_start()
+            await self.send(message)
+        elif self.mode == "buffered":
+            self.buffer.append(body)
+            if more_body:
+                return
+            whole = b"".join(self.buffer)
+            if len(whole) < self.minimum_size:
+                await self._send_start()
+                await self.send({"type": "http.response.body", "body": whole})
+                return
+            compressed = self.compressor.compress(whole) + self.compressor.flush()
+            self._mark_encoded(content_length=len(compressed))
+            await self._send_start()
+            await self.send({"type": "http.response.body", "body": compressed})
+        else:
+            if self.start_message is not None:
+                self._mark_encoded(content_length=None)
+                await self._send_start()
+            chunk = self.compressor.compress(body)
+            chunk += self.compressor.flush(zlib.Z_SYNC_FLUSH if more_body else zlib.Z_FINISH)
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    def _mark_encoded(self, *, content_length: int | None) -> None:
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = "gzip"
+        headers.add_vary_header("Accept-Encoding")
+        if content_length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+
+    async def _send_start(self) -> None:
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            await self.send(start)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from fastapi import Request
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.fragments import fragment_error, wants_fragment
+from app.utils import add_flash, consume_flash
+
+
+logger = logging.getLogger("concurrency")
+
+CONFLICT_MESSAGE = "他のユーザーが先に更新しました。最新の内容を確認してから再度操作してください。"
+
+__all__ = ["StaleDataError", "VersionConflictError", "conflict_response", "ensure_version"]
+
+
+class VersionConflictError(Exception):
+    pass
+
+
+def _parse_version(value: str | None) -> int | None:
+    if value is None:
+        return None
+    text = value.strip()
+    if not text or not text.isdigit():
+        return None
+    return int(text)
+
+
+def ensure_version(entity: Any, submitted: str | None) -> None:
+    """フォームで受け取った version が現在の行と一致するか確認する。
+
+    未送信/空/数値でない version も不一致として扱う（version のない古いフォームで上書きさせない）。
+    """
+    expected = _parse_version(submitted)
+    if expected is None:
+        raise VersionConflictError(f"missing or malformed version={submitted!r} actual={entity.version}")
+    if expected != entity.version:
+        raise VersionConflictError(f"expected={expected} actual={entity.version}")
+
+
+def conflict_response(request: Request, *, entity: str, entity_id: int, back_url: str):
+    logger.warning(
+        "version conflict entity=%s id=%s path=%s actor=%s",
+        entity,
+        entity_id,
+        request.url.path,
+        request.session.get("user_id"),
+    )
+    if wants_fragment(request):
+        return fragment_error(request, CONFLICT_MESSAGE, status_code=409)
+    add_flash(request.session, "error", CONFLICT_MESSAGE)
+    return request.app.state.templates.TemplateResponse(
+        request,
+        "conflict.html",
+        {"flashes": consume_flash(request.session), "back_url": back_url},
+        status_code=409,
+    )
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from datetime import date
+from functools import lru_cache
+from typing import Any
+
+from fastapi import Request
+from fastapi.responses import Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models import PcAsset, PcPlan, PcRequest, PcStatusHistory
+from app.static_files import STATIC_DIR, file_version
+from app.utils import FLASH_KEY
+
+
+@lru_cache
+def render_version(templates_dir: str = "templates") -> str:
+    """テンプレートと静的ファイルの版。デプロイでこれらが変われば ETag も変わる（プロセス起動時に1回計算）。"""
+    parts: list[str] = []
+    for directory in (templates_dir, STATIC_DIR):
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                parts.append(f"{path}:{file_version(path)}")
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:12]
+
+
+def _plan_marker(entity_type: str, entity_id: Any):
+    """予定の追加/削除/更新で変わる値（件数・最大ID・最終更新日時）。"""
+    condition = (PcPlan.entity_type == entity_type) & (PcPlan.entity_id == entity_id)
+    return (
+        select(func.count(PcPlan.id)).where(condition).scalar_subquery(),
+        select(func.max(PcPlan.id)).where(condition).scalar_subquery(),
+        select(func.max(PcPlan.updated_at)).where(condition).scalar_subquery(),
+    )
+
+
+def _history_marker(entity_type: str, entity_id: Any):
+    """状態履歴は追記のみのため、最大IDだけで変化を判定できる。"""
+    return select(func.max(PcStatusHistory.id)).where(
+        (PcStatusHistory.entity_type == entity_type) & (PcStatusHistory.entity_id == entity_id)
+    ).scalar_subquery()
+
+
+def asset_revision(db: Session, asset_id: int) -> tuple | None:
+    """資産詳細の版（資産の updated_at/version と、その予定・履歴の変化）を1回の SELECT で取得する。"""
+    statement = select(
+        PcAsset.updated_at,
+        PcAsset.version,
+        *_plan_marker("ASSET", PcAsset.id),
+        _history_marker("ASSET", PcAsset.id),
+    ).where(PcAsset.id == asset_id)
+    row = db.execute(statement).first()
+    return tuple(row) if row else None
+
+
+def request_revision(db: Session, request_id: int) -> tuple | None:
+    """要求詳細の版。紐づく資産（資産番号/状態を表示する）の変化も含める。"""
+    statement = select(
+        PcRequest.updated_at,
+        PcRequest.version,
+        _history_marker("REQUEST", PcRequest.id),
+        PcAsset.id,
+        PcAsset.version,
+    ).outerjoin(PcRequest.asset).where(PcRequest.id == request_id)
+    row = db.execute(statement).first()
+    return tuple(row) if row else None
+
+
+def plan_revision(db: Session, plan_id: int) -> tuple | None:
+    row = db.execute(select(PcPlan.updated_at, PcPlan.version).where(PcPlan.id == plan_id)).first()
+    return tuple(row) if row else None
+
+
+def detail_etag(request: Request, revision: tuple | None) -> str | None:
+    """詳細画面の ETag。表示対象のほか、ログインユーザ・今日の日付・テンプレート版を含める。
+
+    Flash が残っている間は付けない（Flash 付きの画面をキャッシュさせると、後で 304 になったときに
+    古い Flash が再表示されるため）。
+    """
+    if revision is None or request.session.get(FLASH_KEY):
+        return None
+    parts = (
+        request.url.path,
+        request.url.query,
+        request.session.get("user_id") or "",
+        date.today().isoformat(),
+        render_version(),
+        *(value.isoformat() if hasattr(value, "isoformat") else value for value in revision),
+    )
+    digest = hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:20]
+    # gzip の有無で本文のバイト列は変わるため弱い ETag とする
+    return f'W/"{digest}"'
+
+
+def is_not_modified(request: Request, etag: str | None) -> bool:
+    if etag is None:
+        return False
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in tags)
+
+
+def not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+
+def with_etag(response: Response, etag: str | None) -> Response:
+    if etag is not None:
+        response.headers["ETag"] = etag
+    return response
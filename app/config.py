@@ -15,11 +15,62 @@ def _get_env(name: str, default: str | None = None) -> str | None:
     return value
 
 
+def _get_bool_env(name: str, default: bool) -> bool:
+    value = _get_env(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _get_float_env(name: str, default: float) -> float:
+    value = _get_env(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+def _get_int_env(name: str, default: int) -> int:
+    value = _get_env(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
 @dataclass(frozen=True)
 class Settings:
     database_url: str
     secret_key: str
     log_level: str
+    slow_query_ms: float
+    debug_headers: bool
+    profile_dir: str
+    profile_min_interval_sec: float
+    profile_keep: int
+    tracemalloc_frames: int
+    idempotency_ttl_sec: int
+    detail_page_size: int
+    template_mode: str
+    template_cache_dir: str
+    row_cache_size: int
+    list_row_limit: int
+    stream_lists: bool
+    gzip_min_size: int
+    gzip_level: int
+    static_max_age: int
+    session_backend: str
+    session_ttl_sec: int
+    report_cache_size: int
+    feed_past_days: int
+    feed_future_days: int
+    scheduler_enabled: bool
+    scheduler_interval_sec: int
+    scheduler_lease_sec: int
 
 
 @lru_cache
@@ -31,4 +82,28 @@ def get_settings() -> Settings:
         ),
         secret_key=_get_env("SECRET_KEY", "change-this-secret") or "change-this-secret",
         log_level=_get_env("LOG_LEVEL", "INFO") or "INFO",
+        slow_query_ms=_get_float_env("SLOW_QUERY_MS", 500.0),
+        debug_headers=_get_bool_env("DEBUG_HEADERS", False),
+        profile_dir=_get_env("PROFILE_DIR", "logs/profiles") or "logs/profiles",
+        profile_min_interval_sec=_get_float_env("PROFILE_MIN_INTERVAL_SEC", 60.0),
+        profile_keep=_get_int_env("PROFILE_KEEP", 20),
+        tracemalloc_frames=_get_int_env("TRACEMALLOC_FRAMES", 25),
+        idempotency_ttl_sec=_get_int_env("IDEMPOTENCY_TTL_SEC", 86400),
+        detail_page_size=max(1, _get_int_env("DETAIL_PAGE_SIZE", 20)),
+        template_mode=(_get_env("TEMPLATE_MODE", "development") or "development").strip().lower(),
+        template_cache_dir=_get_env("TEMPLATE_CACHE_DIR", ".cache/templates") or ".cache/templates",
+        row_cache_size=_get_int_env("ROW_CACHE_SIZE", 2000),
+        list_row_limit=max(1, _get_int_env("LIST_ROW_LIMIT", 200)),
+        stream_lists=_get_bool_env("STREAM_LISTS", False),
+        gzip_min_size=_get_int_env("GZIP_MIN_SIZE", 1024),
+        gzip_level=min(9, max(1, _get_int_env("GZIP_LEVEL", 6))),
+        static_max_age=_get_int_env("STATIC_MAX_AGE", 31536000),
+        session_backend=(_get_env("SESSION_BACKEND", "cookie") or "cookie").strip().lower(),
+        session_ttl_sec=max(60, _get_int_env("SESSION_TTL_SEC", 14 * 24 * 60 * 60)),
+        report_cache_size=_get_int_env("REPORT_CACHE_SIZE", 64),
+        feed_past_days=max(0, _get_int_env("FEED_PAST_DAYS", 30)),
+        feed_future_days=max(0, _get_int_env("FEED_FUTURE_DAYS", 180)),
+        scheduler_enabled=_get_bool_env("SCHEDULER_ENABLED", False),
+        scheduler_interval_sec=max(60, _get_int_env("SCHEDULER_INTERVAL_SEC", 86400)),
+        scheduler_lease_sec=max(30, _get_int_env("SCHEDULER_LEASE_SEC", 300)),
     )
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from app.idempotency import idempotency_token
+
+# キャッシュする断片には描画ごとの冪等キーを埋め込めないため、仮の文字列で描画して出力時に差し替える
+TOKEN_PLACEHOLDER = "__idempotency_token__"
+
+
+class FragmentCache:
+    """描画済みHTML断片の LRU キャッシュ（プロセス内）。maxsize が 0 以下なら無効。"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_render(self, key: Hashable, render: Callable[[], str]) -> str:
+        if self.maxsize <= 0:
+            return render()
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return html
+        html = render()
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return html
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def placeholder_token() -> str:
+    return TOKEN_PLACEHOLDER
+
+
+def fill_tokens(html: str) -> str:
+    """キャッシュから取り出した断片の仮キーを、フォームごとに新しい冪等キーへ置き換える。"""
+    if TOKEN_PLACEHOLDER not in html:
+        return html
+    parts = html.split(TOKEN_PLACEHOLDER)
+    return "".join(part + idempotency_token() for part in parts[:-1]) + parts[-1]
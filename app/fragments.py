@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import Request
+
+FRAGMENT_HEADER = "X-Fragment"
+
+
+def wants_fragment(request: Request) -> bool:
+    """一覧の行操作を fetch で送ったとき（X-Fragment: row）は行断片で応答する。"""
+    return request.headers.get(FRAGMENT_HEADER, "").strip().lower() == "row"
+
+
+def row_fragment(request: Request, template_name: str, context: dict[str, Any], *, status_code: int = 200):
+    response = request.app.state.templates.TemplateResponse(
+        request, template_name, context, status_code=status_code
+    )
+    response.headers[FRAGMENT_HEADER] = "row"
+    return response
+
+
+def fragment_error(request: Request, message: str, *, status_code: int):
+    """行を置き換えずに表示するエラー断片。フラッシュには積まない。"""
+    response = request.app.state.templates.TemplateResponse(
+        request, "_fragment_error.html", {"message": message}, status_code=status_code
+    )
+    response.headers[FRAGMENT_HEADER] = "error"
+    return response
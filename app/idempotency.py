@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import logging
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi import Request
+from fastapi.responses import PlainTextResponse, RedirectResponse, Response
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import IdempotencyKey
+from app.utils import add_flash
+
+
+logger = logging.getLogger("idempotency")
+settings = get_settings()
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+KEY_PATTERN = re.compile(r"^[A-Za-z0-9_-]{8,64}$")
+
+
+def _utcnow() -> datetime:
+    # DB には naive UTC で保存する（他テーブルの DateTime と同じ扱い）
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def idempotency_token() -> str:
+    """フォームの hidden 項目に埋め込む使い捨てキー。"""
+    return uuid.uuid4().hex
+
+
+def get_idempotency_key(request: Request, form_value: str | None = None) -> str | None:
+    value = request.headers.get(IDEMPOTENCY_HEADER) or form_value
+    if value is None:
+        return None
+    value = value.strip()
+    return value if KEY_PATTERN.match(value) else None
+
+
+def replay_response(
+    db: Session,
+    request: Request,
+    key: str | None,
+    *,
+    flash: bool = True,
+) -> Response | None:
+    """処理済みのキーなら最初の結果を返す。未処理なら None。
+
+    行断片で応答する呼び出し元は flash=False にして、次の画面表示に警告を残さない。
+    """
+    if key is None:
+        return None
+    row = db.query(IdempotencyKey).filter(IdempotencyKey.key == key).first()
+    if row is None:
+        return None
+    if row.expires_at <= _utcnow():
+        db.delete(row)
+        db.flush()
+        return None
+
+    actor = request.session.get("user_id") or "system"
+    if row.user_id != actor or row.path != request.url.path:
+        logger.warning("idempotency key reused key=%s path=%s actor=%s", key, request.url.path, actor)
+        return PlainTextResponse("Idempotency-Key が別の操作で使用されています。", status_code=422)
+
+    logger.info("idempotent replay key=%s path=%s actor=%s", key, request.url.path, actor)
+    if flash:
+        add_flash(request.session, "warning", "この操作は既に受け付け済みです。")
+    response = RedirectResponse(url=row.location or "/dashboard", status_code=row.status_code)
+    response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+
+def remember_outcome(
+    db: Session,
+    request: Request,
+    key: str | None,
+    *,
+    location: str,
+    status_code: int = 303,
+) -> None:
+    """書き込みと同じトランザクションで結果を記録する。コミットは呼び出し側で行う。"""
+    if key is None:
+        return
+    now = _utcnow()
+    db.query(IdempotencyKey).filter(IdempotencyKey.expires_at <= now).delete(synchronize_session=False)
+    db.add(
+        IdempotencyKey(
+            key=key,
+            user_id=request.session.get("user_id") or "system",
+            path=request.url.path,
+            status_code=status_code,
+            location=location,
+            created_at=now,
+            expires_at=now + timedelta(seconds=settings.idempotency_ttl_sec),
+        )
+    )
+
+
+def replay_after_failure(
+    db: Session,
+    request: Request,
+    key: str | None,
+    *,
+    flash: bool = True,
+) -> Response | None:
+    """コミット失敗をロールバックし、同じキーの並行リクエストが先に成功していればその結果を返す。"""
+    db.rollback()
+    return replay_response(db, request, key, flash=flash)
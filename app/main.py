@@ -1,54 +1,149 @@
 from __future__ import annotations
 
+import cProfile
 import logging
 import time
-from typing import Callable
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
 
 from fastapi import FastAPI, Request
 from fastapi.responses import PlainTextResponse, RedirectResponse
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.exc import SQLAlchemyError
-from starlette.middleware.sessions import SessionMiddleware
 
+from app.compression import GzipMiddleware
 from app.config import get_settings
+from app.db import SessionLocal
 from app.logging_config import setup_logging
+from app.profiling import (
+    acquire_profile_slot,
+    note_request_finished,
+    note_request_started,
+    profile_name,
+    profiling_context,
+    release_profile_slot,
+    save_profile,
+    wants_profile,
+)
+from app.query_stats import track_queries
+from app.routes import admin as admin_routes
 from app.routes import auth as auth_routes
 from app.routes import dashboard as dashboard_routes
+from app.routes import feeds as feeds_routes
 from app.routes import assets as assets_routes
 from app.routes import requests as requests_routes
 from app.routes import plans as plans_routes
-from app.utils import add_flash, format_jst
+from app.routes import reports as reports_routes
+from app.scheduler import Scheduler
+from app.sessions import CookieBackend, SessionMiddleware, create_session_backend
+from app.static_files import STATIC_DIR, VersionedStaticFiles
+from app.templating import create_templates
+from app.utils import add_flash
 
 setup_logging()
 logger = logging.getLogger("app")
 settings = get_settings()
 
-app = FastAPI()
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
-app.state.templates = Jinja2Templates(directory="templates")
-app.state.templates.env.filters["format_jst"] = format_jst
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # 各ワーカーで起動し、DB のリースを持つ1つだけが処理を実行する
+    scheduler = None
+    if settings.scheduler_enabled:
+        scheduler = Scheduler(
+            SessionLocal,
+            interval_sec=settings.scheduler_interval_sec,
+            lease_sec=settings.scheduler_lease_sec,
+        )
+        scheduler.start()
+    try:
+        yield
+    finally:
+        if scheduler is not None:
+            await scheduler.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+app.mount(
+    "/static",
+    VersionedStaticFiles(directory=STATIC_DIR, max_age=settings.static_max_age),
+    name="static",
+)
+app.state.templates = create_templates(settings)
 
 app.include_router(auth_routes.router)
 app.include_router(dashboard_routes.router)
 app.include_router(assets_routes.router)
 app.include_router(requests_routes.router)
 app.include_router(plans_routes.router)
+app.include_router(reports_routes.router)
+app.include_router(feeds_routes.router)
+app.include_router(admin_routes.router)
+
+
+@app.middleware("http")
+async def profiling_middleware(request: Request, call_next: Callable):
+    note_request_started()
+    try:
+        if not wants_profile(request) or not acquire_profile_slot():
+            return await call_next(request)
+        return await _profiled(request, call_next)
+    finally:
+        note_request_finished()
+
+
+async def _profiled(request: Request, call_next: Callable):
+    # ストリーミングの本文は call_next の後に送るため、本文の送信が終わるまで計測してから保存する
+    profiler = cProfile.Profile()
+    name = profile_name(request)
+
+    def finish() -> None:
+        profiler.disable()
+        overlapped = release_profile_slot()
+        save_profile(profiler, request, name, overlapped=overlapped)
+
+    profiler.enable()
+    try:
+        with profiling_context():
+            response = await call_next(request)
+    except BaseException:
+        finish()
+        raise
+    body = response.body_iterator
+
+    async def profiled_body() -> AsyncIterator[bytes]:
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            finish()
+
+    response.body_iterator = profiled_body()
+    response.headers["X-Profile-Id"] = name
+    return response
 
 
 @app.middleware("http")
 async def request_logging_middleware(request: Request, call_next: Callable):
     start = time.time()
-    response = await call_next(request)
+    with track_queries() as query_stats:
+        response = await call_next(request)
     latency = (time.time() - start) * 1000
     logger.info(
-        "request path=%s method=%s status=%s latency_ms=%.1f",
+        "request path=%s method=%s status=%s latency_ms=%.1f db_queries=%d db_ms=%.1f",
         request.url.path,
         request.method,
         response.status_code,
         latency,
+        query_stats.count,
+        query_stats.total_ms,
     )
+    if response.headers.get("content-type", "").startswith("text/html"):
+        # 画面はログインユーザごとの内容のため、共有キャッシュに載せず毎回再検証させる
+        response.headers.setdefault("Cache-Control", "private, no-cache")
+    if settings.debug_headers:
+        response.headers["X-DB-Queries"] = str(query_stats.count)
+        response.headers["X-DB-Time-Ms"] = f"{query_stats.total_ms:.1f}"
     return response
 
 
@@ -57,6 +152,9 @@ async def auth_guard_middleware(request: Request, call_next: Callable):
     path = request.url.path
     if path.startswith("/static") or path in {"/login", "/favicon.ico"}:
         return await call_next(request)
+    # カレンダーアプリはログインできないため、フィードは URL の署名で各ルートが検証する
+    if path.startswith("/feeds/"):
+        return await call_next(request)
 
     if request.session.get("user_id"):
         return await call_next(request)
@@ -65,7 +163,14 @@ async def auth_guard_middleware(request: Request, call_next: Callable):
     return RedirectResponse(url="/login", status_code=303)
 
 
-app.add_middleware(SessionMiddleware, secret_key=settings.secret_key)
+if settings.gzip_min_size > 0:
+    app.add_middleware(GzipMiddleware, minimum_size=settings.gzip_min_size, level=settings.gzip_level)
+app.add_middleware(
+    SessionMiddleware,
+    backend=create_session_backend(settings),
+    max_age=settings.session_ttl_sec,
+    anonymous_backend=CookieBackend(settings.secret_key, settings.session_ttl_sec),
+)
 
 
 @app.get("/")
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import logging
+import threading
+import tracemalloc
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from app.config import get_settings
+
+
+logger = logging.getLogger("memory")
+settings = get_settings()
+
+APP_DIR = Path(__file__).resolve().parent
+PROJECT_DIR = APP_DIR.parent
+MAX_SNAPSHOTS = 5
+
+LineKey = tuple[str, int]
+
+
+@dataclass
+class SnapshotSummary:
+    id: int
+    label: str
+    taken_at: datetime
+    total_kb: float
+    app_lines: dict[LineKey, tuple[int, int]] = field(default_factory=dict)
+
+
+_lock = threading.Lock()
+_snapshots: "OrderedDict[int, SnapshotSummary]" = OrderedDict()
+_next_id = 1
+
+
+def is_tracing() -> bool:
+    return tracemalloc.is_tracing()
+
+
+def start_tracing() -> None:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(settings.tracemalloc_frames)
+        logger.info("tracemalloc started frames=%s", settings.tracemalloc_frames)
+
+
+def stop_tracing() -> None:
+    global _next_id
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+        logger.info("tracemalloc stopped")
+    with _lock:
+        _snapshots.clear()
+        _next_id = 1
+
+
+def _app_frame(traceback: tracemalloc.Traceback) -> LineKey | None:
+    app_prefix = str(APP_DIR)
+    for frame in reversed(list(traceback)):
+        if frame.filename.startswith(app_prefix):
+            relative = Path(frame.filename).relative_to(PROJECT_DIR).as_posix()
+            return relative, frame.lineno
+    return None
+
+
+def _aggregate(snapshot: tracemalloc.Snapshot) -> tuple[int, dict[LineKey, tuple[int, int]]]:
+    total = 0
+    lines: dict[LineKey, tuple[int, int]] = {}
+    for trace in snapshot.traces:
+        total += trace.size
+        key = _app_frame(trace.traceback)
+        if key is None:
+            continue
+        size, count = lines.get(key, (0, 0))
+        lines[key] = (size + trace.size, count + 1)
+    return total, lines
+
+
+def take_snapshot(label: str | None = None) -> SnapshotSummary:
+    global _next_id
+    if not tracemalloc.is_tracing():
+        raise RuntimeError("tracemalloc is not tracing")
+
+    snapshot = tracemalloc.take_snapshot()
+    total, lines = _aggregate(snapshot)
+    del snapshot
+
+    with _lock:
+        summary = SnapshotSummary(
+            id=_next_id,
+            label=label or f"snapshot-{_next_id}",
+            taken_at=datetime.now(),
+            total_kb=round(total / 1024, 1),
+            app_lines=lines,
+        )
+        _next_id += 1
+        _snapshots[summary.id] = summary
+        while len(_snapshots) > MAX_SNAPSHOTS:
+            _snapshots.popitem(last=False)
+
+    logger.info("memory snapshot id=%s label=%s total_kb=%.1f", summary.id, summary.label, summary.total_kb)
+    return summary
+
+
+def get_snapshot(snapshot_id: int) -> SnapshotSummary | None:
+    with _lock:
+        return _snapshots.get(snapshot_id)
+
+
+def list_snapshots() -> list[dict[str, object]]:
+    with _lock:
+        return [_describe(summary) for summary in _snapshots.values()]
+
+
+def _describe(summary: SnapshotSummary) -> dict[str, object]:
+    return {
+        "id": summary.id,
+        "label": summary.label,
+        "taken_at": summary.taken_at.isoformat(timespec="seconds"),
+        "total_kb": summary.total_kb,
+    }
+
+
+def top_allocations(summary: SnapshotSummary, *, limit: int = 20) -> dict[str, object]:
+    ordered = sorted(summary.app_lines.items(), key=lambda item: item[1][0], reverse=True)
+    return {
+        **_describe(summary),
+        "top": [
+            {
+                "file": filename,
+                "line": lineno,
+                "size_kb": round(size / 1024, 1),
+                "count": count,
+            }
+            for (filename, lineno), (size, count) in ordered[:limit]
+        ],
+    }
+
+
+def diff_snapshots(
+    base: SnapshotSummary,
+    target: SnapshotSummary,
+    *,
+    limit: int = 20,
+) -> dict[str, object]:
+    rows = []
+    for key in base.app_lines.keys() | target.app_lines.keys():
+        base_size, base_count = base.app_lines.get(key, (0, 0))
+        target_size, target_count = target.app_lines.get(key, (0, 0))
+        size_diff = target_size - base_size
+        if size_diff == 0 and target_count == base_count:
+            continue
+        rows.append((key, size_diff, target_size, target_count - base_count))
+
+    rows.sort(key=lambda row: abs(row[1]), reverse=True)
+    return {
+        "base": _describe(base),
+        "target": _describe(target),
+        "total_diff_kb": round(target.total_kb - base.total_kb, 1),
+        "top": [
+            {
+                "file": filename,
+                "line": lineno,
+                "size_diff_kb": round(size_diff / 1024, 1),
+                "size_kb": round(size / 1024, 1),
+                "count_diff": count_diff,
+            }
+            for (filename, lineno), size_diff, size, count_diff in rows[:limit]
+        ],
+    }
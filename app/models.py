@@ -1,9 +1,31 @@
 from __future__ import annotations
 
 import enum
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 
-from sqlalchemy import Boolean, Column, Date, DateTime, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    Boolean,
+    CheckConstraint,
+    Column,
+    Date,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    and_,
+    case,
+    event,
+    false,
+    func,
+    inspect,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.orm import aliased, column_property, relationship
 from app.db import Base
 
 
@@ -29,6 +51,11 @@ class AssetStatus(str, enum.Enum):
     LOST = "LOST"
 
 
+class PlanEntityType(str, enum.Enum):
+    ASSET = "ASSET"
+    REQUEST = "REQUEST"
+
+
 class PlanStatus(str, enum.Enum):
     PLANNED = "PLANNED"
     DONE = "DONE"
@@ -58,6 +85,11 @@ PLAN_STATUS_LABELS: dict[str, str] = {
     PlanStatus.CANCELLED.value: "中止",
 }
 
+PLAN_ENTITY_LABELS: dict[str, str] = {
+    PlanEntityType.ASSET.value: "資産",
+    PlanEntityType.REQUEST.value: "要求",
+}
+
 
 class User(Base):
     __tablename__ = "users"
@@ -79,6 +111,12 @@ class User(Base):
 
 class PcRequest(Base):
     __tablename__ = "pc_requests"
+    __table_args__ = (
+        Index("ix_pc_requests_status", "status"),
+        Index("ix_pc_requests_asset_id", "asset_id"),
+        # 予定フィードの版（申請者の変更の検知）
+        Index("ix_pc_requests_updated_at", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     status = Column(Enum(RequestStatus, native_enum=False), nullable=False)
@@ -92,11 +130,25 @@ class PcRequest(Base):
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
     )
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    # 紐づく資産。一覧/詳細では join/joinedload で要求と一緒に読み込む
+    asset = relationship("PcAsset", foreign_keys=[asset_id])
+
+    __mapper_args__ = {"version_id_col": version}
 
 
 
 class PcAsset(Base):
     __tablename__ = "pc_assets"
+    __table_args__ = (
+        Index("ix_pc_assets_status", "status"),
+        Index("ix_pc_assets_request_id", "request_id"),
+        # 一覧の期限超過/今日の予定の絞り込み（次の予定日の範囲）
+        Index("ix_pc_assets_next_plan_date", "next_plan_date"),
+        # 予定フィードの版（資産番号/設置場所の変更の検知）
+        Index("ix_pc_assets_updated_at", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     asset_tag = Column(String(50), unique=True, nullable=False)
@@ -107,6 +159,10 @@ class PcAsset(Base):
     location = Column(String(128), nullable=True)
     request_id = Column(Integer, ForeignKey("pc_requests.id"), nullable=True)
     notes = Column(Text, nullable=True)
+    # 予定の要約（状態が予定のもの）。予定の登録/更新/削除時に refresh_asset_plan_summaries で更新する
+    next_plan_date = Column(Date, nullable=True)
+    next_plan_id = Column(Integer, nullable=True)
+    open_plan_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(
         DateTime,
@@ -114,11 +170,19 @@ class PcAsset(Base):
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
     )
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    request = relationship("PcRequest", foreign_keys=[request_id])
+
+    __mapper_args__ = {"version_id_col": version}
 
 
 
 class PcStatusHistory(Base):
     __tablename__ = "pc_status_history"
+    __table_args__ = (
+        Index("ix_pc_status_history_entity", "entity_type", "entity_id", "changed_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     entity_type = Column(String(16), nullable=False)
@@ -133,10 +197,26 @@ class PcStatusHistory(Base):
 
 class PcPlan(Base):
     __tablename__ = "pc_plans"
+    __table_args__ = (
+        Index("ix_pc_plans_entity", "entity_type", "entity_id", "planned_date"),
+        # 後ろの3列はカレンダー集計（日付×担当予定者、設置場所の結合）を索引だけで済ませるためのもの
+        Index("ix_pc_plans_status_date", "plan_status", "planned_date", "planned_owner", "entity_type", "entity_id"),
+        Index("ix_pc_plans_status_actual", "plan_status", "actual_date"),
+        # 予定フィード: 担当予定者ごとの取得と件数、ETag（全体の最終更新日時）を索引だけで求める
+        Index("ix_pc_plans_owner_status_date", "planned_owner", "plan_status", "planned_date"),
+        Index("ix_pc_plans_updated_at", "updated_at"),
+        Index("ix_pc_plans_overdue", "is_overdue", "planned_date"),
+        CheckConstraint("entity_type IN ('ASSET', 'REQUEST')", name="ck_pc_plans_entity_type"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    entity_type = Column(String(16), nullable=False)
-    entity_id = Column(Integer, nullable=False)
+    # 対象は (entity_type, entity_id) で資産/要求を指す。外部キーは張れないため、種別は CHECK 制約で限定し、
+    # 対象の削除時は app.plan_targets.delete_target_plans で同じトランザクション内に予定も削除する。
+    # 付け替えたときに元の資産の要約も直せるよう、変更前の値を履歴に残す（active_history）
+    entity_type = column_property(
+        Column(Enum(PlanEntityType, native_enum=False, length=16), nullable=False), active_history=True
+    )
+    entity_id = column_property(Column(Integer, nullable=False), active_history=True)
     title = Column(String(255), nullable=False)
     planned_date = Column(Date, nullable=True)
     planned_owner = Column(String(128), nullable=True)
@@ -144,6 +224,8 @@ class PcPlan(Base):
     actual_date = Column(Date, nullable=True)
     actual_owner = Column(String(128), nullable=True)
     result_note = Column(Text, nullable=True)
+    # 期限超過（予定のまま予定日を過ぎた）。保存時に設定し、日付の経過分は定期処理（app.scheduler）が毎日更新する
+    is_overdue = Column(Boolean, nullable=False, default=False, server_default=false())
     created_by = Column(String(64), nullable=False)
     created_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(
@@ -152,3 +234,140 @@ class PcPlan(Base):
         default=lambda: datetime.now(timezone.utc),
         onupdate=lambda: datetime.now(timezone.utc),
     )
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
+
+
+def plan_is_overdue(plan_status, planned_date: date | None, today: date) -> bool:
+    return plan_status == PlanStatus.PLANNED and planned_date is not None and planned_date < today
+
+
+@event.listens_for(PcPlan, "before_insert")
+@event.listens_for(PcPlan, "before_update")
+def _set_plan_overdue(mapper, connection, target: PcPlan) -> None:
+    target.is_overdue = plan_is_overdue(target.plan_status, target.planned_date, date.today())
+
+
+def _asset_plans(plan, *columns):
+    return select(*columns).where(plan.entity_type == PlanEntityType.ASSET, plan.entity_id == PcAsset.id)
+
+
+def _open_plan_date(plan):
+    return func.min(case((plan.plan_status == PlanStatus.PLANNED, plan.planned_date)))
+
+
+def asset_plan_summary_values() -> dict:
+    """pc_plans から求めた資産の予定の要約（次の予定は予定日の最も早いもの、同日は ID の小さいもの）。
+
+    状態を WHERE に書くと SQLite が ix_pc_plans_status_date（状態が予定の全件）を選ぶため、資産の予定を
+    ix_pc_plans_entity で読み、状態は集計の中で見る。
+    """
+    earliest = aliased(PcPlan)
+    # 2段の入れ子のため、外側の pc_assets への相関を明示する
+    next_plan_date = _asset_plans(earliest, _open_plan_date(earliest)).correlate_except(earliest).scalar_subquery()
+    return {
+        "next_plan_date": _asset_plans(PcPlan, _open_plan_date(PcPlan)).scalar_subquery(),
+        "next_plan_id": _asset_plans(PcPlan, func.min(PcPlan.id))
+        .where(PcPlan.planned_date == next_plan_date, PcPlan.plan_status == PlanStatus.PLANNED)
+        .scalar_subquery(),
+        "open_plan_count": _asset_plans(
+            PcPlan, func.count(case((PcPlan.plan_status == PlanStatus.PLANNED, PcPlan.id)))
+        ).scalar_subquery(),
+    }
+
+
+def asset_plan_summary_stale():
+    """保存されている要約が pc_plans と食い違っている資産の条件。"""
+    return or_(
+        *(getattr(PcAsset, name).is_distinct_from(value) for name, value in asset_plan_summary_values().items())
+    )
+
+
+def refresh_asset_plan_summaries(connection, condition) -> int:
+    """condition に当たる資産のうち、要約が食い違うものだけを書き直し、その件数を返す。
+
+    予定の変更で資産を編集中の利用者と競合しないよう、資産の version/updated_at は変えない。
+    """
+    result = connection.execute(
+        update(PcAsset)
+        .where(and_(condition, asset_plan_summary_stale()))
+        .values(**asset_plan_summary_values(), updated_at=PcAsset.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
+
+
+def _plan_asset_ids(target: PcPlan) -> set[int]:
+    """変更前後の対象のうち資産の ID（予定の付け替えでは元の資産も含む）。"""
+    state = inspect(target)
+    ids: set[int] = set()
+    types = state.attrs.entity_type.history
+    entity_ids = state.attrs.entity_id.history
+    for entity_type, entity_id in (
+        (target.entity_type, target.entity_id),
+        ((types.deleted or [target.entity_type])[0], (entity_ids.deleted or [target.entity_id])[0]),
+    ):
+        if entity_type == PlanEntityType.ASSET and entity_id:
+            ids.add(entity_id)
+    return ids
+
+
+@event.listens_for(PcPlan, "after_insert")
+@event.listens_for(PcPlan, "after_update")
+@event.listens_for(PcPlan, "after_delete")
+def _refresh_plan_assets(mapper, connection, target: PcPlan) -> None:
+    asset_ids = _plan_asset_ids(target)
+    if asset_ids:
+        refresh_asset_plan_summaries(connection, PcAsset.id.in_(asset_ids))
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (Index("ix_idempotency_keys_expires_at", "expires_at"),)
+
+    id = Column(Integer, primary_key=True)
+    key = Column(String(64), unique=True, nullable=False)
+    user_id = Column(String(64), nullable=False)
+    path = Column(String(255), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    location = Column(String(255), nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+
+class HttpSession(Base):
+    __tablename__ = "http_sessions"
+    __table_args__ = (Index("ix_http_sessions_expires_at", "expires_at"),)
+
+    # Cookie のセッションIDそのものではなく SHA-256 を保存する
+    id = Column(String(64), primary_key=True)
+    data = Column(Text, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+
+class SchedulerLock(Base):
+    """定期処理の実行権（リース）。複数ワーカーのうち期限内のリースを持つ1つだけが処理を実行する。"""
+
+    __tablename__ = "scheduler_locks"
+
+    name = Column(String(64), primary_key=True)
+    owner = Column(String(128), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+
+class SchedulerRun(Base):
+    __tablename__ = "scheduler_runs"
+    __table_args__ = (Index("ix_scheduler_runs_job", "job", "run_for"),)
+
+    id = Column(Integer, primary_key=True)
+    job = Column(String(64), nullable=False)
+    run_for = Column(Date, nullable=False)
+    worker = Column(String(128), nullable=False)
+    status = Column(String(16), nullable=False)
+    changed_count = Column(Integer, nullable=False, default=0)
+    detail = Column(Text, nullable=True)
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=False)
+    duration_ms = Column(Integer, nullable=False)
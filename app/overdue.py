@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import threading
+from datetime import date
+
+from sqlalchemy import and_, not_, select, update
+from sqlalchemy.orm import Session
+
+from app.models import PcPlan, PlanStatus, SchedulerRun
+
+JOB_NAME = "mark_overdue"
+
+# 接続先（engine）ごとの「今日の判定が済んだ日付」。済んでいれば当日中は再確認しない
+_ready: dict[int, date] = {}
+_ready_lock = threading.Lock()
+
+
+def _overdue_by_date(today: date):
+    return and_(
+        PcPlan.plan_status == PlanStatus.PLANNED,
+        PcPlan.planned_date.isnot(None),
+        PcPlan.planned_date < today,
+    )
+
+
+def mark_overdue(db: Session, today: date) -> int:
+    """is_overdue を今日の日付で付け直し、変更した件数を返す（コミットは呼び出し側）。
+
+    日付の経過で期限超過になった予定に付け、ORM を通らない一括更新などでずれた印も外す。
+    画面で編集中の予定と競合しないよう version と updated_at は変えない。
+    """
+    overdue = _overdue_by_date(today)
+    marked = db.execute(
+        update(PcPlan)
+        .where(overdue)
+        .where(PcPlan.is_overdue.is_(False))
+        .values(is_overdue=True, updated_at=PcPlan.updated_at)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    cleared = db.execute(
+        update(PcPlan)
+        .where(PcPlan.is_overdue.is_(True))
+        .where(not_(overdue))
+        .values(is_overdue=False, updated_at=PcPlan.updated_at)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    return marked + cleared
+
+
+def flags_ready(db: Session, today: date) -> bool:
+    """今日の判定（mark_overdue）が成功していれば True。まだなら読み取り側は日付の比較で判定する。"""
+    key = id(db.get_bind())
+    with _ready_lock:
+        if _ready.get(key) == today:
+            return True
+    found = db.execute(
+        select(SchedulerRun.id)
+        .where(SchedulerRun.job == JOB_NAME)
+        .where(SchedulerRun.run_for == today)
+        .where(SchedulerRun.status == "OK")
+        .limit(1)
+    ).first()
+    if found is None:
+        return False
+    with _ready_lock:
+        _ready[key] = today
+    return True
+
+
+def forget_ready() -> None:
+    with _ready_lock:
+        _ready.clear()
+
+
+def overdue_condition(db: Session, today: date):
+    """期限超過の予定の条件。今日の判定が済んでいれば is_overdue の印（ix_pc_plans_overdue）を使う。"""
+    if flags_ready(db, today):
+        return PcPlan.is_overdue.is_(True)
+    return _overdue_by_date(today)
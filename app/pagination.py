@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.models import PcPlan, PcStatusHistory
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Page:
+    items: list[Any]
+    next_cursor: str | None
+
+
+def encode_cursor(values: dict[str, Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as exc:
+        raise InvalidCursorError(cursor) from exc
+    if not isinstance(values, dict) or not isinstance(values.get("id"), int):
+        raise InvalidCursorError(cursor)
+    return values
+
+
+def page_url(path: str, cursor: str | None) -> str | None:
+    """次ページ（cursor）のURL。最終ページなら None。cursor は URL 安全な base64 のためそのまま付ける。"""
+    return f"{path}?cursor={cursor}" if cursor else None
+
+
+def _page(rows: list[Any], limit: int, cursor_of) -> Page:
+    if len(rows) <= limit:
+        return Page(items=rows, next_cursor=None)
+    items = rows[:limit]
+    return Page(items=items, next_cursor=encode_cursor(cursor_of(items[-1])))
+
+
+def history_page(
+    db: Session,
+    *,
+    entity_type: str,
+    entity_id: int,
+    limit: int,
+    cursor: str | None = None,
+) -> Page:
+    """状態履歴を新しい順に limit 件返す。cursor は前ページ最終行の (changed_at, id)。"""
+    query = (
+        db.query(PcStatusHistory)
+        .filter(PcStatusHistory.entity_type == entity_type)
+        .filter(PcStatusHistory.entity_id == entity_id)
+    )
+    if cursor:
+        values = decode_cursor(cursor)
+        try:
+            changed_at = datetime.fromisoformat(values["changed_at"])
+        except (KeyError, TypeError, ValueError) as exc:
+            raise InvalidCursorError(cursor) from exc
+        query = query.filter(
+            or_(
+                PcStatusHistory.changed_at < changed_at,
+                and_(PcStatusHistory.changed_at == changed_at, PcStatusHistory.id < values["id"]),
+            )
+        )
+    rows = (
+        query.order_by(PcStatusHistory.changed_at.desc(), PcStatusHistory.id.desc())
+        .limit(limit + 1)
+        .all()
+    )
+    return _page(rows, limit, lambda row: {"changed_at": row.changed_at.isoformat(), "id": row.id})
+
+
+def plan_page(
+    db: Session,
+    *,
+    entity_type: str,
+    entity_id: int,
+    limit: int,
+    cursor: str | None = None,
+) -> Page:
+    """予定を予定日の新しい順（予定日なしは最後）に limit 件返す。cursor は前ページ最終行の (planned_date, id)。"""
+    query = db.query(PcPlan).filter(PcPlan.entity_type == entity_type).filter(PcPlan.entity_id == entity_id)
+    if cursor:
+        values = decode_cursor(cursor)
+        planned = values.get("planned_date")
+        if planned is None:
+            query = query.filter(PcPlan.planned_date.is_(None), PcPlan.id < values["id"])
+        else:
+            try:
+                planned_date = date.fromisoformat(planned)
+            except (TypeError, ValueError) as exc:
+                raise InvalidCursorError(cursor) from exc
+            query = query.filter(
+                or_(
+                    PcPlan.planned_date < planned_date,
+                    and_(PcPlan.planned_date == planned_date, PcPlan.id < values["id"]),
+                    PcPlan.planned_date.is_(None),
+                )
+            )
+    rows = query.order_by(PcPlan.planned_date.desc(), PcPlan.id.desc()).limit(limit + 1).all()
+    return _page(
+        rows,
+        limit,
+        lambda row: {
+            "planned_date": row.planned_date.isoformat() if row.planned_date else None,
+            "id": row.id,
+        },
+    )
+
+
+def fragment_response(request, template_name: str, context: dict[str, Any], *, next_url: str | None):
+    """「さらに表示」用の行断片を返す。次ページのURLは X-Next-Url ヘッダで渡す（最終ページは空）。"""
+    response = request.app.state.templates.TemplateResponse(request, template_name, context)
+    response.headers["X-Next-Url"] = next_url or ""
+    return response
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models import PcAsset, PcPlan, PlanEntityType, PlanStatus
+from app.plan_targets import target_condition
+
+VIEWS = ("month", "week")
+OWNERS_PER_DAY = 3
+# 表の端の週や前後の期間へのリンクが date の範囲（1〜9999年）からはみ出さないよう、1年ずつ内側に限る
+MIN_YEAR = date.min.year + 1
+MAX_YEAR = date.max.year - 1
+
+
+class CalendarRangeError(ValueError):
+    pass
+
+
+def month_start(value: str | None, today: date) -> date:
+    """YYYY-MM（省略時は今月）の1日を返す。"""
+    if not value:
+        return today.replace(day=1)
+    try:
+        year, month = (int(part) for part in value.split("-", 1))
+        return date(year, month, 1)
+    except ValueError:
+        raise CalendarRangeError("月は YYYY-MM 形式で指定してください。") from None
+
+
+def week_start(value: str | None, today: date) -> date:
+    """YYYY-MM-DD（省略時は今日）を含む週の月曜日を返す。"""
+    try:
+        day = date.fromisoformat(value) if value else today
+    except ValueError:
+        raise CalendarRangeError("週は YYYY-MM-DD 形式で指定してください。") from None
+    return day - timedelta(days=day.weekday())
+
+
+def calendar_range(view: str, start: str | None, today: date) -> tuple[date, date, date, date]:
+    """表示範囲を返す: (期間の開始, 期間の終了, 表の開始(月曜), 表の終了(日曜))。
+
+    月表示は前後の週の端数日も表に含め、その日の件数も表示する。
+    """
+    first = week_start(start, today) if view == "week" else month_start(start, today)
+    if not MIN_YEAR <= first.year <= MAX_YEAR:
+        raise CalendarRangeError(f"表示できるのは {MIN_YEAR}年から{MAX_YEAR}年までです。")
+    if view == "week":
+        last = first + timedelta(days=6)
+        return first, last, first, last
+    last = (first.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+    grid_start = first - timedelta(days=first.weekday())
+    grid_end = last + timedelta(days=6 - last.weekday())
+    return first, last, grid_start, grid_end
+
+
+def shift(view: str, first: date, step: int) -> date:
+    """前/次の期間の開始日。"""
+    try:
+        if view == "week":
+            return first + timedelta(days=7 * step)
+        month_index = first.year * 12 + first.month - 1 + step
+        return date(month_index // 12, month_index % 12 + 1, 1)
+    except (OverflowError, ValueError):
+        raise CalendarRangeError(f"表示できるのは {MIN_YEAR}年から{MAX_YEAR}年までです。") from None
+
+
+def day_counts(
+    db: Session,
+    start: date,
+    end: date,
+    *,
+    planned_owner: str | None = None,
+    location: str | None = None,
+) -> dict[date, dict[str, int]]:
+    """期間内の PLANNED の予定を日付×担当予定者で集計する。
+
+    ix_pc_plans_status_date (plan_status, planned_date, ...) の範囲検索で、集計に使う列も索引に含まれるため
+    表の行は読まない。
+
+    location を指定したときは資産の予定だけが対象になる（要求には設置場所がないため）。
+    """
+    query = (
+        select(PcPlan.planned_date, PcPlan.planned_owner, func.count(PcPlan.id))
+        .where(PcPlan.plan_status == PlanStatus.PLANNED)
+        .where(PcPlan.planned_date >= start)
+        .where(PcPlan.planned_date <= end)
+    )
+    if planned_owner:
+        query = query.where(PcPlan.planned_owner.contains(planned_owner))
+    if location:
+        query = query.join(PcAsset, target_condition(PlanEntityType.ASSET)).where(PcAsset.location.contains(location))
+    query = query.group_by(PcPlan.planned_date, PcPlan.planned_owner)
+
+    days: dict[date, dict[str, int]] = defaultdict(dict)
+    for planned_date, owner, count in db.execute(query):
+        days[planned_date][owner or ""] = count
+    return days
+
+
+def build_weeks(grid_start: date, grid_end: date, days: dict[date, dict[str, int]]) -> list[list[dict]]:
+    """表示用の週ごとのセル。担当予定者は件数の多い順に OWNERS_PER_DAY 名まで。"""
+    weeks: list[list[dict]] = []
+    day = grid_start
+    while day <= grid_end:
+        week = []
+        for _ in range(7):
+            owners = sorted(days.get(day, {}).items(), key=lambda item: (-item[1], item[0]))
+            total = sum(count for _, count in owners)
+            shown = owners[:OWNERS_PER_DAY]
+            week.append(
+                {
+                    "date": day,
+                    "total": total,
+                    "owners": shown,
+                    "others": total - sum(count for _, count in shown),
+                }
+            )
+            day += timedelta(days=1)
+        weeks.append(week)
+    return weeks
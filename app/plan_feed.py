@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, Iterator
+from urllib.parse import urlencode
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import PcAsset, PcPlan, PcRequest, PlanEntityType, PlanStatus
+from app.plan_targets import target_condition
+
+settings = get_settings()
+
+FEED_PATH = "/feeds/plans.ics"
+PRODID = "-//pc-management//plans//JA"
+# RFC 5545 の1行の上限（CRLF を除くオクテット数）
+LINE_LIMIT = 75
+
+
+def feed_token(owner: str, location: str) -> str:
+    """購読URLの署名。担当予定者/設置場所の組ごとに SECRET_KEY の HMAC で作る（変えると全URLが無効になる）。"""
+    message = f"{FEED_PATH}\n{owner}\n{location}".encode("utf-8")
+    return hmac.new(settings.secret_key.encode("utf-8"), message, hashlib.sha256).hexdigest()[:32]
+
+
+def verify_feed_token(owner: str, location: str, token: str | None) -> bool:
+    return bool(token) and hmac.compare_digest(feed_token(owner, location), token)
+
+
+def feed_url(base_url: str, owner: str, location: str) -> str:
+    params = {key: value for key, value in (("owner", owner), ("location", location)) if value}
+    params["token"] = feed_token(owner, location)
+    return f"{base_url.rstrip('/')}{FEED_PATH}?{urlencode(params)}"
+
+
+def feed_period(today: date) -> tuple[date, date]:
+    return today - timedelta(days=settings.feed_past_days), today + timedelta(days=settings.feed_future_days)
+
+
+def _feed_conditions(owner: str, today: date) -> list:
+    start, end = feed_period(today)
+    conditions = [
+        PcPlan.plan_status == PlanStatus.PLANNED,
+        PcPlan.planned_date >= start,
+        PcPlan.planned_date <= end,
+    ]
+    if owner:
+        conditions.append(PcPlan.planned_owner == owner)
+    return conditions
+
+
+def feed_query(owner: str, location: str, today: date) -> Select:
+    """フィードに載せる予定（状態が予定で、予定日が期間内）。
+
+    ix_pc_plans_status_date の (plan_status, planned_date) の範囲検索で、担当予定者も索引の中で絞り込む。
+    """
+    query = (
+        select(
+            PcPlan.id,
+            PcPlan.title,
+            PcPlan.planned_date,
+            PcPlan.planned_owner,
+            PcPlan.entity_type,
+            PcPlan.entity_id,
+            PcPlan.updated_at,
+            PcPlan.version,
+            PcAsset.asset_tag,
+            PcAsset.location,
+            PcRequest.requester,
+        )
+        .outerjoin(PcRequest, target_condition(PlanEntityType.REQUEST))
+        .where(*_feed_conditions(owner, today))
+        .order_by(PcPlan.planned_date)
+    )
+    if location:
+        query = query.join(PcAsset, target_condition(PlanEntityType.ASSET)).where(PcAsset.location.contains(location))
+    else:
+        query = query.outerjoin(PcAsset, target_condition(PlanEntityType.ASSET))
+    return query
+
+
+def _feed_count(owner: str, location: str, today: date) -> Select:
+    query = select(func.count(PcPlan.id)).select_from(PcPlan).where(*_feed_conditions(owner, today))
+    if location:
+        query = query.join(PcAsset, target_condition(PlanEntityType.ASSET)).where(PcAsset.location.contains(location))
+    return query
+
+
+def feed_revision(db: Session, owner: str, location: str, today: date) -> tuple[datetime | None, int]:
+    """フィードの版（最終更新日時と、フィード対象の件数）を1回の SELECT で取得する。
+
+    最終更新日時は予定/資産/要求の updated_at の最大（各 ix_*_updated_at の末尾）。資産番号/設置場所や
+    申請者もフィードに載るため、資産/要求の変更でも版が変わる。削除と設置場所の絞り込みから外れたことは
+    件数（ix_pc_plans_status_date の範囲。設置場所の指定時は資産を主キーで結合）で検知する。
+    """
+    statement = select(
+        select(func.max(PcPlan.updated_at)).scalar_subquery(),
+        select(func.max(PcAsset.updated_at)).scalar_subquery(),
+        select(func.max(PcRequest.updated_at)).scalar_subquery(),
+        _feed_count(owner, location, today).scalar_subquery(),
+    )
+    *updated, count = db.execute(statement).one()
+    stamps = [value if value.tzinfo else value.replace(tzinfo=timezone.utc) for value in updated if value is not None]
+    return max(stamps, default=None), count
+
+
+def feed_etag(owner: str, location: str, today: date, revision: tuple[datetime | None, int]) -> str:
+    latest, count = revision
+    parts = (
+        FEED_PATH,
+        owner,
+        location,
+        today.isoformat(),
+        settings.feed_past_days,
+        settings.feed_future_days,
+        latest.isoformat() if latest else "",
+        count,
+    )
+    digest = hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def escape_text(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+        .replace("\r", "\\n")
+    )
+
+
+def fold(line: str) -> str:
+    """75オクテットを超える行を折り返す（マルチバイト文字の途中では切らない）。"""
+    if len(line.encode("utf-8")) <= LINE_LIMIT:
+        return line + "\r\n"
+    parts: list[str] = []
+    current = ""
+    size = 0
+    limit = LINE_LIMIT
+    for char in line:
+        length = len(char.encode("utf-8"))
+        if size + length > limit:
+            parts.append(current)
+            current, size = "", 0
+            limit = LINE_LIMIT - 1  # 継続行の先頭の空白の分
+        current += char
+        size += length
+    parts.append(current)
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _utc_stamp(value: datetime) -> str:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def _event_lines(row: Row, base_url: str) -> list[str]:
+    if row.entity_type == PlanEntityType.ASSET:
+        target = f"資産 {row.asset_tag}" if row.asset_tag else f"資産 ID:{row.entity_id}"
+        summary = f"{row.title}（{row.asset_tag or row.entity_id}）"
+    else:
+        target = f"要求 #{row.entity_id}" + (f"（{row.requester}）" if row.requester else "")
+        summary = f"{row.title}（要求 #{row.entity_id}）"
+    url = f"{base_url.rstrip('/')}/plans/{row.id}"
+    description = f"対象: {target}\n担当予定者: {row.planned_owner or '（未定）'}\n{url}"
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:plan-{row.id}@pc-management",
+        f"DTSTAMP:{_utc_stamp(row.updated_at)}",
+        f"LAST-MODIFIED:{_utc_stamp(row.updated_at)}",
+        f"SEQUENCE:{row.version or 0}",
+        f"DTSTART;VALUE=DATE:{row.planned_date:%Y%m%d}",
+        f"DTEND;VALUE=DATE:{row.planned_date + timedelta(days=1):%Y%m%d}",
+        f"SUMMARY:{escape_text(summary)}",
+        f"DESCRIPTION:{escape_text(description)}",
+        f"URL:{url}",
+    ]
+    if row.location:
+        lines.append(f"LOCATION:{escape_text(row.location)}")
+    lines.append("END:VEVENT")
+    return lines
+
+
+def calendar_name(owner: str, location: str) -> str:
+    conditions = [value for value in (owner, location) if value]
+    return "PC管理 予定" + (f"（{' / '.join(conditions)}）" if conditions else "")
+
+
+def iter_calendar(rows: Iterable[Row], *, name: str, base_url: str) -> Iterator[str]:
+    """VCALENDAR を1行ずつ（折り返し・CRLF 済みで）返す。rows は遅延で読みながら送れるようにする。"""
+    for line in (
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape_text(name)}",
+    ):
+        yield fold(line)
+    for row in rows:
+        for line in _event_lines(row, base_url):
+            yield fold(line)
+    yield fold("END:VCALENDAR")
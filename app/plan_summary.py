@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable
+
+from sqlalchemy import and_, exists, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.models import (
+    PcAsset,
+    PcPlan,
+    PlanEntityType,
+    PlanStatus,
+    asset_plan_summary_stale,
+    refresh_asset_plan_summaries,
+)
+
+REBUILD_BATCH_SIZE = 5_000
+
+
+@dataclass(frozen=True)
+class PlanSummary:
+    next_plan_date: date | None
+    next_plan_id: int | None
+    open_plan_count: int
+
+
+def summarize_plans(plans: Iterable[dict]) -> PlanSummary:
+    """1資産の予定の行（dict）から要約を求める。asset_plan_summary_values と同じ規則で、データ生成で使う。"""
+    open_plans = [plan for plan in plans if plan["plan_status"] == PlanStatus.PLANNED.value]
+    dated = [plan for plan in open_plans if plan["planned_date"] is not None]
+    if not dated:
+        return PlanSummary(None, None, len(open_plans))
+    first = min(dated, key=lambda plan: (plan["planned_date"], plan["id"]))
+    return PlanSummary(first["planned_date"], first["id"], len(open_plans))
+
+
+def _asset_plan_exists(*conditions):
+    return exists().where(
+        PcPlan.entity_type == PlanEntityType.ASSET,
+        PcPlan.entity_id == PcAsset.id,
+        *conditions,
+    )
+
+
+def overdue_assets(today: date):
+    """期限超過の予定がある資産。次の予定は最も早い予定のため、それが今日より前かだけで決まる。"""
+    return PcAsset.next_plan_date < today
+
+
+def today_assets(today: date):
+    """今日の予定がある資産。次の予定日が今日以前の資産（ix_pc_assets_next_plan_date の範囲）だけを調べる。
+
+    次の予定日が今日なら予定を読まない。期限超過の資産だけ、今日の予定があるかを ix_pc_plans_entity で確認する。
+    """
+    return and_(
+        PcAsset.next_plan_date <= today,
+        or_(PcAsset.next_plan_date == today, _planned_on(today)),
+    )
+
+
+def _planned_on(day: date):
+    return _asset_plan_exists(PcPlan.plan_status == PlanStatus.PLANNED, PcPlan.planned_date == day)
+
+
+def planned_by(planned_owner: str):
+    """担当予定者（部分一致）の予定がある資産（状態は問わない）。"""
+    return _asset_plan_exists(PcPlan.planned_owner.contains(planned_owner))
+
+
+def planned_today_ids(db: Session, asset_ids: list[int], today: date) -> set[int]:
+    """資産のうち今日の予定があるものの ID。期限超過の資産（次の予定日では分からないもの）にだけ使う。"""
+    if not asset_ids:
+        return set()
+    rows = db.execute(
+        select(PcPlan.entity_id)
+        .where(PcPlan.entity_type == PlanEntityType.ASSET)
+        .where(PcPlan.entity_id.in_(asset_ids))
+        .where(PcPlan.planned_date == today)
+        .where(PcPlan.plan_status == PlanStatus.PLANNED)
+        .distinct()
+    ).all()
+    return {row.entity_id for row in rows}
+
+
+def rebuild_asset_plan_summaries(db: Session, *, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    """全資産の要約を pc_plans から作り直し、食い違っていた件数を返す。
+
+    ID の範囲ごとにコミットし、長いトランザクションで画面の更新を待たせない。
+    """
+    low, high = db.execute(select(func.min(PcAsset.id), func.max(PcAsset.id))).one()
+    if low is None:
+        return 0
+    changed = 0
+    for start in range(low, high + 1, batch_size):
+        changed += refresh_asset_plan_summaries(
+            db.connection(), PcAsset.id.between(start, start + batch_size - 1)
+        )
+        db.commit()
+    return changed
+
+
+def count_stale_summaries(db: Session) -> int:
+    return db.execute(select(func.count(PcAsset.id)).where(asset_plan_summary_stale())).scalar_one()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import String, and_, delete, exists, func, or_, select, type_coerce
+from sqlalchemy.orm import Session
+
+from app.models import PLAN_ENTITY_LABELS, PcAsset, PcPlan, PcRequest, PlanEntityType
+from app.plan_rules import PlanValidationError
+
+
+logger = logging.getLogger("plan")
+
+TARGET_MODELS = {
+    PlanEntityType.ASSET: PcAsset,
+    PlanEntityType.REQUEST: PcRequest,
+}
+
+
+def parse_entity_type(value: str | None) -> PlanEntityType:
+    """フォームの種別を検証する。ASSET/REQUEST 以外は PlanValidationError。"""
+    text = (value or "").strip().upper()
+    try:
+        return PlanEntityType(text)
+    except ValueError:
+        logger.warning("plan validation failed reason=entity_type_invalid value=%s", text)
+        raise PlanValidationError("種別は ASSET または REQUEST を選択してください。") from None
+
+
+def target_condition(entity_type: PlanEntityType):
+    """予定 → 対象の結合条件（種別が一致し、ID が対象の主キーに一致する）。"""
+    model = TARGET_MODELS[entity_type]
+    return and_(PcPlan.entity_type == entity_type, PcPlan.entity_id == model.id)
+
+
+def ensure_target_exists(db: Session, entity_type: PlanEntityType, entity_id: int) -> None:
+    """予定の対象が存在することを確認する（外部キーの代わり）。"""
+    model = TARGET_MODELS[entity_type]
+    if db.execute(select(model.id).where(model.id == entity_id)).first() is None:
+        logger.warning("plan validation failed reason=target_missing type=%s id=%s", entity_type.value, entity_id)
+        raise PlanValidationError(f"対象の{PLAN_ENTITY_LABELS[entity_type.value]}（ID: {entity_id}）が見つかりません。")
+
+
+def delete_target_plans(db: Session, entity_type: PlanEntityType, entity_id: int) -> int:
+    """対象の予定をまとめて削除する。対象の削除と同じトランザクション内で呼ぶ（commit は呼び出し側）。"""
+    result = db.execute(
+        delete(PcPlan)
+        .where(PcPlan.entity_type == entity_type)
+        .where(PcPlan.entity_id == entity_id)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
+
+
+def orphan_condition():
+    """対象が存在しない（または種別が不正な）予定の条件。"""
+    return ~or_(
+        *(
+            and_(PcPlan.entity_type == entity_type, exists().where(model.id == PcPlan.entity_id))
+            for entity_type, model in TARGET_MODELS.items()
+        )
+    )
+
+
+def count_orphan_plans(db: Session) -> dict[str, int]:
+    """孤立した予定の件数を種別ごとに返す。CHECK 制約導入前の不正な種別も文字列のまま数える。"""
+    entity_type = type_coerce(PcPlan.entity_type, String(16))
+    rows = db.execute(
+        select(entity_type, func.count(PcPlan.id)).where(orphan_condition()).group_by(entity_type)
+    ).all()
+    return {value: count for value, count in rows}
+
+
+def delete_orphan_plans(db: Session) -> int:
+    result = db.execute(delete(PcPlan).where(orphan_condition()).execution_options(synchronize_session=False))
+    return result.rowcount or 0
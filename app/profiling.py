@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import pstats
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+from fastapi import Request
+
+from app.config import get_settings
+from app.models import UserRole
+
+
+logger = logging.getLogger("profiling")
+settings = get_settings()
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY_PARAM = "_profile"
+PROFILE_NAME_PATTERN = re.compile(r"^[0-9]{8}-[0-9]{6}-[0-9]{6}-[a-z0-9_-]+\.prof$")
+
+_lock = threading.Lock()
+_last_started_at: float | None = None
+
+# cProfile は有効にしたスレッド（イベントループ）全体を計測するため、同時に処理中の要求も混ざる。
+# 処理中の要求数を数え、他の要求の処理中は計測を始めず、計測中に始まった要求の数を記録する。
+# 逆にスレッドプールで動く処理（def のルート本体など）は計測されない。ストリーミングの本文は
+# is_profiling() の間だけイベントループで描画し、送信が終わるまで計測する（app/streaming.py）
+_in_flight = 0
+_overlapped: int | None = None
+_profiling: ContextVar[bool] = ContextVar("profiling", default=False)
+
+
+def wants_profile(request: Request) -> bool:
+    requested = (
+        request.headers.get(PROFILE_HEADER) == "1"
+        or request.query_params.get(PROFILE_QUERY_PARAM) == "1"
+    )
+    if not requested:
+        return False
+    return request.session.get("role") == UserRole.ADMIN.value
+
+
+def note_request_started() -> None:
+    global _in_flight, _overlapped
+    _in_flight += 1
+    if _overlapped is not None:
+        _overlapped += 1
+
+
+def note_request_finished() -> None:
+    global _in_flight
+    _in_flight -= 1
+
+
+def is_profiling() -> bool:
+    """この要求を計測中か。ストリーミングの本文をイベントループのスレッドで描画するかの判定に使う。"""
+    return _profiling.get()
+
+
+def acquire_profile_slot() -> bool:
+    global _last_started_at, _overlapped
+    if _in_flight > 1:
+        return False
+    if not _lock.acquire(blocking=False):
+        return False
+    now = time.monotonic()
+    if _last_started_at is not None and now - _last_started_at < settings.profile_min_interval_sec:
+        _lock.release()
+        return False
+    _last_started_at = now
+    _overlapped = 0
+    return True
+
+
+def release_profile_slot() -> int:
+    """計測を終え、計測中に始まった他の要求の数を返す。"""
+    global _overlapped
+    overlapped, _overlapped = _overlapped or 0, None
+    _lock.release()
+    return overlapped
+
+
+@contextmanager
+def profiling_context() -> Iterator[None]:
+    """この中で始めた処理（ルートや本文の生成）から is_profiling() が True になる。"""
+    token = _profiling.set(True)
+    try:
+        yield
+    finally:
+        _profiling.reset(token)
+
+
+def _profile_dir() -> Path:
+    path = Path(settings.profile_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _slugify_path(path: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "_", path.lower()).strip("_")
+    return slug[:60] or "root"
+
+
+def profile_name(request: Request) -> str:
+    # 本文の送信後に保存するため、X-Profile-Id を返せるよう名前は先に決める
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    return f"{stamp}-{_slugify_path(request.url.path)}.prof"
+
+
+def save_profile(profiler: cProfile.Profile, request: Request, name: str, *, overlapped: int = 0) -> str:
+    directory = _profile_dir()
+    profiler.dump_stats(str(directory / name))
+    logger.info(
+        "profile saved name=%s path=%s actor=%s overlapped=%d",
+        name,
+        request.url.path,
+        request.session.get("user_id"),
+        overlapped,
+    )
+    if overlapped:
+        logger.warning("profile may include other requests name=%s overlapped=%d", name, overlapped)
+    _prune_profiles(directory)
+    return name
+
+
+def _prune_profiles(directory: Path) -> None:
+    keep = max(1, settings.profile_keep)
+    files = sorted(directory.glob("*.prof"), reverse=True)
+    for stale in files[keep:]:
+        stale.unlink(missing_ok=True)
+
+
+def list_profiles() -> list[dict[str, object]]:
+    directory = _profile_dir()
+    profiles: list[dict[str, object]] = []
+    for path in sorted(directory.glob("*.prof"), reverse=True):
+        stat = path.stat()
+        profiles.append(
+            {
+                "name": path.name,
+                "size_kb": round(stat.st_size / 1024, 1),
+                "created_at": datetime.fromtimestamp(stat.st_mtime),
+            }
+        )
+    return profiles
+
+
+def resolve_profile(name: str) -> Path | None:
+    if not PROFILE_NAME_PATTERN.match(name):
+        return None
+    path = _profile_dir() / name
+    return path if path.is_file() else None
+
+
+def render_profile_text(path: Path, *, limit: int = 60) -> str:
+    buffer = io.StringIO()
+    stats = pstats.Stats(str(path), stream=buffer)
+    stats.sort_stats("cumulative").print_stats(limit)
+    return buffer.getvalue()
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import get_settings
+
+
+logger = logging.getLogger("sql")
+settings = get_settings()
+
+_START_KEY = "query_stats_start"
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    total_ms: float = 0.0
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def current_query_stats() -> QueryStats | None:
+    """track_queries の中なら集計中の QueryStats を返す（応答本文の送信中も同じものを参照できる）。"""
+    return _current_stats.get()
+
+
+def _compact_statement(statement: str) -> str:
+    return " ".join(statement.split())
+
+
+def _redact_parameters(parameters: Any, executemany: bool) -> str:
+    if not parameters:
+        return "none"
+    if executemany:
+        return f"<redacted rows={len(parameters)}>"
+    return f"<redacted count={len(parameters)}>"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get(_START_KEY)
+    if not starts:
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.total_ms += elapsed_ms
+
+    threshold = settings.slow_query_ms
+    if threshold > 0 and elapsed_ms >= threshold:
+        logger.warning(
+            "slow query elapsed_ms=%.1f statement=%s params=%s",
+            elapsed_ms,
+            _compact_statement(statement),
+            _redact_parameters(parameters, executemany),
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # 失敗した文は after_cursor_execute が呼ばれないため、積んだ開始時刻をここで外す
+    if context.connection is None or context.execution_context is None:
+        return
+    starts = context.connection.info.get(_START_KEY)
+    if starts:
+        starts.pop()
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import APIRouter, Depends, Form, Request
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, RedirectResponse
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.db import get_db
+from app.memory_snapshots import (
+    diff_snapshots,
+    get_snapshot,
+    is_tracing,
+    list_snapshots,
+    start_tracing,
+    stop_tracing,
+    take_snapshot,
+    top_allocations,
+)
+from app.models import UserRole
+from app.profiling import list_profiles, render_profile_text, resolve_profile
+from app.scheduler import current_lease, recent_runs, run_due_jobs, worker_id
+from app.utils import add_flash, consume_flash
+
+router = APIRouter()
+settings = get_settings()
+
+
+def _is_admin(request: Request) -> bool:
+    return request.session.get("role") == UserRole.ADMIN.value
+
+
+def _require_admin(request: Request) -> RedirectResponse | None:
+    if _is_admin(request):
+        return None
+    add_flash(request.session, "error", "管理者のみ利用できます。")
+    return RedirectResponse(url="/dashboard", status_code=303)
+
+
+def _forbidden_json() -> JSONResponse:
+    return JSONResponse({"error": "admin only"}, status_code=403)
+
+
+@router.get("/admin/profiles")
+async def profiles_list(request: Request) -> Any:
+    denied = _require_admin(request)
+    if denied is not None:
+        return denied
+
+    flashes = consume_flash(request.session)
+    return request.app.state.templates.TemplateResponse(
+        request,
+        "admin_profiles.html",
+        {
+            "flashes": flashes,
+            "profiles": list_profiles(),
+        },
+    )
+
+
+@router.get("/admin/profiles/{name}")
+async def profile_download(request: Request, name: str, format: str = "prof") -> Any:
+    denied = _require_admin(request)
+    if denied is not None:
+        return denied
+
+    path = resolve_profile(name)
+    if path is None:
+        add_flash(request.session, "error", "対象のプロファイルが見つかりません。")
+        return RedirectResponse(url="/admin/profiles", status_code=303)
+
+    if format == "text":
+        return PlainTextResponse(render_profile_text(path))
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
+
+
+@router.get("/admin/jobs")
+async def jobs_list(request: Request, db: Session = Depends(get_db)) -> Any:
+    denied = _require_admin(request)
+    if denied is not None:
+        return denied
+
+    flashes = consume_flash(request.session)
+    return request.app.state.templates.TemplateResponse(
+        request,
+        "admin_jobs.html",
+        {
+            "flashes": flashes,
+            "runs": recent_runs(db),
+            "lease": current_lease(db),
+            "settings": settings,
+        },
+    )
+
+
+@router.post("/admin/jobs/run")
+def jobs_run(request: Request, db: Session = Depends(get_db)) -> Any:
+    denied = _require_admin(request)
+    if denied is not None:
+        return denied
+
+    runs = run_due_jobs(
+        db,
+        worker=worker_id(),
+        interval_sec=settings.scheduler_interval_sec,
+        lease_sec=settings.scheduler_lease_sec,
+        force=True,
+    )
+    if not runs:
+        add_flash(request.session, "warning", "他のワーカーが定期処理を実行中のため、実行しませんでした。")
+    elif all(run.status == "OK" for run in runs):
+        add_flash(request.session, "success", "定期処理を実行しました。")
+    else:
+        add_flash(request.session, "error", "定期処理でエラーが発生しました。実行履歴を確認してください。")
+    return RedirectResponse(url="/admin/jobs", status_code=303)
+
+
+@router.get("/admin/memory")
+async def memory_status(request: Request) -> Any:
+    if not _is_admin(request):
+        return _forbidden_json()
+    return JSONResponse({"tracing": is_tracing(), "snapshots": list_snapshots()})
+
+
+@router.post("/admin/memory/start")
+async def memory_start(request: Request) -> Any:
+    if not _is_admin(request):
+        return _forbidden_json()
+    start_tracing()
+    return JSONResponse({"tracing": is_tracing()})
+
+
+@router.post("/admin/memory/stop")
+async def memory_stop(request: Request) -> Any:
+    if not _is_admin(request):
+        return _forbidden_json()
+    stop_tracing()
+    return JSONResponse({"tracing": is_tracing()})
+
+
+# スナップショットの取得と集計/差分は重いため、イベントループを止めないよう def（スレッドプール）で動かす
+@router.post("/admin/memory/snapshots")
+def memory_snapshot_create(
+    request: Request,
+    label: str | None = Form(None),
+    limit: int = 20,
+) -> Any:
+    if not _is_admin(request):
+        return _forbidden_json()
+    if not is_tracing():
+        return JSONResponse({"error": "tracemalloc is not tracing"}, status_code=409)
+    summary = take_snapshot(label)
+    return JSONResponse(top_allocations(summary, limit=limit), status_code=201)
+
+
+@router.get("/admin/memory/snapshots/{snapshot_id}")
+def memory_snapshot_detail(request: Request, snapshot_id: int, limit: int = 20) -> Any:
+    if not _is_admin(request):
+        return _forbidden_json()
+    summary = get_snapshot(snapshot_id)
+    if summary is None:
+        return JSONResponse({"error": "snapshot not found"}, status_code=404)
+    return JSONResponse(top_allocations(summary, limit=limit))
+
+
+@router.get("/admin/memory/diff")
+def memory_diff(request: Request, base: int, target: int, limit: int = 20) -> Any:
+    if not _is_admin(request):
+        return _forbidden_json()
+    base_summary = get_snapshot(base)
+    target_summary = get_snapshot(target)
+    if base_summary is None or target_summary is None:
+        return JSONResponse({"error": "snapshot not found"}, status_code=404)
+    return JSONResponse(diff_snapshots(base_summary, target_summary, limit=limit))
@@ -1,12 +1,27 @@
 from datetime import date, datetime, timezone
+from typing import Iterator
 
 from fastapi import APIRouter, Depends, File, Form, Request, UploadFile
-from fastapi.responses import RedirectResponse
-from sqlalchemy import or_
+from fastapi.responses import PlainTextResponse, RedirectResponse
+from markupsafe import Markup
+from sqlalchemy import or_, select
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
+from app.conditional import asset_revision, detail_etag, is_not_modified, not_modified_response, with_etag
+from app.config import get_settings
+from app.concurrency import StaleDataError, VersionConflictError, conflict_response, ensure_version
 from app.db import get_db
+from app.fragment_cache import FragmentCache, fill_tokens, placeholder_token
+from app.fragments import fragment_error, row_fragment, wants_fragment
+from app.idempotency import (
+    REPLAYED_HEADER,
+    get_idempotency_key,
+    remember_outcome,
+    replay_after_failure,
+    replay_response,
+)
 from app.models import (
     ASSET_STATUS_LABELS,
     PLAN_STATUS_LABELS,
@@ -14,19 +29,52 @@ from app.models import (
     PcAsset,
     PcPlan,
     PcStatusHistory,
+    PlanEntityType,
     PlanStatus,
 )
+from app.pagination import InvalidCursorError, fragment_response, history_page, page_url, plan_page
 from app.plan_rules import PlanValidationError, validate_plan_integrity
+from app.plan_summary import overdue_assets, planned_by, planned_today_ids, today_assets
+from app.plan_targets import delete_target_plans
 from app.status_rules import list_allowed_asset_targets
+from app.streaming import CountingIterator, iter_partitions, open_stream_session, stream_template
 from app.transition_service import TransitionError, apply_asset_transition
 from app.utils import add_flash, consume_flash
 from app.validation import ValidationError, validate_asset_integrity
 
 router = APIRouter()
+settings = get_settings()
+
+# 一覧はORMエンティティではなく表示列だけの Row（名前付きタプル）で扱う
+ASSET_LIST_COLUMNS = (
+    PcAsset.id,
+    PcAsset.asset_tag,
+    PcAsset.hostname,
+    PcAsset.status,
+    PcAsset.current_user,
+    PcAsset.location,
+    PcAsset.updated_at,
+    PcAsset.version,
+    PcAsset.next_plan_date,
+    PcAsset.next_plan_id,
+    PcAsset.open_plan_count,
+)
+ASSET_LIST_PLAN_COLUMNS = (
+    PcPlan.id,
+    PcPlan.entity_id,
+    PcPlan.title,
+    PcPlan.planned_date,
+    PcPlan.planned_owner,
+    PcPlan.plan_status,
+    PcPlan.version,
+)
+PlanLike = PcPlan | Row
 
-def _build_assets_context(
-    request: Request,
-    db: Session,
+# 一覧の行HTMLのキャッシュ。資産・予定が変わらない行は再描画しない
+row_cache = FragmentCache(settings.row_cache_size)
+
+
+def _asset_list_query(
     status: str | None,
     asset_keyword: str | None,
     location: str | None,
@@ -34,64 +82,123 @@ def _build_assets_context(
     planned_owner: str | None,
     overdue_only: bool,
     today_only: bool,
-    next_plan_limit: int,
+    *,
+    today: date,
+    limit: int,
 ):
-    query = db.query(PcAsset)
+    """資産一覧の SELECT。予定の条件も pc_assets の予定の要約（と EXISTS）で絞り込み、LIMIT は絞り込み後に掛かる。"""
+    query = select(*ASSET_LIST_COLUMNS)
     if status:
-        query = query.filter(PcAsset.status == status)
+        query = query.where(PcAsset.status == status)
     if asset_keyword:
-        query = query.filter(
+        query = query.where(
             or_(
                 PcAsset.asset_tag.contains(asset_keyword),
                 PcAsset.serial_no.contains(asset_keyword),
             )
         )
     if location:
-        query = query.filter(PcAsset.location.contains(location))
+        query = query.where(PcAsset.location.contains(location))
     if current_user:
-        query = query.filter(PcAsset.current_user.contains(current_user))
-
-    assets = query.order_by(PcAsset.id.desc()).limit(200).all()
-
-    asset_ids = [asset.id for asset in assets]
-    plans_by_asset: dict[int, list[PcPlan]] = {asset_id: [] for asset_id in asset_ids}
-    if asset_ids:
-        plans = (
-            db.query(PcPlan)
-            .filter(PcPlan.entity_type == "ASSET")
-            .filter(PcPlan.entity_id.in_(asset_ids))
-            .all()
+        query = query.where(PcAsset.current_user.contains(current_user))
+    if planned_owner and planned_owner.strip():
+        query = query.where(planned_by(planned_owner.strip()))
+    if overdue_only:
+        query = query.where(overdue_assets(today))
+    if today_only:
+        query = query.where(today_assets(today))
+    return query.order_by(PcAsset.id.desc()).limit(limit)
+
+
+def _load_asset_plans(db: Session, assets: list[Row], next_plan_limit: int) -> dict[int, list[PlanLike]]:
+    """表示に使う予定を読む。1件なら next_plan_id の主キーで、複数件なら予定日のある予定の資産だけ読む。
+
+    複数件のときは状態で絞らない（状態の条件を付けると ix_pc_plans_status_date の範囲検索が選ばれるため、
+    ix_pc_plans_entity で資産ごとに読み、_select_next_plans で状態を見る）。
+    """
+    plans_by_asset: dict[int, list[PlanLike]] = {asset.id: [] for asset in assets}
+    planned = [asset for asset in assets if asset.next_plan_id is not None]
+    if not planned:
+        return plans_by_asset
+    query = select(*ASSET_LIST_PLAN_COLUMNS)
+    if next_plan_limit == 1:
+        query = query.where(PcPlan.id.in_([asset.next_plan_id for asset in planned]))
+    else:
+        query = query.where(PcPlan.entity_type == PlanEntityType.ASSET).where(
+            PcPlan.entity_id.in_([asset.id for asset in planned])
         )
-        for plan in plans:
-            plans_by_asset.setdefault(plan.entity_id, []).append(plan)
+    for plan in db.execute(query).all():
+        if plan.entity_id in plans_by_asset:
+            plans_by_asset[plan.entity_id].append(plan)
+    return plans_by_asset
+
+
+def _annotate_assets(
+    db: Session,
+    assets: list[Row],
+    *,
+    next_plan_limit: int,
+    today: date,
+) -> dict:
+    """資産の行（一覧全体またはストリーミング時の1区画）に次の予定と期限超過/今日の予定の印を付ける。
+
+    印は pc_assets の予定の要約で決める。次の予定（最も早い予定）が期限超過の資産だけは、ほかに今日の予定が
+    あるかを予定から確認する（予定が1件だけなら確認しない）。
+    """
+    asset_plans = _load_asset_plans(db, assets, next_plan_limit)
+    next_plans = {asset_id: _select_next_plans(plans, limit=next_plan_limit) for asset_id, plans in asset_plans.items()}
+    overdue_flags = {asset.id: asset.next_plan_date is not None and asset.next_plan_date < today for asset in assets}
+    if next_plan_limit == 1:
+        unknown = [asset.id for asset in assets if overdue_flags[asset.id] and asset.open_plan_count > 1]
+        planned_today = planned_today_ids(db, unknown, today)
+    else:
+        planned_today = {
+            asset_id
+            for asset_id, plans in asset_plans.items()
+            if any(plan.plan_status == PlanStatus.PLANNED and plan.planned_date == today for plan in plans)
+        }
+    today_flags = {asset.id: asset.next_plan_date == today or asset.id in planned_today for asset in assets}
+    return {
+        "assets": assets,
+        "next_plans": next_plans,
+        "overdue_flags": overdue_flags,
+        "today_flags": today_flags,
+        "plan_revisions": {asset_id: _plan_revision(plans) for asset_id, plans in next_plans.items()},
+    }
+
 
+def _build_assets_context(
+    request: Request,
+    db: Session,
+    status: str | None,
+    asset_keyword: str | None,
+    location: str | None,
+    current_user: str | None,
+    planned_owner: str | None,
+    overdue_only: bool,
+    today_only: bool,
+    next_plan_limit: int,
+    *,
+    stream_session: Session | None = None,
+):
+    """一覧の表示内容を組み立てる。
+
+    stream_session を渡すと、資産はサーバ側カーソルで区画ごとに読み、行HTMLを遅延生成する
+    （asset_rows が CountingIterator になり、assets は含まない）。
+    """
     today = date.today()
-    next_plans: dict[int, list[PcPlan]] = {}
-    overdue_flags: dict[int, bool] = {}
-    today_flags: dict[int, bool] = {}
-
-    for asset_id, plans in plans_by_asset.items():
-        next_plans[asset_id] = _select_next_plans(plans, limit=next_plan_limit)
-        overdue_flags[asset_id] = _has_overdue_plan(plans, today)
-        today_flags[asset_id] = _has_today_plan(plans, today)
-
-    filtered_assets: list[PcAsset] = []
-    for asset in assets:
-        plans = plans_by_asset.get(asset.id, [])
-        if planned_owner:
-            if not _matches_planned_owner(plans, planned_owner):
-                continue
-        if overdue_only and not overdue_flags.get(asset.id, False):
-            continue
-        if today_only and not today_flags.get(asset.id, False):
-            continue
-        filtered_assets.append(asset)
-
-    if filtered_assets is not assets:
-        asset_ids = [asset.id for asset in filtered_assets]
-        next_plans = {asset_id: next_plans.get(asset_id, []) for asset_id in asset_ids}
-        overdue_flags = {asset_id: overdue_flags.get(asset_id, False) for asset_id in asset_ids}
-        today_flags = {asset_id: today_flags.get(asset_id, False) for asset_id in asset_ids}
+    query = _asset_list_query(
+        status,
+        asset_keyword,
+        location,
+        current_user,
+        planned_owner,
+        overdue_only,
+        today_only,
+        today=today,
+        limit=settings.list_row_limit,
+    )
+    annotate_options = {"next_plan_limit": next_plan_limit, "today": today}
 
     filter_summary = _build_filter_summary(
         status=status,
@@ -103,12 +210,7 @@ def _build_assets_context(
         today_only=today_only,
         next_plan_limit=next_plan_limit,
     )
-
-    return {
-        "assets": filtered_assets,
-        "next_plans": next_plans,
-        "overdue_flags": overdue_flags,
-        "today_flags": today_flags,
+    context = {
         "today": today,
         "filters": {
             "status": status or "",
@@ -123,6 +225,119 @@ def _build_assets_context(
         "filter_summary": filter_summary,
     }
 
+    if stream_session is not None:
+
+        def stream_rows():
+            for partition in iter_partitions(stream_session, query):
+                annotated = _annotate_assets(stream_session, partition, **annotate_options)
+                yield from _render_asset_rows(request, annotated, today=today, next_plan_limit=next_plan_limit)
+
+        return {**context, "streaming": True, "asset_rows": CountingIterator(stream_rows())}
+
+    assets = db.execute(query).all()
+    return {**context, **_annotate_assets(db, assets, **annotate_options)}
+
+
+def _build_asset_row_context(db: Session, asset_id: int, next_plan_limit: int) -> dict | None:
+    """一覧の1行ぶんだけを組み立てる。行断片の応答で使う（一覧全体は再取得しない）。"""
+    asset = db.execute(select(*ASSET_LIST_COLUMNS).where(PcAsset.id == asset_id)).first()
+    if asset is None:
+        return None
+    today = date.today()
+    annotated = _annotate_assets(db, [asset], next_plan_limit=next_plan_limit, today=today)
+    return {
+        "asset": asset,
+        "next_plans": annotated["next_plans"],
+        "overdue_flags": annotated["overdue_flags"],
+        "today_flags": annotated["today_flags"],
+        "today": today,
+        "next_plan_limit": next_plan_limit,
+        "status_labels": ASSET_STATUS_LABELS,
+    }
+
+
+def _asset_row_response(request: Request, db: Session, asset_id: int, next_plan_limit: int):
+    context = _build_asset_row_context(db, asset_id, max(1, min(3, next_plan_limit)))
+    if context is None:
+        return fragment_error(request, "対象の資産が見つかりません。", status_code=404)
+    return row_fragment(request, "_asset_row.html", context)
+
+
+def _row_action_done(
+    request: Request,
+    db: Session,
+    asset_id: int,
+    next_plan_limit: int,
+    *,
+    message: str,
+    location: str,
+):
+    if wants_fragment(request):
+        return _asset_row_response(request, db, asset_id, next_plan_limit)
+    add_flash(request.session, "success", message)
+    return RedirectResponse(url=location, status_code=303)
+
+
+def _row_action_error(request: Request, message: str, *, status_code: int, location: str):
+    if wants_fragment(request):
+        return fragment_error(request, message, status_code=status_code)
+    add_flash(request.session, "error", message)
+    return RedirectResponse(url=location, status_code=303)
+
+
+def _replayed_row(request: Request, db: Session, replay, asset_id: int, next_plan_limit: int):
+    """処理済みキーの再送。行断片モードなら現在の行を返す（キー不一致の 422 はそのまま）。"""
+    if not wants_fragment(request) or REPLAYED_HEADER not in replay.headers:
+        return replay
+    response = _asset_row_response(request, db, asset_id, next_plan_limit)
+    response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+
+def _plan_revision(plans: list[PlanLike]) -> tuple[tuple[int, int], ...]:
+    """表示する予定の入れ替え・更新（version の増加）で変わる値。行キャッシュのキーに使う。"""
+    return tuple(sorted((plan.id, plan.version) for plan in plans))
+
+
+def _render_asset_rows(
+    request: Request,
+    annotated: dict,
+    *,
+    today: date,
+    next_plan_limit: int,
+) -> Iterator[Markup]:
+    """一覧の各行を描画する。
+
+    (資産ID, 更新日時, version, 予定の件数, 予定リビジョン, 期限超過/今日の予定の印, 今日, 表示件数) が同じ行は
+    キャッシュを使う。予定の要約の更新では資産の version は変わらないため、要約から決まる値もキーに含める。
+    """
+    template = request.app.state.templates.env.get_template("_asset_row.html")
+    row_context = {
+        "next_plans": annotated["next_plans"],
+        "overdue_flags": annotated["overdue_flags"],
+        "today_flags": annotated["today_flags"],
+        "today": today,
+        "next_plan_limit": next_plan_limit,
+        "status_labels": ASSET_STATUS_LABELS,
+        "idempotency_token": placeholder_token,
+    }
+    for asset in annotated["assets"]:
+        # テンプレートが再読み込みされた場合（開発時）も別キーになるようテンプレート自体をキーに含める
+        key = (
+            template,
+            asset.id,
+            asset.updated_at,
+            asset.version,
+            asset.open_plan_count,
+            annotated["plan_revisions"].get(asset.id, ()),
+            annotated["overdue_flags"].get(asset.id, False),
+            annotated["today_flags"].get(asset.id, False),
+            today,
+            next_plan_limit,
+        )
+        html = row_cache.get_or_render(key, lambda: template.render(row_context, asset=asset))
+        yield Markup(fill_tokens(html))
+
 
 def _parse_date(value: str | None) -> date | None:
     if value is None:
@@ -136,7 +351,7 @@ def _parse_date(value: str | None) -> date | None:
         return None
 
 
-def _select_next_plans(plans: list[PcPlan], *, limit: int = 3) -> list[PcPlan]:
+def _select_next_plans(plans: list[PlanLike], *, limit: int = 3) -> list[PlanLike]:
     candidates = [
         plan
         for plan in plans
@@ -148,31 +363,6 @@ def _select_next_plans(plans: list[PcPlan], *, limit: int = 3) -> list[PcPlan]:
     return ordered[:limit]
 
 
-def _has_overdue_plan(plans: list[PcPlan], today: date) -> bool:
-    return any(
-        plan.plan_status == PlanStatus.PLANNED
-        and plan.planned_date is not None
-        and plan.planned_date < today
-        for plan in plans
-    )
-
-
-def _has_today_plan(plans: list[PcPlan], today: date) -> bool:
-    return any(
-        plan.plan_status == PlanStatus.PLANNED
-        and plan.planned_date is not None
-        and plan.planned_date == today
-        for plan in plans
-    )
-
-
-def _matches_planned_owner(plans: list[PcPlan], planned_owner: str) -> bool:
-    target = planned_owner.strip()
-    if not target:
-        return True
-    return any(target in (plan.planned_owner or "") for plan in plans)
-
-
 def _build_filter_summary(
     *,
     status: str | None,
@@ -238,10 +428,11 @@ async def assets(
     db: Session = Depends(get_db),
 ):
     safe_limit = max(1, min(3, next_plan_limit))
-    if status or asset_keyword or location or current_user or planned_owner or overdue_only or today_only or next_plan_limit:
+    if status or asset_keyword or location or current_user or planned_owner or overdue_only or today_only or next_plan_limit != 1:
         add_flash(request.session, "success", "フィルタを適用しました。")
 
     flashes = consume_flash(request.session)
+    stream_session = open_stream_session(db) if settings.stream_lists else None
     context = _build_assets_context(
         request,
         db,
@@ -253,16 +444,15 @@ async def assets(
         overdue_only,
         today_only,
         safe_limit,
+        stream_session=stream_session,
     )
-    return request.app.state.templates.TemplateResponse(
-        request,
-        "assets.html",
-        {
-            "flashes": flashes,
-            **context,
-            "status_labels": ASSET_STATUS_LABELS,
-        },
+    page_context = {"flashes": flashes, **context, "status_labels": ASSET_STATUS_LABELS}
+    if stream_session is not None:
+        return stream_template(request, "assets.html", page_context, session=stream_session)
+    page_context["asset_rows"] = list(
+        _render_asset_rows(request, context, today=context["today"], next_plan_limit=safe_limit)
     )
+    return request.app.state.templates.TemplateResponse(request, "assets.html", page_context)
 
 
 @router.post("/assets/{asset_id}/transition")
@@ -271,12 +461,23 @@ async def asset_transition(
     asset_id: int,
     to_status: str = Form(...),
     reason: str | None = Form(None),
+    version: str | None = Form(None),
+    idempotency_key: str | None = Form(None),
+    next_plan_limit: int = Form(1),
     db: Session = Depends(get_db),
 ):
+    fragment = wants_fragment(request)
+    key = get_idempotency_key(request, idempotency_key)
+    replay = replay_response(db, request, key, flash=not fragment)
+    if replay is not None:
+        return _replayed_row(request, db, replay, asset_id, next_plan_limit)
     asset = db.query(PcAsset).filter(PcAsset.id == asset_id).first()
     if asset is None:
-        add_flash(request.session, "error", "対象の資産が見つかりません。")
-        return RedirectResponse(url="/assets", status_code=303)
+        return _row_action_error(request, "対象の資産が見つかりません。", status_code=404, location="/assets")
+    try:
+        ensure_version(asset, version)
+    except VersionConflictError:
+        return conflict_response(request, entity="asset", entity_id=asset_id, back_url=f"/assets/{asset_id}")
 
     actor = request.session.get("user_id") or "system"
 
@@ -284,24 +485,20 @@ async def asset_transition(
     try:
         apply_asset_transition(from_status=from_status, to_status=to_status, actor=actor)
     except TransitionError:
-        add_flash(request.session, "error", "状態遷移が許可されていません。")
-        flashes = consume_flash(request.session)
-        context = _build_assets_context(
-            request,
-            db,
-            None,
-            None,
-            None,
-            None,
-            None,
-            False,
-            False,
-            1,
-        )
+        # 一覧全体を組み立て直さず、エラー断片（JS なしは小さなエラー画面）だけを返す
+        message = "状態遷移が許可されていません。"
+        if fragment:
+            return fragment_error(request, message, status_code=409)
+        add_flash(request.session, "error", message)
         return request.app.state.templates.TemplateResponse(
             request,
-            "assets.html",
-            {"flashes": flashes, **context, "status_labels": ASSET_STATUS_LABELS},
+            "conflict.html",
+            {
+                "flashes": consume_flash(request.session),
+                "heading": "状態遷移エラー",
+                "lead": "選択した状態へは遷移できません。",
+                "back_url": f"/assets/{asset_id}",
+            },
             status_code=409,
         )
 
@@ -315,10 +512,18 @@ async def asset_transition(
         reason=reason,
     )
     db.add(history)
-    db.commit()
-
-    add_flash(request.session, "success", "状態を更新しました。")
-    return RedirectResponse(url="/assets", status_code=303)
+    remember_outcome(db, request, key, location="/assets")
+    try:
+        db.commit()
+    except (StaleDataError, IntegrityError):
+        replay = replay_after_failure(db, request, key, flash=not fragment)
+        if replay is not None:
+            return _replayed_row(request, db, replay, asset_id, next_plan_limit)
+        return conflict_response(request, entity="asset", entity_id=asset_id, back_url=f"/assets/{asset_id}")
+
+    return _row_action_done(
+        request, db, asset_id, next_plan_limit, message="状態を更新しました。", location="/assets"
+    )
 
 
 @router.post("/assets/{asset_id}/plans")
@@ -328,17 +533,24 @@ async def asset_plan_add(
     title: str = Form(""),
     planned_date: str | None = Form(None),
     planned_owner: str | None = Form(None),
+    idempotency_key: str | None = Form(None),
+    next_plan_limit: int = Form(1),
     db: Session = Depends(get_db),
 ):
+    fragment = wants_fragment(request)
+    key = get_idempotency_key(request, idempotency_key)
+    replay = replay_response(db, request, key, flash=not fragment)
+    if replay is not None:
+        return _replayed_row(request, db, replay, asset_id, next_plan_limit)
     asset = db.query(PcAsset).filter(PcAsset.id == asset_id).first()
     if asset is None:
-        add_flash(request.session, "error", "対象の資産が見つかりません。")
-        return RedirectResponse(url="/assets", status_code=303)
+        return _row_action_error(request, "対象の資産が見つかりません。", status_code=404, location="/assets")
 
     planned_date_value = _parse_date(planned_date)
     if planned_date_value is None:
-        add_flash(request.session, "error", "❌ 予定日が未入力です。カレンダーで選んでください。")
-        return RedirectResponse(url="/assets", status_code=303)
+        return _row_action_error(
+            request, "❌ 予定日が未入力です。カレンダーで選んでください。", status_code=422, location="/assets"
+        )
 
     actor = request.session.get("user_id") or "system"
     plan = PcPlan(
@@ -361,13 +573,20 @@ async def asset_plan_add(
             actual_owner=plan.actual_owner,
         )
     except PlanValidationError as exc:
-        add_flash(request.session, "error", str(exc))
-        return RedirectResponse(url="/assets", status_code=303)
+        return _row_action_error(request, str(exc), status_code=422, location="/assets")
 
     db.add(plan)
-    db.commit()
-    add_flash(request.session, "success", "予定を追加しました。")
-    return RedirectResponse(url="/assets", status_code=303)
+    remember_outcome(db, request, key, location="/assets")
+    try:
+        db.commit()
+    except IntegrityError:
+        replay = replay_after_failure(db, request, key, flash=not fragment)
+        if replay is not None:
+            return _replayed_row(request, db, replay, asset_id, next_plan_limit)
+        raise
+    return _row_action_done(
+        request, db, asset_id, next_plan_limit, message="予定を追加しました。", location="/assets"
+    )
 
 
 @router.post("/assets/{asset_id}/plans/{plan_id}/done")
@@ -378,6 +597,8 @@ async def asset_plan_done(
     actual_date: str | None = Form(None),
     result_note: str | None = Form(None),
     actual_owner: str | None = Form(None),
+    version: str | None = Form(None),
+    next_plan_limit: int = Form(1),
     db: Session = Depends(get_db),
 ):
     plan = (
@@ -388,13 +609,17 @@ async def asset_plan_done(
         .first()
     )
     if plan is None:
-        add_flash(request.session, "error", "対象の予定が見つかりません。")
-        return RedirectResponse(url="/assets", status_code=303)
+        return _row_action_error(request, "対象の予定が見つかりません。", status_code=404, location="/assets")
+    try:
+        ensure_version(plan, version)
+    except VersionConflictError:
+        return conflict_response(request, entity="plan", entity_id=plan_id, back_url=f"/assets/{asset_id}")
 
     actual_date_value = _parse_date(actual_date)
     if actual_date_value is None:
-        add_flash(request.session, "error", "❌ 実績日が未入力です。カレンダーで選んでください。")
-        return RedirectResponse(url="/assets", status_code=303)
+        return _row_action_error(
+            request, "❌ 実績日が未入力です。カレンダーで選んでください。", status_code=422, location="/assets"
+        )
 
     actor = request.session.get("user_id") or "system"
     plan.plan_status = PlanStatus.DONE
@@ -411,12 +636,16 @@ async def asset_plan_done(
             actual_owner=plan.actual_owner,
         )
     except PlanValidationError as exc:
-        add_flash(request.session, "error", str(exc))
-        return RedirectResponse(url="/assets", status_code=303)
+        return _row_action_error(request, str(exc), status_code=422, location="/assets")
 
-    db.commit()
-    add_flash(request.session, "success", "次の予定を完了しました。")
-    return RedirectResponse(url="/assets", status_code=303)
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        return conflict_response(request, entity="plan", entity_id=plan_id, back_url=f"/assets/{asset_id}")
+    return _row_action_done(
+        request, db, asset_id, next_plan_limit, message="次の予定を完了しました。", location="/assets"
+    )
 
 
 @router.post("/assets/{asset_id}/plans/{plan_id}/cancel")
@@ -424,6 +653,8 @@ async def asset_plan_cancel(
     request: Request,
     asset_id: int,
     plan_id: int,
+    version: str | None = Form(None),
+    next_plan_limit: int = Form(1),
     db: Session = Depends(get_db),
 ):
     plan = (
@@ -434,8 +665,13 @@ async def asset_plan_cancel(
         .first()
     )
     if plan is None:
-        add_flash(request.session, "error", "対象の予定が見つかりません。")
-        return RedirectResponse(url=f"/assets/{asset_id}", status_code=303)
+        return _row_action_error(
+            request, "対象の予定が見つかりません。", status_code=404, location=f"/assets/{asset_id}"
+        )
+    try:
+        ensure_version(plan, version)
+    except VersionConflictError:
+        return conflict_response(request, entity="plan", entity_id=plan_id, back_url=f"/assets/{asset_id}")
 
     plan.plan_status = PlanStatus.CANCELLED
     plan.actual_date = None
@@ -450,12 +686,16 @@ async def asset_plan_cancel(
             actual_owner=plan.actual_owner,
         )
     except PlanValidationError as exc:
-        add_flash(request.session, "error", str(exc))
-        return RedirectResponse(url=f"/assets/{asset_id}", status_code=303)
+        return _row_action_error(request, str(exc), status_code=422, location=f"/assets/{asset_id}")
 
-    db.commit()
-    add_flash(request.session, "success", "予定を中止しました。")
-    return RedirectResponse(url=f"/assets/{asset_id}", status_code=303)
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        return conflict_response(request, entity="plan", entity_id=plan_id, back_url=f"/assets/{asset_id}")
+    return _row_action_done(
+        request, db, asset_id, next_plan_limit, message="予定を中止しました。", location=f"/assets/{asset_id}"
+    )
 
 
 @router.get("/assets/new")
@@ -487,8 +727,14 @@ async def asset_create(
     current_user: str | None = Form(None),
     location: str | None = Form(None),
     notes: str | None = Form(None),
+    idempotency_key: str | None = Form(None),
     db: Session = Depends(get_db),
 ):
+    key = get_idempotency_key(request, idempotency_key)
+    replay = replay_response(db, request, key)
+    if replay is not None:
+        return replay
+
     try:
         validate_asset_integrity(
             asset_tag=asset_tag,
@@ -526,9 +772,13 @@ async def asset_create(
     )
     db.add(asset)
     try:
+        db.flush()
+        remember_outcome(db, request, key, location=f"/assets/{asset.id}")
         db.commit()
     except IntegrityError:
-        db.rollback()
+        replay = replay_after_failure(db, request, key)
+        if replay is not None:
+            return replay
         add_flash(request.session, "error", "資産タグまたはシリアルが重複しています。")
         return _render_asset_form(
             request,
@@ -566,12 +816,17 @@ async def asset_update(
     current_user: str | None = Form(None),
     location: str | None = Form(None),
     notes: str | None = Form(None),
+    version: str | None = Form(None),
     db: Session = Depends(get_db),
 ):
     asset = db.query(PcAsset).filter(PcAsset.id == asset_id).first()
     if asset is None:
         add_flash(request.session, "error", "対象の資産が見つかりません。")
         return RedirectResponse(url="/assets", status_code=303)
+    try:
+        ensure_version(asset, version)
+    except VersionConflictError:
+        return conflict_response(request, entity="asset", entity_id=asset_id, back_url=f"/assets/{asset_id}")
 
     try:
         validate_asset_integrity(
@@ -608,6 +863,9 @@ async def asset_update(
 
     try:
         db.commit()
+    except StaleDataError:
+        db.rollback()
+        return conflict_response(request, entity="asset", entity_id=asset_id, back_url=f"/assets/{asset_id}")
     except IntegrityError:
         db.rollback()
         add_flash(request.session, "error", "資産タグまたはシリアルが重複しています。")
@@ -624,44 +882,84 @@ async def asset_update(
 
 @router.get("/assets/{asset_id}")
 async def asset_detail(request: Request, asset_id: int, db: Session = Depends(get_db)):
+    etag = detail_etag(request, asset_revision(db, asset_id))
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
     asset = db.query(PcAsset).filter(PcAsset.id == asset_id).first()
     if asset is None:
         add_flash(request.session, "error", "対象の資産が見つかりません。")
         return RedirectResponse(url="/assets", status_code=303)
 
     targets = list_allowed_asset_targets(asset.status)
-
-    plans = (
-        db.query(PcPlan)
-        .filter(PcPlan.entity_type == "ASSET")
-        .filter(PcPlan.entity_id == asset_id)
-        .order_by(PcPlan.planned_date.desc(), PcPlan.id.desc())
-        .all()
-    )
-
-    history = (
-        db.query(PcStatusHistory)
-        .filter(PcStatusHistory.entity_type == "ASSET")
-        .filter(PcStatusHistory.entity_id == asset_id)
-        .order_by(PcStatusHistory.changed_at.desc())
-        .all()
-    )
+    limit = settings.detail_page_size
+    plans = plan_page(db, entity_type="ASSET", entity_id=asset_id, limit=limit)
+    history = history_page(db, entity_type="ASSET", entity_id=asset_id, limit=limit)
 
     flashes = consume_flash(request.session)
-    return request.app.state.templates.TemplateResponse(
+    response = request.app.state.templates.TemplateResponse(
         request,
         "asset_detail.html",
         {
             "flashes": flashes,
             "asset": asset,
-            "history": history,
+            "asset_id": asset.id,
+            "history": history.items,
+            "history_next_url": page_url(f"/assets/{asset_id}/history", history.next_cursor),
             "status_labels": ASSET_STATUS_LABELS,
             "plan_status_labels": PLAN_STATUS_LABELS,
-            "plans": plans,
+            "plans": plans.items,
+            "plans_next_url": page_url(f"/assets/{asset_id}/plans", plans.next_cursor),
             "targets": targets,
             "today": date.today(),
         },
     )
+    return with_etag(response, etag)
+
+
+@router.get("/assets/{asset_id}/history")
+async def asset_history_fragment(
+    request: Request,
+    asset_id: int,
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+):
+    try:
+        page = history_page(
+            db, entity_type="ASSET", entity_id=asset_id, limit=settings.detail_page_size, cursor=cursor
+        )
+    except InvalidCursorError:
+        return PlainTextResponse("カーソルが不正です。", status_code=400)
+    return fragment_response(
+        request,
+        "_history_rows.html",
+        {"history": page.items, "status_labels": ASSET_STATUS_LABELS},
+        next_url=page_url(f"/assets/{asset_id}/history", page.next_cursor),
+    )
+
+
+@router.get("/assets/{asset_id}/plans")
+async def asset_plans_fragment(
+    request: Request,
+    asset_id: int,
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+):
+    try:
+        page = plan_page(db, entity_type="ASSET", entity_id=asset_id, limit=settings.detail_page_size, cursor=cursor)
+    except InvalidCursorError:
+        return PlainTextResponse("カーソルが不正です。", status_code=400)
+    return fragment_response(
+        request,
+        "_asset_plan_rows.html",
+        {
+            "plans": page.items,
+            "asset_id": asset_id,
+            "plan_status_labels": PLAN_STATUS_LABELS,
+            "today": date.today(),
+        },
+        next_url=page_url(f"/assets/{asset_id}/plans", page.next_cursor),
+    )
 
 
 @router.post("/assets/{asset_id}/delete")
@@ -671,6 +969,8 @@ async def asset_delete(request: Request, asset_id: int, db: Session = Depends(ge
         add_flash(request.session, "error", "対象の資産が見つかりません。")
         return RedirectResponse(url="/assets", status_code=303)
 
+    # 予定は外部キーで結べないため、対象と同じトランザクションで削除して孤立させない
+    delete_target_plans(db, PlanEntityType.ASSET, asset_id)
     db.delete(asset)
     try:
         db.commit()
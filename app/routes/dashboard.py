@@ -19,6 +19,7 @@ from app.models import (
     PlanStatus,
     RequestStatus,
 )
+from app.overdue import overdue_condition
 from app.utils import consume_flash
 
 router = APIRouter()
@@ -43,13 +44,7 @@ async def dashboard(request: Request, db: Session = Depends(get_db)) -> Any:
         .all()
     )
     today = date.today()
-    overdue_count = (
-        db.query(func.count(PcPlan.id))
-        .filter(PcPlan.plan_status == PlanStatus.PLANNED)
-        .filter(PcPlan.planned_date.isnot(None))
-        .filter(PcPlan.planned_date < today)
-        .scalar()
-    )
+    overdue_count = db.query(func.count(PcPlan.id)).filter(overdue_condition(db, today)).scalar()
 
     asset_summary = {ASSET_STATUS_LABELS[status.value]: 0 for status in AssetStatus}
     for status, count in asset_counts:
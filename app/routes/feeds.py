@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from datetime import date
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import PlainTextResponse, Response
+from sqlalchemy.orm import Session
+
+from app.conditional import is_not_modified
+from app.db import get_db
+from app.plan_feed import (
+    calendar_name,
+    feed_etag,
+    feed_query,
+    feed_revision,
+    iter_calendar,
+    verify_feed_token,
+)
+from app.streaming import iter_rows, open_stream_session, stream_chunks
+
+router = APIRouter()
+
+ICS_MEDIA_TYPE = "text/calendar; charset=utf-8"
+
+
+@router.get("/feeds/plans.ics")
+async def plans_feed(
+    request: Request,
+    owner: str = "",
+    location: str = "",
+    token: str | None = None,
+    db: Session = Depends(get_db),
+):
+    """カレンダーアプリ向けの予定フィード。ログインの代わりに URL の署名で許可する。"""
+    owner, location = owner.strip(), location.strip()
+    if not verify_feed_token(owner, location, token):
+        return PlainTextResponse("フィードのURLが正しくありません。", status_code=403)
+
+    today = date.today()
+    revision = feed_revision(db, owner, location, today)
+    etag = feed_etag(owner, location, today, revision)
+    # Last-Modified は返さない。日付だけでは予定の削除や期間・絞り込みから外れたことを検知できないため、
+    # 再検証は件数も含む ETag（If-None-Match）だけで行う
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    stream_session = open_stream_session(db)
+    rows = iter_rows(stream_session, feed_query(owner, location, today))
+    return stream_chunks(
+        iter_calendar(rows, name=calendar_name(owner, location), base_url=str(request.base_url)),
+        session=stream_session,
+        media_type=ICS_MEDIA_TYPE,
+        headers={**headers, "Content-Disposition": 'inline; filename="plans.ics"'},
+        path=request.url.path,
+    )
@@ -1,16 +1,46 @@
 from datetime import date, datetime, timezone
 
 from fastapi import APIRouter, Depends, Form, Request
-from fastapi.responses import RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
+from app.conditional import detail_etag, is_not_modified, not_modified_response, plan_revision, with_etag
+from app.config import get_settings
+from app.concurrency import StaleDataError, VersionConflictError, conflict_response, ensure_version
 from app.db import get_db
-from app.models import PLAN_STATUS_LABELS, PcPlan, PlanStatus
+from app.idempotency import get_idempotency_key, remember_outcome, replay_after_failure, replay_response
+from app.models import PLAN_ENTITY_LABELS, PLAN_STATUS_LABELS, PcAsset, PcPlan, PcRequest, PlanEntityType, PlanStatus
+from app.overdue import overdue_condition
+from app.plan_calendar import VIEWS, CalendarRangeError, build_weeks, calendar_range, day_counts, shift
+from app.plan_feed import feed_url
 from app.plan_rules import PlanValidationError, validate_plan_integrity
+from app.plan_targets import ensure_target_exists, parse_entity_type, target_condition
+from app.streaming import CountingIterator, iter_rows, open_stream_session, stream_template
 from app.utils import add_flash, consume_flash
 
 router = APIRouter()
+settings = get_settings()
+
+PLAN_LIST_COLUMNS = (
+    PcPlan.id,
+    PcPlan.entity_type,
+    PcPlan.entity_id,
+    PcPlan.title,
+    PcPlan.planned_date,
+    PcPlan.planned_owner,
+    PcPlan.version,
+)
+
+# 予定検索は資産/要求の両方へ外部結合し、種別を問わず1回の SELECT で対象名まで取得する
+PLAN_SEARCH_COLUMNS = (
+    *PLAN_LIST_COLUMNS,
+    PcPlan.plan_status,
+    func.coalesce(PcAsset.id, PcRequest.id).label("target_id"),
+    PcAsset.asset_tag.label("asset_tag"),
+    PcRequest.requester.label("requester"),
+)
 
 
 def _parse_date(value: str | None) -> date | None:
@@ -34,34 +64,80 @@ def _parse_required_int(value: str | None) -> int:
     number = int(text)
     return number if number > 0 else 0
 
+
 def _build_plans_context(
     request: Request,
     db: Session,
     planned_owner: str | None,
     title: str | None,
+    *,
+    stream_session: Session | None = None,
 ):
+    """期限超過予定の一覧を組み立てる。stream_session を渡すと plans はサーバ側カーソルの遅延イテレータになる。"""
     today = date.today()
-    query = (
-        db.query(PcPlan)
-        .filter(PcPlan.plan_status == PlanStatus.PLANNED)
-        .filter(PcPlan.planned_date.isnot(None))
-        .filter(PcPlan.planned_date < today)
-    )
+    query = select(*PLAN_LIST_COLUMNS).where(overdue_condition(db, today))
     if planned_owner:
-        query = query.filter(PcPlan.planned_owner.contains(planned_owner))
+        query = query.where(PcPlan.planned_owner.contains(planned_owner))
     if title:
-        query = query.filter(PcPlan.title.contains(title))
+        query = query.where(PcPlan.title.contains(title))
 
-    plans = query.order_by(PcPlan.planned_date.asc(), PcPlan.id.desc()).limit(200).all()
+    query = query.order_by(PcPlan.planned_date.asc(), PcPlan.id.desc()).limit(settings.list_row_limit)
 
-    return {
-        "plans": plans,
+    context = {
         "today": today,
         "filters": {
             "planned_owner": planned_owner or "",
             "title": title or "",
         },
+        "entity_labels": PLAN_ENTITY_LABELS,
     }
+    if stream_session is not None:
+        return {**context, "streaming": True, "plans": CountingIterator(iter_rows(stream_session, query))}
+    return {**context, "plans": db.execute(query).all()}
+
+
+def _build_plan_search_context(
+    db: Session,
+    filters: dict[str, str],
+    *,
+    stream_session: Session | None = None,
+):
+    """種別を横断した予定検索。対象（資産番号/申請者）での絞り込みも結合先の列で行う。"""
+    query = (
+        select(*PLAN_SEARCH_COLUMNS)
+        .select_from(PcPlan)
+        .outerjoin(PcAsset, target_condition(PlanEntityType.ASSET))
+        .outerjoin(PcRequest, target_condition(PlanEntityType.REQUEST))
+    )
+    if filters["entity_type"] in PLAN_ENTITY_LABELS:
+        query = query.where(PcPlan.entity_type == PlanEntityType(filters["entity_type"]))
+    if filters["plan_status"] in PLAN_STATUS_LABELS:
+        query = query.where(PcPlan.plan_status == PlanStatus(filters["plan_status"]))
+    if filters["target"]:
+        query = query.where(
+            PcAsset.asset_tag.contains(filters["target"]) | PcRequest.requester.contains(filters["target"])
+        )
+    if filters["planned_owner"]:
+        query = query.where(PcPlan.planned_owner.contains(filters["planned_owner"]))
+    if filters["title"]:
+        query = query.where(PcPlan.title.contains(filters["title"]))
+    date_from = _parse_date(filters["date_from"])
+    if date_from is not None:
+        query = query.where(PcPlan.planned_date >= date_from)
+    date_to = _parse_date(filters["date_to"])
+    if date_to is not None:
+        query = query.where(PcPlan.planned_date <= date_to)
+
+    query = query.order_by(PcPlan.planned_date.asc(), PcPlan.id.desc()).limit(settings.list_row_limit)
+
+    context = {
+        "filters": filters,
+        "entity_labels": PLAN_ENTITY_LABELS,
+        "status_labels": PLAN_STATUS_LABELS,
+    }
+    if stream_session is not None:
+        return {**context, "streaming": True, "plans": CountingIterator(iter_rows(stream_session, query))}
+    return {**context, "plans": db.execute(query).all()}
 
 
 def _render_plan_form(
@@ -85,6 +161,36 @@ def _render_plan_form(
     )
 
 
+@router.get("/plans")
+async def plans_search(
+    request: Request,
+    entity_type: str | None = None,
+    plan_status: str | None = None,
+    target: str | None = None,
+    planned_owner: str | None = None,
+    title: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    db: Session = Depends(get_db),
+):
+    filters = {
+        "entity_type": (entity_type or "").strip(),
+        "plan_status": (plan_status or "").strip(),
+        "target": (target or "").strip(),
+        "planned_owner": (planned_owner or "").strip(),
+        "title": (title or "").strip(),
+        "date_from": (date_from or "").strip(),
+        "date_to": (date_to or "").strip(),
+    }
+    flashes = consume_flash(request.session)
+    stream_session = open_stream_session(db) if settings.stream_lists else None
+    context = _build_plan_search_context(db, filters, stream_session=stream_session)
+    page_context = {"flashes": flashes, **context}
+    if stream_session is not None:
+        return stream_template(request, "plans.html", page_context, session=stream_session)
+    return request.app.state.templates.TemplateResponse(request, "plans.html", page_context)
+
+
 @router.get("/plans/overdue")
 async def plans_overdue(
     request: Request,
@@ -96,29 +202,98 @@ async def plans_overdue(
         add_flash(request.session, "success", "検索条件を適用しました。")
 
     flashes = consume_flash(request.session)
-    context = _build_plans_context(request, db, planned_owner, title)
+    stream_session = open_stream_session(db) if settings.stream_lists else None
+    context = _build_plans_context(request, db, planned_owner, title, stream_session=stream_session)
+    page_context = {"flashes": flashes, **context, "status_labels": PLAN_STATUS_LABELS}
+    if stream_session is not None:
+        return stream_template(request, "plans_overdue.html", page_context, session=stream_session)
+    return request.app.state.templates.TemplateResponse(request, "plans_overdue.html", page_context)
+
+
+def _calendar_range(view: str, start: str | None):
+    view = view if view in VIEWS else "month"
+    return view, calendar_range(view, start, date.today())
+
+
+@router.get("/plans/calendar")
+async def plans_calendar(
+    request: Request,
+    view: str = "month",
+    start: str | None = None,
+    planned_owner: str | None = None,
+    location: str | None = None,
+    db: Session = Depends(get_db),
+):
+    try:
+        view, (first, last, grid_start, grid_end) = _calendar_range(view, start)
+    except CalendarRangeError as exc:
+        add_flash(request.session, "error", str(exc))
+        view, (first, last, grid_start, grid_end) = _calendar_range(view, None)
+
+    days = day_counts(db, grid_start, grid_end, planned_owner=planned_owner, location=location)
+    flashes = consume_flash(request.session)
     return request.app.state.templates.TemplateResponse(
         request,
-        "plans_overdue.html",
+        "plans_calendar.html",
         {
             "flashes": flashes,
-            **context,
-            "status_labels": PLAN_STATUS_LABELS,
+            "view": view,
+            "first": first,
+            "last": last,
+            "previous": shift(view, first, -1),
+            "next": shift(view, first, 1),
+            "today": date.today(),
+            "weeks": build_weeks(grid_start, grid_end, days),
+            "total": sum(count for day, owners in days.items() if first <= day <= last for count in owners.values()),
+            "filters": {"planned_owner": planned_owner or "", "location": location or ""},
+            "feed_url": feed_url(str(request.base_url), (planned_owner or "").strip(), (location or "").strip()),
         },
     )
 
 
+@router.get("/plans/calendar.json")
+async def plans_calendar_json(
+    view: str = "month",
+    start: str | None = None,
+    planned_owner: str | None = None,
+    location: str | None = None,
+    db: Session = Depends(get_db),
+):
+    try:
+        view, (first, last, _, _) = _calendar_range(view, start)
+    except CalendarRangeError as exc:
+        return JSONResponse({"error": str(exc)}, status_code=400)
+
+    days = day_counts(db, first, last, planned_owner=planned_owner, location=location)
+    return JSONResponse(
+        {
+            "view": view,
+            "start": first.isoformat(),
+            "end": last.isoformat(),
+            "days": [
+                {"date": day.isoformat(), "count": sum(owners.values()), "owners": owners}
+                for day, owners in sorted(days.items())
+            ],
+        }
+    )
+
+
 @router.post("/plans/{plan_id}/done")
 async def plan_done(
     request: Request,
     plan_id: int,
     result_note: str | None = Form(None),
+    version: str | None = Form(None),
     db: Session = Depends(get_db),
 ):
     plan = db.query(PcPlan).filter(PcPlan.id == plan_id).first()
     if plan is None:
         add_flash(request.session, "error", "対象の予定が見つかりません。")
         return RedirectResponse(url="/plans/overdue", status_code=303)
+    try:
+        ensure_version(plan, version)
+    except VersionConflictError:
+        return conflict_response(request, entity="plan", entity_id=plan_id, back_url=f"/plans/{plan_id}")
 
     actor = request.session.get("user_id") or "system"
     plan.plan_status = PlanStatus.DONE
@@ -145,7 +320,11 @@ async def plan_done(
             status_code=409,
         )
 
-    db.commit()
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        return conflict_response(request, entity="plan", entity_id=plan_id, back_url=f"/plans/{plan_id}")
     add_flash(request.session, "success", "予定を完了にしました。")
     return RedirectResponse(url="/plans/overdue", status_code=303)
 
@@ -184,10 +363,16 @@ async def plan_create(
     actual_date: str | None = Form(None),
     actual_owner: str | None = Form(None),
     result_note: str | None = Form(None),
+    idempotency_key: str | None = Form(None),
     db: Session = Depends(get_db),
 ):
+    key = get_idempotency_key(request, idempotency_key)
+    replay = replay_response(db, request, key)
+    if replay is not None:
+        return replay
+
     plan = PcPlan(
-        entity_type=entity_type.strip() or "ASSET",
+        entity_type=entity_type.strip().upper() or "ASSET",
         entity_id=_parse_required_int(entity_id),
         title=title,
         planned_date=_parse_date(planned_date),
@@ -223,11 +408,27 @@ async def plan_create(
             title="予定登録",
         )
 
+    try:
+        plan.entity_type = parse_entity_type(entity_type)
+        ensure_target_exists(db, plan.entity_type, plan.entity_id)
+    except PlanValidationError as exc:
+        add_flash(request.session, "error", str(exc))
+        return _render_plan_form(
+            request,
+            plan=plan,
+            action="/plans",
+            title="予定登録",
+        )
+
     db.add(plan)
     try:
+        db.flush()
+        remember_outcome(db, request, key, location=f"/plans/{plan.id}")
         db.commit()
     except IntegrityError:
-        db.rollback()
+        replay = replay_after_failure(db, request, key)
+        if replay is not None:
+            return replay
         add_flash(request.session, "error", "予定の登録に失敗しました。")
         return _render_plan_form(
             request,
@@ -267,14 +468,18 @@ async def plan_update(
     actual_date: str | None = Form(None),
     actual_owner: str | None = Form(None),
     result_note: str | None = Form(None),
+    version: str | None = Form(None),
     db: Session = Depends(get_db),
 ):
     plan = db.query(PcPlan).filter(PcPlan.id == plan_id).first()
     if plan is None:
         add_flash(request.session, "error", "対象の予定が見つかりません。")
         return RedirectResponse(url="/plans/overdue", status_code=303)
+    try:
+        ensure_version(plan, version)
+    except VersionConflictError:
+        return conflict_response(request, entity="plan", entity_id=plan_id, back_url=f"/plans/{plan_id}")
 
-    plan.entity_type = entity_type.strip() or "ASSET"
     plan.entity_id = _parse_required_int(entity_id)
     plan.title = title
     plan.planned_date = _parse_date(planned_date)
@@ -309,9 +514,24 @@ async def plan_update(
             title="予定編集",
         )
 
+    try:
+        plan.entity_type = parse_entity_type(entity_type)
+        ensure_target_exists(db, plan.entity_type, plan.entity_id)
+    except PlanValidationError as exc:
+        add_flash(request.session, "error", str(exc))
+        return _render_plan_form(
+            request,
+            plan=plan,
+            action=f"/plans/{plan_id}/edit",
+            title="予定編集",
+        )
+
     plan.updated_at = datetime.now(timezone.utc)
     try:
         db.commit()
+    except StaleDataError:
+        db.rollback()
+        return conflict_response(request, entity="plan", entity_id=plan_id, back_url=f"/plans/{plan_id}")
     except IntegrityError:
         db.rollback()
         add_flash(request.session, "error", "予定の更新に失敗しました。")
@@ -328,21 +548,27 @@ async def plan_update(
 
 @router.get("/plans/{plan_id}")
 async def plan_detail(request: Request, plan_id: int, db: Session = Depends(get_db)):
+    etag = detail_etag(request, plan_revision(db, plan_id))
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
     plan = db.query(PcPlan).filter(PcPlan.id == plan_id).first()
     if plan is None:
         add_flash(request.session, "error", "対象の予定が見つかりません。")
         return RedirectResponse(url="/plans/overdue", status_code=303)
 
     flashes = consume_flash(request.session)
-    return request.app.state.templates.TemplateResponse(
+    response = request.app.state.templates.TemplateResponse(
         request,
         "plan_detail.html",
         {
             "flashes": flashes,
             "plan": plan,
             "status_labels": PLAN_STATUS_LABELS,
+            "entity_labels": PLAN_ENTITY_LABELS,
         },
     )
+    return with_etag(response, etag)
 
 
 @router.post("/plans/{plan_id}/delete")
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import csv
+import io
+from datetime import date
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import PlainTextResponse, Response
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.db import get_db
+from app.utils import add_flash, consume_flash
+from app.workload import BUCKETS, ReportCache, WorkloadRangeError, build_workload, report_period
+
+router = APIRouter()
+settings = get_settings()
+
+# 同じ条件の集計はその日のうちは使い回す（refresh=1 で再集計）
+report_cache = ReportCache(settings.report_cache_size)
+
+CSV_HEADER = ["担当者", "期間", "予定件数", "期限超過", "完了件数", "平均リードタイム(日)"]
+
+
+def _workload(
+    db: Session,
+    date_from: str | None,
+    date_to: str | None,
+    bucket: str,
+    owner: str | None,
+    refresh: bool,
+):
+    today = date.today()
+    start, end = report_period(date_from, date_to, today)
+    bucket = bucket if bucket in BUCKETS else "day"
+    owner = (owner or "").strip()
+    return report_cache.get_or_compute(
+        today,
+        ("workload", start, end, bucket, owner),
+        lambda: build_workload(db, start, end, bucket=bucket, owner=owner or None, today=today),
+        refresh=refresh,
+    )
+
+
+@router.get("/reports/workload")
+async def workload_report(
+    request: Request,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    bucket: str = "day",
+    owner: str | None = None,
+    refresh: bool = False,
+    db: Session = Depends(get_db),
+):
+    try:
+        report = _workload(db, date_from, date_to, bucket, owner, refresh)
+    except WorkloadRangeError as exc:
+        add_flash(request.session, "error", str(exc))
+        report = _workload(db, None, None, bucket, owner, refresh)
+
+    flashes = consume_flash(request.session)
+    return request.app.state.templates.TemplateResponse(
+        request,
+        "reports_workload.html",
+        {
+            "flashes": flashes,
+            "report": report,
+            "filters": {"owner": (owner or "").strip()},
+            "today": date.today(),
+        },
+    )
+
+
+@router.get("/reports/workload.csv")
+async def workload_report_csv(
+    date_from: str | None = None,
+    date_to: str | None = None,
+    bucket: str = "day",
+    owner: str | None = None,
+    refresh: bool = False,
+    db: Session = Depends(get_db),
+):
+    try:
+        report = _workload(db, date_from, date_to, bucket, owner, refresh)
+    except WorkloadRangeError as exc:
+        return PlainTextResponse(str(exc), status_code=400)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\r\n")
+    writer.writerow(CSV_HEADER)
+    for row in report.rows:
+        writer.writerow(
+            [
+                row.owner,
+                row.bucket.isoformat(),
+                row.planned,
+                row.overdue,
+                row.done,
+                "" if row.avg_lead_days is None else row.avg_lead_days,
+            ]
+        )
+    filename = f"workload_{report.date_from:%Y%m%d}-{report.date_to:%Y%m%d}_{report.bucket}.csv"
+    # Excel で文字化けしないよう BOM 付き UTF-8 で返す
+    return Response(
+        content="\ufeff" + buffer.getvalue(),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
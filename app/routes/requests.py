@@ -1,18 +1,47 @@
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, Form, Request
-from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
+from fastapi.responses import PlainTextResponse, RedirectResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.exc import IntegrityError
 
+from app.conditional import detail_etag, is_not_modified, not_modified_response, request_revision, with_etag
+from app.config import get_settings
+from app.concurrency import StaleDataError, VersionConflictError, conflict_response, ensure_version
 from app.db import get_db
-from app.models import REQUEST_STATUS_LABELS, PcRequest, PcStatusHistory, RequestStatus
+from app.idempotency import get_idempotency_key, remember_outcome, replay_after_failure, replay_response
+from app.models import (
+    ASSET_STATUS_LABELS,
+    REQUEST_STATUS_LABELS,
+    AssetStatus,
+    PcAsset,
+    PcRequest,
+    PcStatusHistory,
+    PlanEntityType,
+    RequestStatus,
+)
+from app.pagination import InvalidCursorError, fragment_response, history_page, page_url
+from app.plan_targets import delete_target_plans
 from app.status_rules import list_allowed_request_targets
+from app.streaming import CountingIterator, iter_rows, open_stream_session, stream_template
 from app.transition_service import TransitionError, apply_request_transition
 from app.utils import add_flash, consume_flash
 from app.validation import ValidationError, validate_request_integrity
 
 router = APIRouter()
+settings = get_settings()
+
+REQUEST_LIST_COLUMNS = (
+    PcRequest.id,
+    PcRequest.status,
+    PcRequest.requester,
+    PcRequest.asset_id,
+    PcRequest.version,
+    # 紐づく資産は外部結合で同じ SELECT から取る（行ごとの追加検索をしない）
+    PcAsset.asset_tag.label("asset_tag"),
+    PcAsset.status.label("asset_status"),
+)
 
 
 def _parse_optional_int(value: str | None) -> int | None:
@@ -26,29 +55,40 @@ def _parse_optional_int(value: str | None) -> int | None:
     number = int(text)
     return number if number > 0 else None
 
+
 def _build_requests_context(
     request: Request,
     db: Session,
     status: str | None,
     requester: str | None,
+    asset_status: str | None = None,
+    *,
+    stream_session: Session | None = None,
 ):
-    query = db.query(PcRequest)
+    """一覧の表示内容を組み立てる。stream_session を渡すと requests はサーバ側カーソルの遅延イテレータになる。"""
+    query = select(*REQUEST_LIST_COLUMNS).select_from(PcRequest).outerjoin(PcRequest.asset)
     if status:
-        query = query.filter(PcRequest.status == status)
+        query = query.where(PcRequest.status == status)
     if requester:
-        query = query.filter(PcRequest.requester.contains(requester))
-
-    requests = query.order_by(PcRequest.id.desc()).limit(200).all()
-    targets = {req.id: list_allowed_request_targets(req.status) for req in requests}
-
-    return {
-        "requests": requests,
-        "targets": targets,
+        query = query.where(PcRequest.requester.contains(requester))
+    if asset_status:
+        query = query.where(PcAsset.status == asset_status)
+    query = query.order_by(PcRequest.id.desc()).limit(settings.list_row_limit)
+
+    context = {
+        # 遷移先は状態ごとに決まるため、行ではなく状態ごとに1回だけ求める
+        "targets": {item: list_allowed_request_targets(item) for item in RequestStatus},
         "filters": {
             "status": status or "",
             "requester": requester or "",
+            "asset_status": asset_status or "",
         },
+        "asset_statuses": list(AssetStatus),
+        "asset_status_labels": ASSET_STATUS_LABELS,
     }
+    if stream_session is not None:
+        return {**context, "streaming": True, "requests": CountingIterator(iter_rows(stream_session, query))}
+    return {**context, "requests": db.execute(query).all()}
 
 
 def _render_request_form(
@@ -76,22 +116,21 @@ async def requests_list(
     request: Request,
     status: str | None = None,
     requester: str | None = None,
+    asset_status: str | None = None,
     db: Session = Depends(get_db),
 ):
-    if status or requester:
+    if status or requester or asset_status:
         add_flash(request.session, "success", "検索条件を適用しました。")
 
     flashes = consume_flash(request.session)
-    context = _build_requests_context(request, db, status, requester)
-    return request.app.state.templates.TemplateResponse(
-        request,
-        "requests.html",
-        {
-            "flashes": flashes,
-            **context,
-            "status_labels": REQUEST_STATUS_LABELS,
-        },
+    stream_session = open_stream_session(db) if settings.stream_lists else None
+    context = _build_requests_context(
+        request, db, status, requester, asset_status, stream_session=stream_session
     )
+    page_context = {"flashes": flashes, **context, "status_labels": REQUEST_STATUS_LABELS}
+    if stream_session is not None:
+        return stream_template(request, "requests.html", page_context, session=stream_session)
+    return request.app.state.templates.TemplateResponse(request, "requests.html", page_context)
 
 
 @router.post("/requests/{request_id}/transition")
@@ -100,12 +139,22 @@ async def request_transition(
     request_id: int,
     to_status: str = Form(...),
     reason: str | None = Form(None),
+    version: str | None = Form(None),
+    idempotency_key: str | None = Form(None),
     db: Session = Depends(get_db),
 ):
+    key = get_idempotency_key(request, idempotency_key)
+    replay = replay_response(db, request, key)
+    if replay is not None:
+        return replay
     req = db.query(PcRequest).filter(PcRequest.id == request_id).first()
     if req is None:
         add_flash(request.session, "error", "対象の要求が見つかりません。")
         return RedirectResponse(url="/requests", status_code=303)
+    try:
+        ensure_version(req, version)
+    except VersionConflictError:
+        return conflict_response(request, entity="request", entity_id=request_id, back_url="/requests")
 
     actor = request.session.get("user_id") or "system"
 
@@ -133,7 +182,14 @@ async def request_transition(
         reason=reason,
     )
     db.add(history)
-    db.commit()
+    remember_outcome(db, request, key, location="/requests")
+    try:
+        db.commit()
+    except (StaleDataError, IntegrityError):
+        replay = replay_after_failure(db, request, key)
+        if replay is not None:
+            return replay
+        return conflict_response(request, entity="request", entity_id=request_id, back_url="/requests")
 
     add_flash(request.session, "success", "状態を更新しました。")
     return RedirectResponse(url="/requests", status_code=303)
@@ -156,8 +212,14 @@ async def request_create(
     requester: str | None = Form(None),
     note: str | None = Form(None),
     asset_id: str | None = Form(None),
+    idempotency_key: str | None = Form(None),
     db: Session = Depends(get_db),
 ):
+    key = get_idempotency_key(request, idempotency_key)
+    replay = replay_response(db, request, key)
+    if replay is not None:
+        return replay
+
     try:
         validate_request_integrity(requester=requester, note=note)
     except ValidationError as exc:
@@ -184,9 +246,13 @@ async def request_create(
     )
     db.add(req)
     try:
+        db.flush()
+        remember_outcome(db, request, key, location=f"/requests/{req.id}")
         db.commit()
     except IntegrityError:
-        db.rollback()
+        replay = replay_after_failure(db, request, key)
+        if replay is not None:
+            return replay
         add_flash(request.session, "error", "資産IDを確認してください。")
         return _render_request_form(
             request,
@@ -220,12 +286,19 @@ async def request_update(
     requester: str | None = Form(None),
     note: str | None = Form(None),
     asset_id: str | None = Form(None),
+    version: str | None = Form(None),
     db: Session = Depends(get_db),
 ):
     req = db.query(PcRequest).filter(PcRequest.id == request_id).first()
     if req is None:
         add_flash(request.session, "error", "対象の要求が見つかりません。")
         return RedirectResponse(url="/requests", status_code=303)
+    try:
+        ensure_version(req, version)
+    except VersionConflictError:
+        return conflict_response(
+            request, entity="request", entity_id=request_id, back_url=f"/requests/{request_id}"
+        )
 
     try:
         validate_request_integrity(requester=requester, note=note)
@@ -248,6 +321,11 @@ async def request_update(
     req.updated_at = datetime.now(timezone.utc)
     try:
         db.commit()
+    except StaleDataError:
+        db.rollback()
+        return conflict_response(
+            request, entity="request", entity_id=request_id, back_url=f"/requests/{request_id}"
+        )
     except IntegrityError:
         db.rollback()
         add_flash(request.session, "error", "資産IDを確認してください。")
@@ -264,30 +342,52 @@ async def request_update(
 
 @router.get("/requests/{request_id}")
 async def request_detail(request: Request, request_id: int, db: Session = Depends(get_db)):
-    req = db.query(PcRequest).filter(PcRequest.id == request_id).first()
+    etag = detail_etag(request, request_revision(db, request_id))
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    req = db.query(PcRequest).options(joinedload(PcRequest.asset)).filter(PcRequest.id == request_id).first()
     if req is None:
         add_flash(request.session, "error", "対象の要求が見つかりません。")
         return RedirectResponse(url="/requests", status_code=303)
 
-    history = (
-        db.query(PcStatusHistory)
-        .filter(PcStatusHistory.entity_type == "REQUEST")
-        .filter(PcStatusHistory.entity_id == request_id)
-        .order_by(PcStatusHistory.changed_at.desc())
-        .all()
-    )
+    history = history_page(db, entity_type="REQUEST", entity_id=request_id, limit=settings.detail_page_size)
 
     flashes = consume_flash(request.session)
-    return request.app.state.templates.TemplateResponse(
+    response = request.app.state.templates.TemplateResponse(
         request,
         "request_detail.html",
         {
             "flashes": flashes,
             "request_item": req,
-            "history": history,
+            "history": history.items,
+            "history_next_url": page_url(f"/requests/{request_id}/history", history.next_cursor),
             "status_labels": REQUEST_STATUS_LABELS,
+            "asset_status_labels": ASSET_STATUS_LABELS,
         },
     )
+    return with_etag(response, etag)
+
+
+@router.get("/requests/{request_id}/history")
+async def request_history_fragment(
+    request: Request,
+    request_id: int,
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+):
+    try:
+        page = history_page(
+            db, entity_type="REQUEST", entity_id=request_id, limit=settings.detail_page_size, cursor=cursor
+        )
+    except InvalidCursorError:
+        return PlainTextResponse("カーソルが不正です。", status_code=400)
+    return fragment_response(
+        request,
+        "_history_rows.html",
+        {"history": page.items, "status_labels": REQUEST_STATUS_LABELS},
+        next_url=page_url(f"/requests/{request_id}/history", page.next_cursor),
+    )
 
 
 @router.post("/requests/{request_id}/delete")
@@ -297,6 +397,8 @@ async def request_delete(request: Request, request_id: int, db: Session = Depend
         add_flash(request.session, "error", "対象の要求が見つかりません。")
         return RedirectResponse(url="/requests", status_code=303)
 
+    # 予定は外部キーで結べないため、対象と同じトランザクションで削除して孤立させない
+    delete_target_plans(db, PlanEntityType.REQUEST, request_id)
     db.delete(req)
     try:
         db.commit()
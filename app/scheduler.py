@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models import SchedulerLock, SchedulerRun
+from app.overdue import JOB_NAME as MARK_OVERDUE, mark_overdue
+
+logger = logging.getLogger("app")
+
+LOCK_NAME = "scheduler"
+
+
+@dataclass(frozen=True)
+class Job:
+    name: str
+    run: Callable[[Session, date], int]
+
+
+# 実行順に並べる
+JOBS: tuple[Job, ...] = (Job(MARK_OVERDUE, mark_overdue),)
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _utcnow() -> datetime:
+    # DateTime 列は naive（UTC）で保存するため揃える
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def acquire_lease(db: Session, owner: str, lease_sec: int, now: datetime | None = None) -> bool:
+    """実行権を取得/延長する。期限切れのリースは他のワーカーが引き継ぐ。"""
+    now = now or _utcnow()
+    expires_at = now + timedelta(seconds=lease_sec)
+    updated = db.execute(
+        update(SchedulerLock)
+        .where(SchedulerLock.name == LOCK_NAME)
+        .where(or_(SchedulerLock.owner == owner, SchedulerLock.expires_at < now))
+        .values(owner=owner, expires_at=expires_at)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if updated:
+        db.commit()
+        return True
+    try:
+        db.add(SchedulerLock(name=LOCK_NAME, owner=owner, expires_at=expires_at))
+        db.commit()
+    except IntegrityError:
+        # 他のワーカーが期限内のリースを持っている
+        db.rollback()
+        return False
+    return True
+
+
+def release_lease(db: Session, owner: str) -> None:
+    db.execute(delete(SchedulerLock).where(SchedulerLock.name == LOCK_NAME).where(SchedulerLock.owner == owner))
+    db.commit()
+
+
+def _last_success(db: Session, job: str) -> SchedulerRun | None:
+    return db.execute(
+        select(SchedulerRun)
+        .where(SchedulerRun.job == job)
+        .where(SchedulerRun.status == "OK")
+        .order_by(SchedulerRun.id.desc())
+        .limit(1)
+    ).scalar_one_or_none()
+
+
+def is_due(last: SchedulerRun | None, today: date, now: datetime, interval_sec: int) -> bool:
+    """その日に未実行か、前回の開始から interval_sec 経っていれば実行する。"""
+    if last is None or last.run_for != today:
+        return True
+    return now - last.started_at >= timedelta(seconds=interval_sec)
+
+
+def run_job(db: Session, job: Job, *, worker: str, today: date) -> SchedulerRun:
+    """1つの処理を実行し、結果（所要時間・件数・エラー）を scheduler_runs に記録する。"""
+    started_at = _utcnow()
+    try:
+        changed = job.run(db, today)
+        db.commit()
+        status, detail = "OK", None
+    except Exception as exc:
+        db.rollback()
+        logger.exception("scheduled job failed job=%s", job.name)
+        changed, status, detail = 0, "ERROR", f"{type(exc).__name__}: {exc}"
+    finished_at = _utcnow()
+    run = SchedulerRun(
+        job=job.name,
+        run_for=today,
+        worker=worker,
+        status=status,
+        changed_count=changed,
+        detail=detail,
+        started_at=started_at,
+        finished_at=finished_at,
+        duration_ms=int((finished_at - started_at).total_seconds() * 1000),
+    )
+    db.add(run)
+    db.commit()
+    logger.info(
+        "scheduled job job=%s status=%s changed=%d duration_ms=%d",
+        job.name,
+        status,
+        changed,
+        run.duration_ms,
+    )
+    return run
+
+
+def run_due_jobs(
+    db: Session,
+    *,
+    worker: str,
+    interval_sec: int,
+    lease_sec: int,
+    force: bool = False,
+    today: date | None = None,
+) -> list[SchedulerRun]:
+    """実行権を取れたときだけ、期限の来た処理を実行する（force なら期限に関係なく全て）。"""
+    if not acquire_lease(db, worker, lease_sec):
+        return []
+    today = today or date.today()
+    runs: list[SchedulerRun] = []
+    for job in JOBS:
+        if force or is_due(_last_success(db, job.name), today, _utcnow(), interval_sec):
+            runs.append(run_job(db, job, worker=worker, today=today))
+    return runs
+
+
+def recent_runs(db: Session, limit: int = 50) -> list[SchedulerRun]:
+    return list(db.execute(select(SchedulerRun).order_by(SchedulerRun.id.desc()).limit(limit)).scalars())
+
+
+def current_lease(db: Session) -> SchedulerLock | None:
+    return db.get(SchedulerLock, LOCK_NAME)
+
+
+class Scheduler:
+    """プロセス内の定期処理。asyncio のタスクで一定間隔ごとに起き、DB の処理はスレッドで実行する。"""
+
+    def __init__(self, session_factory: Callable[[], Session], *, interval_sec: int, lease_sec: int):
+        self.session_factory = session_factory
+        self.interval_sec = interval_sec
+        self.lease_sec = lease_sec
+        self.worker = worker_id()
+        # リースが切れる前に延長できる間隔で起きる
+        self.poll_sec = max(1, min(interval_sec, lease_sec // 3))
+        self._task: asyncio.Task | None = None
+
+    def tick(self) -> list[SchedulerRun]:
+        db = self.session_factory()
+        try:
+            return run_due_jobs(db, worker=self.worker, interval_sec=self.interval_sec, lease_sec=self.lease_sec)
+        finally:
+            db.close()
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.tick)
+            except Exception:
+                logger.exception("scheduler tick failed worker=%s", self.worker)
+            await asyncio.sleep(self.poll_sec)
+
+    def start(self) -> None:
+        if self._task is None:
+            logger.info("scheduler started worker=%s interval_sec=%d", self.worker, self.interval_sec)
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        db = self.session_factory()
+        try:
+            # 次のワーカーがリースの期限切れを待たずに引き継げるようにする
+            release_lease(db, self.worker)
+        finally:
+            db.close()
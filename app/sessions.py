@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import secrets
+import threading
+from abc import ABC, abstractmethod
+from base64 import b64decode, b64encode
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+import anyio.to_thread
+from itsdangerous import BadSignature, TimestampSigner
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import Settings
+from app.models import HttpSession
+
+
+logger = logging.getLogger("app")
+
+SESSION_COOKIE = "session"
+READ_ONLY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _snapshot(data: dict[str, Any]) -> str:
+    return json.dumps(data, sort_keys=True, ensure_ascii=False)
+
+
+def _is_signed(cookie: str) -> bool:
+    # 署名付き Cookie は「値.時刻.署名」の形。サーバ側のセッションID（token_urlsafe）は "." を含まない
+    return "." in cookie
+
+
+def _storage_key(session_id: str) -> str:
+    # 保存先が漏れてもそのまま Cookie として使えないよう、IDのハッシュで保存する
+    return hashlib.sha256(session_id.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class StoredSession:
+    data: dict[str, Any]
+    expires_at: datetime
+
+
+class SessionBackend(ABC):
+    """セッションの保存先。Cookie の値からセッション内容を読み、保存後に Cookie へ載せる値を返す。"""
+
+    server_side = True
+    blocking = False
+
+    @abstractmethod
+    def load(self, cookie: str) -> StoredSession | None:
+        """Cookie の値に対応するセッション内容と有効期限。不正/期限切れなら None。"""
+
+    @abstractmethod
+    def save(self, cookie: str | None, data: dict[str, Any]) -> str:
+        """内容を保存し、Cookie に載せる値を返す。"""
+
+    @abstractmethod
+    def delete(self, cookie: str) -> None:
+        """Cookie の値に対応するセッションを破棄する。"""
+
+
+class CookieBackend(SessionBackend):
+    """内容を署名付き Cookie に載せる（Starlette の SessionMiddleware と同じ形式）。"""
+
+    server_side = False
+
+    def __init__(self, secret_key: str, max_age: int):
+        self.signer = TimestampSigner(str(secret_key))
+        self.max_age = max_age
+
+    def load(self, cookie: str) -> StoredSession | None:
+        try:
+            raw, signed_at = self.signer.unsign(cookie.encode("utf-8"), max_age=self.max_age, return_timestamp=True)
+            data = json.loads(b64decode(raw))
+        except (BadSignature, ValueError):
+            return None
+        expires_at = signed_at.astimezone(timezone.utc).replace(tzinfo=None) + timedelta(seconds=self.max_age)
+        return StoredSession(data, expires_at)
+
+    def save(self, cookie: str | None, data: dict[str, Any]) -> str:
+        return self.signer.sign(b64encode(json.dumps(data).encode("utf-8"))).decode("utf-8")
+
+    def delete(self, cookie: str) -> None:
+        return None
+
+
+class MemoryBackend(SessionBackend):
+    """プロセス内に保存する。単一ワーカーや開発・テスト向け（ワーカー間では共有されない）。"""
+
+    def __init__(self, max_age: int):
+        self.max_age = max_age
+        self._entries: dict[str, tuple[datetime, str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self, cookie: str) -> StoredSession | None:
+        entry = self._entries.get(_storage_key(cookie))
+        if entry is None or entry[0] <= _utcnow():
+            return None
+        return StoredSession(json.loads(entry[1]), entry[0])
+
+    def save(self, cookie: str | None, data: dict[str, Any]) -> str:
+        session_id = cookie or secrets.token_urlsafe(32)
+        now = _utcnow()
+        with self._lock:
+            for key in [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]:
+                del self._entries[key]
+            self._entries[_storage_key(session_id)] = (now + timedelta(seconds=self.max_age), json.dumps(data))
+        return session_id
+
+    def delete(self, cookie: str) -> None:
+        with self._lock:
+            self._entries.pop(_storage_key(cookie), None)
+
+
+class DatabaseBackend(SessionBackend):
+    """http_sessions テーブルに保存する。複数ワーカーで共有できる。"""
+
+    blocking = True
+
+    def __init__(self, session_factory: Callable[[], Session], max_age: int):
+        self.session_factory = session_factory
+        self.max_age = max_age
+
+    def load(self, cookie: str) -> StoredSession | None:
+        with self.session_factory() as db:
+            row = db.get(HttpSession, _storage_key(cookie))
+            if row is None or row.expires_at <= _utcnow():
+                return None
+            return StoredSession(json.loads(row.data), row.expires_at)
+
+    def save(self, cookie: str | None, data: dict[str, Any]) -> str:
+        session_id = cookie or secrets.token_urlsafe(32)
+        now = _utcnow()
+        with self.session_factory() as db:
+            db.query(HttpSession).filter(HttpSession.expires_at <= now).delete(synchronize_session=False)
+            row = db.get(HttpSession, _storage_key(session_id))
+            if row is None:
+                row = HttpSession(id=_storage_key(session_id))
+                db.add(row)
+            row.data = json.dumps(data)
+            row.updated_at = now
+            row.expires_at = now + timedelta(seconds=self.max_age)
+            db.commit()
+        return session_id
+
+    def delete(self, cookie: str) -> None:
+        with self.session_factory() as db:
+            db.query(HttpSession).filter(HttpSession.id == _storage_key(cookie)).delete(synchronize_session=False)
+            db.commit()
+
+
+def create_session_backend(settings: Settings, session_factory: Callable[[], Session] | None = None) -> SessionBackend:
+    backend = settings.session_backend
+    if backend == "memory":
+        return MemoryBackend(settings.session_ttl_sec)
+    if backend == "database":
+        if session_factory is None:
+            from app.db import SessionLocal
+
+            session_factory = SessionLocal
+        return DatabaseBackend(session_factory, settings.session_ttl_sec)
+    if backend != "cookie":
+        logger.warning("unknown SESSION_BACKEND=%s, falling back to cookie", backend)
+    return CookieBackend(settings.secret_key, settings.session_ttl_sec)
+
+
+class SessionMiddleware:
+    """request.session を提供する ASGI ミドルウェア。
+
+    応答開始時にセッション内容を読込時と比べ、変わったときだけ保存する（変更のない GET では
+    保存も Set-Cookie も行わない）。有効期限の残りが半分を切ったセッションは、更新系の要求
+    （GET/HEAD/OPTIONS 以外）で変更がなくても保存し直し、期限と Cookie の Max-Age を延ばす。
+    読み取りだけの要求では延長しない（Set-Cookie を出さない）。
+    サーバ側の保存先では Cookie にはランダムなセッションIDだけを載せ、ログイン/ログアウト（user_id の変化）で
+    IDを振り直す。
+
+    サーバ側の保存先でも、ログインしていない（user_id のない）セッションは保存しない。ログイン画面への
+    誘導ごとに行が増えないよう、Flash などは anonymous_backend（署名付き Cookie）に載せる。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        backend: SessionBackend,
+        *,
+        max_age: int,
+        anonymous_backend: SessionBackend | None = None,
+        skip_prefixes: tuple[str, ...] = ("/static/",),
+    ):
+        self.app = app
+        self.backend = backend
+        self.max_age = max_age
+        self.anonymous_backend = anonymous_backend if backend.server_side else None
+        self.skip_prefixes = skip_prefixes
+
+    async def _call(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self.backend.blocking:
+            return await anyio.to_thread.run_sync(func, *args)
+        return func(*args)
+
+    def _source(self, cookie: str) -> SessionBackend:
+        if self.anonymous_backend is not None and _is_signed(cookie):
+            return self.anonymous_backend
+        return self.backend
+
+    def _target(self, session: dict[str, Any]) -> SessionBackend | None:
+        if not self.backend.server_side or session.get("user_id"):
+            return self.backend
+        return self.anonymous_backend
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket") or scope["path"].startswith(self.skip_prefixes):
+            if scope["type"] in ("http", "websocket"):
+                scope["session"] = {}
+            await self.app(scope, receive, send)
+            return
+
+        cookie = HTTPConnection(scope).cookies.get(SESSION_COOKIE)
+        stored = await self._call(self._source(cookie).load, cookie) if cookie else None
+        if stored is not None and self._source(cookie) is self.anonymous_backend and stored.data.get("user_id"):
+            stored = None
+        if stored is None:
+            # 不正/期限切れの ID は引き継がない（セッション固定化の防止）
+            cookie = None
+        scope["session"] = stored.data if stored is not None else {}
+        expires_at = stored.expires_at if stored is not None else None
+        initial = _snapshot(scope["session"])
+        initial_user = scope["session"].get("user_id")
+
+        async def send_with_session(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                await self._persist(
+                    scope["session"], cookie, initial, initial_user, expires_at, scope.get("method", "GET"), message
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_session)
+
+    async def _persist(
+        self,
+        session: dict[str, Any],
+        cookie: str | None,
+        initial: str,
+        initial_user: str | None,
+        expires_at: datetime | None,
+        method: str,
+        message: Message,
+    ) -> None:
+        changed = _snapshot(session) != initial
+        refresh = expires_at is not None and expires_at - _utcnow() < timedelta(seconds=self.max_age / 2)
+        if not changed and not refresh:
+            return
+        if not changed and method in READ_ONLY_METHODS:
+            # 読み取りだけの要求では保存も Set-Cookie も行わない（保存先の期限と Cookie の Max-Age を揃えておく）
+            return
+        headers = MutableHeaders(scope=message)
+        target = self._target(session)
+        if not session or target is None:
+            if cookie:
+                await self._call(self._source(cookie).delete, cookie)
+                headers.append(
+                    "Set-Cookie",
+                    f"{SESSION_COOKIE}=null; path=/; expires=Thu, 01 Jan 1970 00:00:00 GMT; httponly; samesite=lax",
+                )
+            return
+        if cookie and (
+            self._source(cookie) is not target or (target.server_side and session.get("user_id") != initial_user)
+        ):
+            await self._call(self._source(cookie).delete, cookie)
+            cookie = None
+        value = await self._call(target.save, cookie, session)
+        if value != cookie or refresh:
+            headers.append(
+                "Set-Cookie",
+                f"{SESSION_COOKIE}={value}; path=/; Max-Age={self.max_age}; httponly; samesite=lax",
+            )
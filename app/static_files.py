@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+STATIC_DIR = "static"
+VERSION_PARAM = "v"
+
+# 実パス -> (mtime_ns, size, ハッシュ)。ファイルが更新されたら再計算する
+_versions: dict[str, tuple[int, int, str]] = {}
+_lock = threading.Lock()
+
+
+def file_version(full_path: str) -> str:
+    """ファイル内容の SHA-256 先頭12桁。静的ファイルの URL に付けてキャッシュを破棄させる。"""
+    real_path = os.path.realpath(full_path)
+    stat_result = os.stat(real_path)
+    cached = _versions.get(real_path)
+    if cached and cached[:2] == (stat_result.st_mtime_ns, stat_result.st_size):
+        return cached[2]
+    with open(real_path, "rb") as file:
+        digest = hashlib.sha256(file.read()).hexdigest()[:12]
+    with _lock:
+        _versions[real_path] = (stat_result.st_mtime_ns, stat_result.st_size, digest)
+    return digest
+
+
+def static_url(path: str) -> str:
+    """テンプレート用: /static/<path>?v=<内容ハッシュ> を返す。"""
+    return f"/static/{path}?{VERSION_PARAM}={file_version(os.path.join(STATIC_DIR, path))}"
+
+
+class VersionedStaticFiles(StaticFiles):
+    """static_url の付けたハッシュが現在の内容と一致する要求にだけ、長期の immutable キャッシュを許可する。
+
+    ハッシュなし/古いハッシュの要求は no-cache とし、ETag/Last-Modified による再検証に任せる。
+    """
+
+    def __init__(self, *, directory: str, max_age: int):
+        super().__init__(directory=directory)
+        self.max_age = max_age
+
+    def file_response(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+        version = QueryParams(scope.get("query_string", b"")).get(VERSION_PARAM)
+        if status_code == 200 and self.max_age > 0 and version == file_version(full_path):
+            response.headers["Cache-Control"] = f"public, max-age={self.max_age}, immutable"
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Iterable
+from types import MappingProxyType
+from typing import Any, Iterable, Mapping
 
 
 REQUEST_STATUSES: set[str] = {"RQ", "OP", "RP"}
@@ -34,65 +35,91 @@ ASSET_LOST_RECOVERY: set[tuple[str, str]] = {
 ASSET_CREATE_ALLOWED_TO: set[str] = {"INV", "USE", "RET", "IT", "DIS", "LOST"}
 
 
-def _normalize_status(value: str | None) -> str:
-    return "NR" if value in (None, "", "NR") else value
+NEW_STATUS = "NR"
 
+REQUEST_RULES_DEFINITION: dict[str, Any] = {
+    "statuses": sorted(REQUEST_STATUSES),
+    "rules": [{"from": [from_status], "to": [to_status]} for from_status, to_status in sorted(REQUEST_ALLOWED)],
+}
 
-def is_allowed_request_transition(from_status: str | None, to_status: str) -> bool:
-    normalized_from = _normalize_status(from_status)
-    if to_status not in REQUEST_STATUSES:
-        return False
-    return (normalized_from, to_status) in REQUEST_ALLOWED
+ASSET_RULES_DEFINITION: dict[str, Any] = {
+    "statuses": sorted(ASSET_STATUSES),
+    "rules": [
+        {"from": [NEW_STATUS], "to": sorted(ASSET_CREATE_ALLOWED_TO)},
+        *({"from": [from_status], "to": [to_status]} for from_status, to_status in sorted(ASSET_ALLOWED)),
+        {"from": sorted(ASSET_AUDIT_ALLOWED_FROM), "to": ["AUD"]},
+        {"from": ["AUD"], "to": sorted(ASSET_AUDIT_ALLOWED_TO)},
+        *({"from": [from_status], "to": [to_status]} for from_status, to_status in sorted(ASSET_LOST_RECOVERY)),
+    ],
+}
 
 
-def is_allowed_asset_transition(from_status: str | None, to_status: str) -> bool:
-    normalized_from = _normalize_status(from_status)
-    if to_status not in ASSET_STATUSES:
-        return False
+def _normalize_status(value: str | None) -> str:
+    return NEW_STATUS if value in (None, "", NEW_STATUS) else value
 
-    if normalized_from == "NR":
-        return to_status in ASSET_CREATE_ALLOWED_TO
 
-    if (normalized_from, to_status) in ASSET_ALLOWED:
-        return True
+class TransitionTable:
+    """遷移元 → 遷移先(frozenset) の不変テーブル。判定は辞書引き1回で済む。"""
 
-    if normalized_from in ASSET_AUDIT_ALLOWED_FROM and to_status == "AUD":
-        return True
+    __slots__ = ("statuses", "_targets", "_sorted_targets")
 
-    if normalized_from == "AUD" and to_status in ASSET_AUDIT_ALLOWED_TO:
-        return True
+    def __init__(self, statuses: Iterable[str], transitions: Mapping[str, Iterable[str]]):
+        self.statuses = frozenset(statuses)
+        targets: dict[str, frozenset[str]] = {}
+        for from_status, to_statuses in transitions.items():
+            if from_status != NEW_STATUS and from_status not in self.statuses:
+                raise ValueError(f"unknown from status: {from_status}")
+            to_set = frozenset(to_statuses)
+            unknown = to_set - self.statuses
+            if unknown:
+                raise ValueError(f"unknown to status: {', '.join(sorted(unknown))}")
+            targets[from_status] = targets.get(from_status, frozenset()) | to_set
+        self._targets: Mapping[str, frozenset[str]] = MappingProxyType(targets)
+        self._sorted_targets: Mapping[str, list[str]] = MappingProxyType(
+            {from_status: sorted(to_set) for from_status, to_set in targets.items()}
+        )
 
-    if (normalized_from, to_status) in ASSET_LOST_RECOVERY:
-        return True
+    @classmethod
+    def from_definition(cls, definition: Mapping[str, Any]) -> TransitionTable:
+        transitions: dict[str, set[str]] = {}
+        for rule in definition["rules"]:
+            for from_status in rule["from"]:
+                transitions.setdefault(from_status, set()).update(rule["to"])
+        return cls(definition["statuses"], transitions)
 
-    return False
+    def targets(self, from_status: str | None) -> frozenset[str]:
+        return self._targets.get(_normalize_status(from_status), frozenset())
 
+    def is_allowed(self, from_status: str | None, to_status: str) -> bool:
+        return to_status in self.targets(from_status)
 
-def list_allowed_request_targets(from_status: str | None) -> list[str]:
-    normalized_from = _normalize_status(from_status)
-    return sorted({to_status for f, to_status in REQUEST_ALLOWED if f == normalized_from})
+    def allowed_targets(self, from_status: str | None) -> list[str]:
+        return list(self._sorted_targets.get(_normalize_status(from_status), ()))
 
+    def validate_many(self, pairs: Iterable[tuple[str | None, str]]) -> list[bool]:
+        targets = self._targets
+        empty: frozenset[str] = frozenset()
+        return [
+            to_status in targets.get(NEW_STATUS if from_status in (None, "") else from_status, empty)
+            for from_status, to_status in pairs
+        ]
 
-def list_allowed_asset_targets(from_status: str | None) -> list[str]:
-    normalized_from = _normalize_status(from_status)
-    allowed: set[str] = set()
 
-    if normalized_from == "NR":
-        allowed.update(ASSET_CREATE_ALLOWED_TO)
-        return sorted(allowed)
+REQUEST_TRANSITIONS = TransitionTable.from_definition(REQUEST_RULES_DEFINITION)
+ASSET_TRANSITIONS = TransitionTable.from_definition(ASSET_RULES_DEFINITION)
 
-    for f, to_status in ASSET_ALLOWED:
-        if f == normalized_from:
-            allowed.add(to_status)
 
-    if normalized_from in ASSET_AUDIT_ALLOWED_FROM:
-        allowed.add("AUD")
+def is_allowed_request_transition(from_status: str | None, to_status: str) -> bool:
+    return REQUEST_TRANSITIONS.is_allowed(from_status, to_status)
+
 
-    if normalized_from == "AUD":
-        allowed.update(ASSET_AUDIT_ALLOWED_TO)
+def is_allowed_asset_transition(from_status: str | None, to_status: str) -> bool:
+    return ASSET_TRANSITIONS.is_allowed(from_status, to_status)
 
-    for f, to_status in ASSET_LOST_RECOVERY:
-        if f == normalized_from:
-            allowed.add(to_status)
 
-    return sorted(allowed)
+def list_allowed_request_targets(from_status: str | None) -> list[str]:
+    return REQUEST_TRANSITIONS.allowed_targets(from_status)
+
+
+def list_allowed_asset_targets(from_status: str | None) -> list[str]:
+    return ASSET_TRANSITIONS.allowed_targets(from_status)
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, AsyncIterator, Iterable, Iterator
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.profiling import is_profiling
+from app.query_stats import current_query_stats
+
+
+logger = logging.getLogger("app")
+
+# ヘッダと最初の数行がすぐ届き、かつ細切れになりすぎない程度の送信単位
+CHUNK_SIZE = 16 * 1024
+PARTITION_SIZE = 100
+
+
+class CountingIterator:
+    """テンプレートに渡す遅延イテレータ。描画し終えた件数を count で参照できる。"""
+
+    def __init__(self, items: Iterable[Any]):
+        self._items = iter(items)
+        self.count = 0
+
+    def __iter__(self) -> "CountingIterator":
+        return self
+
+    def __next__(self) -> Any:
+        item = next(self._items)
+        self.count += 1
+        return item
+
+
+def open_stream_session(db: Session) -> Session:
+    """ストリーミング用のセッション。依存関係の db は応答本文の送信前に閉じられるため別に開く。"""
+    return Session(bind=db.get_bind())
+
+
+def iter_partitions(session: Session, statement: Select, size: int = PARTITION_SIZE) -> Iterator[list[Row]]:
+    """サーバ側カーソル（yield_per）で size 件ずつ取り出す。"""
+    result = session.execute(statement.execution_options(yield_per=size))
+    for partition in result.partitions():
+        yield partition
+
+
+def iter_rows(session: Session, statement: Select, size: int = PARTITION_SIZE) -> Iterator[Row]:
+    for partition in iter_partitions(session, statement, size):
+        yield from partition
+
+
+def _buffered(chunks: Iterable[str], size: int) -> Iterator[bytes]:
+    buffer: list[str] = []
+    length = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield "".join(buffer).encode("utf-8")
+            buffer.clear()
+            length = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+async def _on_event_loop(chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+def stream_chunks(
+    chunks: Iterable[str],
+    *,
+    session: Session,
+    media_type: str,
+    headers: dict[str, str] | None = None,
+    path: str = "",
+    chunk_size: int = CHUNK_SIZE,
+) -> StreamingResponse:
+    """文字列を chunk_size ごとにまとめて送信する。送信が終わるか中断されたら session を閉じる。"""
+
+    def body() -> Iterator[bytes]:
+        # 本文の送信中の SQL は応答ログ（ヘッダ送信時点）に含まれないため、送信の終わりに別に記録する
+        stats = current_query_stats()
+        start_count, start_ms = (stats.count, stats.total_ms) if stats is not None else (0, 0.0)
+        try:
+            yield from _buffered(chunks, chunk_size)
+        except Exception:
+            # ヘッダ送信後のため 500 は返せない。ログだけ残して接続を切る
+            logger.exception("stream render failed path=%s", path)
+            raise
+        finally:
+            session.close()
+            if stats is not None:
+                logger.info(
+                    "stream finished path=%s db_queries=%d db_ms=%.1f",
+                    path,
+                    stats.count - start_count,
+                    stats.total_ms - start_ms,
+                )
+
+    if is_profiling():
+        # cProfile は有効にしたスレッドしか計測しないため、計測中はスレッドプールに渡さずイベントループで描画する
+        return StreamingResponse(_on_event_loop(body()), media_type=media_type, headers=headers)
+    return StreamingResponse(body(), media_type=media_type, headers=headers)
+
+
+def stream_template(
+    request: Request,
+    template_name: str,
+    context: dict[str, Any],
+    *,
+    session: Session,
+    chunk_size: int = CHUNK_SIZE,
+) -> StreamingResponse:
+    """Jinja の generate() で描画しながら送信する。描画が終わるか中断されたら session を閉じる。"""
+    template = request.app.state.templates.env.get_template(template_name)
+    return stream_chunks(
+        template.generate({"request": request, **context}),
+        session=session,
+        media_type="text/html; charset=utf-8",
+        path=request.url.path,
+        chunk_size=chunk_size,
+    )
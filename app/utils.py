@@ -16,9 +16,8 @@ def add_flash(session: dict[str, Any], level: str, message: str) -> None:
 
 
 def consume_flash(session: dict[str, Any]) -> list[dict[str, str]]:
-    flashes = session.get(FLASH_KEY, [])
-    session[FLASH_KEY] = []
-    return flashes
+    # Flash がなければセッションに触れない（変更のない表示でセッションを保存させないため）
+    return session.pop(FLASH_KEY, None) or []
 
 
 def to_jst(dt: datetime | None) -> datetime | None:
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import Any, Callable
+
+from sqlalchemy import Date, Integer, case, func, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.models import PcPlan, PlanStatus
+from app.plan_calendar import calendar_range
+
+BUCKETS = ("day", "week")
+MAX_RANGE_DAYS = 366
+
+
+class WorkloadRangeError(ValueError):
+    pass
+
+
+def report_period(date_from: str | None, date_to: str | None, today: date) -> tuple[date, date]:
+    """集計期間。省略時は今月。開始 > 終了や MAX_RANGE_DAYS 超えは WorkloadRangeError。"""
+    default_from, default_to = calendar_range("month", None, today)[:2]
+    try:
+        start = date.fromisoformat(date_from) if date_from else default_from
+        end = date.fromisoformat(date_to) if date_to else default_to
+    except ValueError:
+        raise WorkloadRangeError("期間は YYYY-MM-DD 形式で指定してください。") from None
+    if start > end:
+        raise WorkloadRangeError("期間の開始日は終了日以前にしてください。")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise WorkloadRangeError(f"期間は{MAX_RANGE_DAYS}日以内で指定してください。")
+    return start, end
+
+
+class days_between(FunctionElement):
+    """終了日 - 開始日（日数）。DB ごとに日付の差の書き方が違うため方言別に組み立てる。"""
+
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(days_between)
+def _days_between_default(element, compiler, **kw):
+    end, start = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"({end} - {start})"
+
+
+@compiles(days_between, "sqlite")
+def _days_between_sqlite(element, compiler, **kw):
+    end, start = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"CAST(julianday({end}) - julianday({start}) AS INTEGER)"
+
+
+@compiles(days_between, "mysql")
+def _days_between_mysql(element, compiler, **kw):
+    end, start = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"DATEDIFF({end}, {start})"
+
+
+class week_start(FunctionElement):
+    """日付を含む週の月曜日。"""
+
+    type = Date()
+    inherit_cache = True
+
+
+@compiles(week_start)
+def _week_start_default(element, compiler, **kw):
+    return f"CAST(date_trunc('week', {compiler.process(element.clauses, **kw)}) AS DATE)"
+
+
+@compiles(week_start, "sqlite")
+def _week_start_sqlite(element, compiler, **kw):
+    return f"date({compiler.process(element.clauses, **kw)}, 'weekday 0', '-6 days')"
+
+
+@compiles(week_start, "mysql")
+def _week_start_mysql(element, compiler, **kw):
+    value = compiler.process(element.clauses, **kw)
+    return f"DATE_SUB({value}, INTERVAL WEEKDAY({value}) DAY)"
+
+
+@dataclass
+class WorkloadRow:
+    owner: str
+    bucket: date | None
+    planned: int = 0
+    overdue: int = 0
+    done: int = 0
+    lead_days_total: int = 0
+    lead_count: int = 0
+
+    @property
+    def avg_lead_days(self) -> float | None:
+        """完了までのリードタイム（実績日 - 予定日）の平均。予定日のない完了は含めない。"""
+        if not self.lead_count:
+            return None
+        return round(self.lead_days_total / self.lead_count, 1)
+
+    def add(self, other: WorkloadRow) -> None:
+        self.planned += other.planned
+        self.overdue += other.overdue
+        self.done += other.done
+        self.lead_days_total += other.lead_days_total
+        self.lead_count += other.lead_count
+
+
+@dataclass
+class WorkloadReport:
+    date_from: date
+    date_to: date
+    bucket: str
+    rows: list[WorkloadRow]
+    totals: list[WorkloadRow]
+    generated_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+def _bucket(column, bucket: str):
+    return week_start(column) if bucket == "week" else column
+
+
+def build_workload(
+    db: Session,
+    date_from: date,
+    date_to: date,
+    *,
+    bucket: str = "day",
+    owner: str | None = None,
+    today: date,
+) -> WorkloadReport:
+    """担当者×日（週）の作業量を集計する。
+
+    予定（PLANNED）は planned_owner と予定日、完了（DONE）は actual_owner と実績日で数える。
+    件数・期限超過・リードタイムの合計はどちらも DB の GROUP BY で求め、ここでは2つの結果を突き合わせるだけ。
+    """
+    planned_bucket = _bucket(PcPlan.planned_date, bucket).label("bucket")
+    planned_owner = func.coalesce(PcPlan.planned_owner, "").label("owner")
+    planned_query = (
+        select(
+            planned_owner,
+            planned_bucket,
+            func.count(PcPlan.id),
+            func.sum(case((PcPlan.planned_date < today, 1), else_=0)),
+        )
+        .where(PcPlan.plan_status == PlanStatus.PLANNED)
+        .where(PcPlan.planned_date >= date_from)
+        .where(PcPlan.planned_date <= date_to)
+        .group_by(planned_owner, planned_bucket)
+    )
+
+    done_bucket = _bucket(PcPlan.actual_date, bucket).label("bucket")
+    done_owner = func.coalesce(PcPlan.actual_owner, PcPlan.planned_owner, "").label("owner")
+    done_query = (
+        select(
+            done_owner,
+            done_bucket,
+            func.count(PcPlan.id),
+            func.coalesce(func.sum(days_between(PcPlan.actual_date, PcPlan.planned_date)), 0),
+            func.count(PcPlan.planned_date),
+        )
+        .where(PcPlan.plan_status == PlanStatus.DONE)
+        .where(PcPlan.actual_date >= date_from)
+        .where(PcPlan.actual_date <= date_to)
+        .group_by(done_owner, done_bucket)
+    )
+    if owner:
+        planned_query = planned_query.where(PcPlan.planned_owner.contains(owner))
+        done_query = done_query.where(func.coalesce(PcPlan.actual_owner, PcPlan.planned_owner).contains(owner))
+
+    rows: dict[tuple[str, date], WorkloadRow] = {}
+    for row_owner, row_bucket, planned, overdue in db.execute(planned_query):
+        rows[(row_owner, row_bucket)] = WorkloadRow(row_owner, row_bucket, planned=planned, overdue=overdue or 0)
+    for row_owner, row_bucket, done, lead_total, lead_count in db.execute(done_query):
+        row = rows.setdefault((row_owner, row_bucket), WorkloadRow(row_owner, row_bucket))
+        row.done = done
+        row.lead_days_total = int(lead_total or 0)
+        row.lead_count = lead_count
+
+    ordered = sorted(rows.values(), key=lambda row: (row.owner, row.bucket))
+    totals: dict[str, WorkloadRow] = {}
+    for row in ordered:
+        totals.setdefault(row.owner, WorkloadRow(row.owner, None)).add(row)
+    return WorkloadReport(
+        date_from=date_from,
+        date_to=date_to,
+        bucket=bucket,
+        rows=ordered,
+        totals=sorted(totals.values(), key=lambda row: (-(row.planned + row.done), row.owner)),
+    )
+
+
+class ReportCache:
+    """集計結果のプロセス内キャッシュ。キーに集計日を含め、日付が変わると前日の結果を捨てる。"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(self, today: date, key: tuple, compute: Callable[[], Any], *, refresh: bool = False) -> Any:
+        if self.maxsize <= 0:
+            return compute()
+        full_key = (today, *key)
+        with self._lock:
+            if not refresh and full_key in self._entries:
+                self._entries.move_to_end(full_key)
+                return self._entries[full_key]
+        value = compute()
+        with self._lock:
+            for stale in [entry for entry in self._entries if entry[0] != today]:
+                del self._entries[stale]
+            self._entries[full_key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import argparse
+import timeit
+import tracemalloc
+from datetime import date
+from typing import Callable
+
+from jinja2 import Template
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.models import PcAsset, PcPlan, PcRequest, PlanStatus
+from app.routes.assets import ASSET_LIST_COLUMNS
+from app.routes.plans import PLAN_LIST_COLUMNS
+from app.routes.requests import REQUEST_LIST_COLUMNS
+from tools.generate_data import generate
+
+ROW_TEMPLATE = Template(
+    "{% for row in rows %}<tr>{% for name in names %}<td>{{ row|attr(name) }}</td>{% endfor %}</tr>{% endfor %}"
+)
+NOTE_TEXT = "点検メモ " * 200
+
+
+def _pages(today: date) -> dict[str, tuple[Callable, Callable, list[str]]]:
+    overdue = (
+        (PcPlan.plan_status == PlanStatus.PLANNED),
+        PcPlan.planned_date.isnot(None),
+        PcPlan.planned_date < today,
+    )
+    return {
+        "assets": (
+            lambda db: db.query(PcAsset).order_by(PcAsset.id.desc()).limit(200).all(),
+            lambda db: db.execute(select(*ASSET_LIST_COLUMNS).order_by(PcAsset.id.desc()).limit(200)).all(),
+            [column.key for column in ASSET_LIST_COLUMNS],
+        ),
+        "requests": (
+            lambda db: db.query(PcRequest).order_by(PcRequest.id.desc()).limit(200).all(),
+            lambda db: db.execute(
+                select(*REQUEST_LIST_COLUMNS)
+                .select_from(PcRequest)
+                .outerjoin(PcRequest.asset)
+                .order_by(PcRequest.id.desc())
+                .limit(200)
+            ).all(),
+            [column.key for column in REQUEST_LIST_COLUMNS],
+        ),
+        "plans_overdue": (
+            lambda db: db.query(PcPlan).filter(*overdue).order_by(PcPlan.planned_date, PcPlan.id.desc()).limit(200).all(),
+            lambda db: db.execute(
+                select(*PLAN_LIST_COLUMNS).where(*overdue).order_by(PcPlan.planned_date, PcPlan.id.desc()).limit(200)
+            ).all(),
+            [column.key for column in PLAN_LIST_COLUMNS],
+        ),
+    }
+
+
+def _measure(engine, load: Callable, names: list[str], repeat: int) -> dict[str, float]:
+    def page() -> str:
+        with Session(engine) as db:
+            rows = load(db)
+            return ROW_TEMPLATE.render(rows=rows, names=names)
+
+    page()
+    best = min(timeit.repeat(page, number=1, repeat=repeat))
+    tracemalloc.start()
+    page()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ms": round(best * 1000, 2), "peak_kib": round(peak / 1024, 1)}
+
+
+def run(assets: int, repeat: int) -> dict[str, dict[str, dict[str, float]]]:
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    today = date.today()
+    generate(
+        "sqlite+pysqlite:///:memory:",
+        assets=assets,
+        requests=assets // 5,
+        plans=assets * 3,
+        history=assets * 2,
+        today=today,
+        engine=engine,
+    )
+    with engine.begin() as conn:
+        conn.execute(update(PcAsset).values(notes=NOTE_TEXT))
+        conn.execute(update(PcRequest).values(note=NOTE_TEXT))
+        conn.execute(update(PcPlan).values(result_note=NOTE_TEXT))
+
+    results = {}
+    for name, (orm_load, row_load, names) in _pages(today).items():
+        results[name] = {
+            "orm": _measure(engine, orm_load, names, repeat),
+            "rows": _measure(engine, row_load, names, repeat),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="一覧200件の取得+描画をORMエンティティと列指定Rowで比較します。")
+    parser.add_argument("--assets", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for name, result in run(args.assets, args.repeat).items():
+        orm, rows = result["orm"], result["rows"]
+        print(
+            f"{name:14} orm={orm['ms']:>7}ms/{orm['peak_kib']:>8}KiB  "
+            f"rows={rows['ms']:>7}ms/{rows['peak_kib']:>8}KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
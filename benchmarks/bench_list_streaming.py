@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from dataclasses import replace
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.requests import Request
+
+import app.routes.assets as assets_module
+from app.main import app
+from tools.generate_data import generate
+
+MODES = ["buffered", "streaming"]
+
+
+async def _measure(session_factory, *, stream: bool, rows: int) -> dict[str, float]:
+    assets_module.settings = replace(assets_module.settings, stream_lists=stream, list_row_limit=rows)
+    assets_module.row_cache.clear()
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/assets",
+        "query_string": b"",
+        "headers": [],
+        "app": app,
+        "session": {"user_id": "bench", "display_name": "bench"},
+        "server": ("bench", 80),
+        "scheme": "http",
+        "root_path": "",
+    }
+    db = session_factory()
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        response = await assets_module.assets(
+            Request(scope),
+            status=None,
+            asset_keyword=None,
+            location=None,
+            current_user=None,
+            planned_owner=None,
+            overdue_only=False,
+            today_only=False,
+            next_plan_limit=3,
+            db=db,
+        )
+        if stream:
+            chunks = response.body_iterator
+            await chunks.__anext__()
+            first_byte = time.perf_counter() - started
+            async for _ in chunks:
+                pass
+        else:
+            first_byte = time.perf_counter() - started
+        total = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        db.close()
+    return {
+        "first_byte_ms": round(first_byte * 1000, 2),
+        "total_ms": round(total * 1000, 2),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run(assets: int, repeat: int) -> dict[str, dict[str, float]]:
+    """資産一覧の全件（assets 行）を、一括描画とストリーミングで描画し、最初のバイトまでの時間とピークメモリを比べる。"""
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    generate(
+        "sqlite+pysqlite:///:memory:",
+        assets=assets,
+        requests=assets // 5,
+        plans=assets * 3,
+        history=assets * 2,
+        engine=engine,
+    )
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    original = assets_module.settings
+    results: dict[str, dict[str, float]] = {}
+    try:
+        for mode in MODES:
+            samples = [
+                asyncio.run(_measure(session_factory, stream=mode == "streaming", rows=assets))
+                for _ in range(repeat)
+            ]
+            results[mode] = {key: min(sample[key] for sample in samples) for key in samples[0]}
+    finally:
+        assets_module.settings = original
+        assets_module.row_cache.clear()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="大きな資産一覧の一括描画とストリーミング描画（最初のバイト/総時間/ピークメモリ）を比較します。")
+    parser.add_argument("--assets", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for mode, result in run(args.assets, args.repeat).items():
+        print(
+            f"{mode:<9} first_byte={result['first_byte_ms']}ms total={result['total_ms']}ms "
+            f"peak={result['peak_kib']}KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.requests import Request
+
+import app.routes.plans as plans_module
+from app.main import app
+from tools.generate_data import generate
+
+SCENARIOS: dict[str, dict[str, str | None]] = {
+    "month": {"view": "month"},
+    "month[owner]": {"view": "month", "planned_owner": "tech07"},
+    "month[location]": {"view": "month", "location": "本社"},
+    "week": {"view": "week"},
+}
+
+
+async def _render(session_factory, params: dict[str, str | None]) -> float:
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/plans/calendar",
+        "query_string": b"",
+        "headers": [],
+        "app": app,
+        "session": {"user_id": "bench", "display_name": "bench"},
+        "server": ("bench", 80),
+        "scheme": "http",
+        "root_path": "",
+    }
+    db = session_factory()
+    started = time.perf_counter()
+    try:
+        response = await plans_module.plans_calendar(
+            Request(scope),
+            view=params["view"],
+            start=None,
+            planned_owner=params.get("planned_owner"),
+            location=params.get("location"),
+            db=db,
+        )
+        assert response.status_code == 200
+        return time.perf_counter() - started
+    finally:
+        db.close()
+
+
+def run(plans: int, repeat: int) -> dict[str, float]:
+    """予定 plans 件（資産はその 1/3）で、予定カレンダーの月/週表示の描画時間(ms)を測る。"""
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    generate(
+        "sqlite+pysqlite:///:memory:",
+        assets=max(plans // 3, 1),
+        requests=max(plans // 15, 1),
+        plans=plans,
+        history=0,
+        engine=engine,
+    )
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    results: dict[str, float] = {}
+    for name, params in SCENARIOS.items():
+        samples = [asyncio.run(_render(session_factory, params)) for _ in range(repeat)]
+        results[name] = round(min(samples) * 1000, 2)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="予定カレンダー（日別集計）の月/週表示の描画時間を計測します。")
+    parser.add_argument("--plans", type=int, default=300_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for name, elapsed_ms in run(args.plans, args.repeat).items():
+        print(f"{name:<16} {elapsed_ms}ms")
+
+
+if __name__ == "__main__":
+    main()
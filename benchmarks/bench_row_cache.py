@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import argparse
+import timeit
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.routes.assets as assets_module
+from app.db import get_db
+from app.main import app
+from app.models import User, UserRole
+from app.security import hash_passcode
+from tools.generate_data import generate
+
+
+def run(assets: int, repeat: int) -> dict[str, float]:
+    """資産一覧（200行）の応答時間を、行キャッシュなし（毎回クリア）とキャッシュ済みで比較する。"""
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    generate(
+        "sqlite+pysqlite:///:memory:",
+        assets=assets,
+        requests=assets // 5,
+        plans=assets * 3,
+        history=assets * 2,
+        engine=engine,
+    )
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with session_factory() as db:
+        db.add(
+            User(
+                user_id="bench",
+                passcode_hash=hash_passcode("benchpass"),
+                display_name="bench",
+                role=UserRole.USER,
+                is_active=True,
+            )
+        )
+        db.commit()
+
+    def override_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    cache = assets_module.row_cache
+    app.dependency_overrides[get_db] = override_db
+    try:
+        client = TestClient(app)
+        client.post("/login", data={"user_id": "bench", "passcode": "benchpass"})
+
+        def uncached() -> None:
+            cache.clear()
+            client.get("/assets", params={"next_plan_limit": 3})
+
+        def cached() -> None:
+            client.get("/assets", params={"next_plan_limit": 3})
+
+        uncached()
+        uncached_best = min(timeit.repeat(uncached, number=1, repeat=repeat))
+        cache.clear()
+        cached()
+        cached_best = min(timeit.repeat(cached, number=1, repeat=repeat))
+        hit_rate = cache.hits / max(1, cache.hits + cache.misses)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        cache.clear()
+    return {
+        "uncached_ms": round(uncached_best * 1000, 2),
+        "cached_ms": round(cached_best * 1000, 2),
+        "hit_rate": round(hit_rate, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="資産一覧の行HTMLキャッシュの効果（キャッシュなし/あり）を計測します。")
+    parser.add_argument("--assets", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    result = run(args.assets, args.repeat)
+    print(
+        f"assets uncached={result['uncached_ms']}ms cached={result['cached_ms']}ms "
+        f"hit_rate={result['hit_rate']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PAGES = ["/dashboard", "/assets", "/requests", "/plans/overdue", "/assets/new"]
+SCENARIOS = ["development", "production-cold", "production-warm"]
+
+
+def _child() -> None:
+    """新しいプロセスで起動から各画面の初回応答までを測り、JSONで出力する。"""
+    start = time.perf_counter()
+    from fastapi.testclient import TestClient
+
+    from app.db import Base, SessionLocal, engine
+    from app.main import app
+    from app.models import User, UserRole
+    from app.security import hash_passcode
+
+    imported = time.perf_counter()
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.add(
+            User(
+                user_id="bench",
+                passcode_hash=hash_passcode("benchpass"),
+                display_name="bench",
+                role=UserRole.USER,
+                is_active=True,
+            )
+        )
+        db.commit()
+
+    client = TestClient(app)
+    setup_done = time.perf_counter()
+    client.get("/login")
+    first_response = time.perf_counter()
+    client.post("/login", data={"user_id": "bench", "passcode": "benchpass"})
+    pages_start = time.perf_counter()
+    for path in PAGES:
+        client.get(path)
+    pages_done = time.perf_counter()
+
+    print(
+        json.dumps(
+            {
+                "import_ms": round((imported - start) * 1000, 1),
+                "first_response_ms": round(
+                    (first_response - start - (setup_done - imported)) * 1000, 1
+                ),
+                "first_pages_ms": round((pages_done - pages_start) * 1000, 1),
+            }
+        )
+    )
+
+
+def _run_child(mode: str, cache_dir: str, workdir: str) -> dict[str, float]:
+    env = {
+        **os.environ,
+        "TEMPLATE_MODE": mode,
+        "TEMPLATE_CACHE_DIR": cache_dir,
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'startup.db')}",
+    }
+    if os.path.exists(os.path.join(workdir, "startup.db")):
+        os.remove(os.path.join(workdir, "startup.db"))
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child"],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(repeat: int) -> dict[str, dict[str, float]]:
+    """シナリオごとに新しいプロセスを repeat 回起動し、各指標の最小値を返す。
+
+    production-cold は毎回空のバイトコードキャッシュ、production-warm は事前に作ったキャッシュを使う。
+    """
+    results: dict[str, dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        warm_dir = os.path.join(workdir, "warm")
+        _run_child("production", warm_dir, workdir)
+        for scenario in SCENARIOS:
+            samples = []
+            for index in range(repeat):
+                if scenario == "production-warm":
+                    samples.append(_run_child("production", warm_dir, workdir))
+                else:
+                    cache_dir = os.path.join(workdir, f"{scenario}-{index}")
+                    samples.append(_run_child(scenario.split("-")[0], cache_dir, workdir))
+            results[scenario] = {key: min(sample[key] for sample in samples) for key in samples[0]}
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="テンプレートモード別に、起動から初回応答・主要画面の初回表示までの時間を計測します。"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child()
+        return
+    for scenario, result in run(args.repeat).items():
+        print(
+            f"{scenario:16} import={result['import_ms']:>7}ms  "
+            f"first_response={result['first_response_ms']:>7}ms  "
+            f"first_pages={result['first_pages_ms']:>7}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
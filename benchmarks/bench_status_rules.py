@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import argparse
+import random
+import timeit
+
+from app.status_rules import (
+    ASSET_STATUSES,
+    ASSET_TRANSITIONS,
+    is_allowed_asset_transition,
+    list_allowed_asset_targets,
+)
+
+
+def _pairs(count: int, seed: int) -> list[tuple[str | None, str]]:
+    rng = random.Random(seed)
+    statuses = sorted(ASSET_STATUSES)
+    return [(rng.choice([None, *statuses]), rng.choice(statuses)) for _ in range(count)]
+
+
+def run(count: int, repeat: int, seed: int) -> dict[str, float]:
+    pairs = _pairs(count, seed)
+    froms = [from_status for from_status, _ in pairs]
+    cases = {
+        "is_allowed_asset_transition": lambda: [is_allowed_asset_transition(f, t) for f, t in pairs],
+        "list_allowed_asset_targets": lambda: [list_allowed_asset_targets(f) for f in froms],
+        "validate_many": lambda: ASSET_TRANSITIONS.validate_many(pairs),
+    }
+    results: dict[str, float] = {}
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=repeat))
+        results[name] = best / count * 1e9
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="状態遷移判定のマイクロベンチマーク（1件あたりのns）。")
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for name, ns_per_op in run(args.count, args.repeat, args.seed).items():
+        print(f"{name:32} {ns_per_op:8.1f} ns/op")
+
+
+if __name__ == "__main__":
+    main()
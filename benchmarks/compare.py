@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+
+def _load(path: str) -> dict[str, dict[str, float]]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))["scenarios"]
+
+
+def _change(before: float, after: float) -> float | None:
+    if not before:
+        return None
+    return (after - before) / before * 100
+
+
+def compare(baseline: dict, current: dict, *, metric: str) -> list[tuple[str, float, float, float | None]]:
+    rows = []
+    for name in sorted(baseline.keys() & current.keys()):
+        before = baseline[name][metric]
+        after = current[name][metric]
+        rows.append((name, before, after, _change(before, after)))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="2つのベンチマーク結果JSONを比較します。")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--metric", default="p95_ms", choices=["p50_ms", "p95_ms", "p99_ms", "mean_ms", "rps"])
+    parser.add_argument("--fail-over", type=float, help="悪化率(%%)がこの値を超えたシナリオがあれば終了コード1")
+    args = parser.parse_args()
+
+    rows = compare(_load(args.baseline), _load(args.current), metric=args.metric)
+    regressions = []
+    for name, before, after, change in rows:
+        label = "n/a" if change is None else f"{change:+.1f}%"
+        print(f"{name:32} {before:>10} -> {after:>10} {label}")
+        if change is None or args.fail_over is None:
+            continue
+        worse = -change if args.metric == "rps" else change
+        if worse > args.fail_over:
+            regressions.append(name)
+
+    if regressions:
+        print(f"regressed: {', '.join(regressions)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import subprocess
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import httpx
+from sqlalchemy import create_engine, select
+
+from app.models import PcAsset, PcPlan, PlanStatus
+from benchmarks.seed import BENCH_PASSCODE, BENCH_USER_ID
+
+RESULTS_DIR = Path("benchmarks/results")
+
+ASSET_FILTERS: dict[str, dict[str, str]] = {
+    "none": {},
+    "status": {"status": "USE"},
+    "asset_keyword": {"asset_keyword": "AST-000012"},
+    "location": {"location": "大阪支社"},
+    "current_user": {"current_user": "user001"},
+    "planned_owner": {"planned_owner": "tech07"},
+    "overdue_only": {"overdue_only": "true"},
+    "today_only": {"today_only": "true"},
+    "next_plan_limit": {"next_plan_limit": "3"},
+    "combined": {"status": "USE", "location": "大阪支社", "overdue_only": "true"},
+}
+
+RunFn = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+@dataclass
+class Scenario:
+    name: str
+    run: RunFn
+    authenticated: bool = True
+
+
+@dataclass
+class Fixtures:
+    assets: int
+    requests: int
+    plans: int
+    asset_plans: list[tuple[int, int]]
+    versions: dict[tuple[str, int], int]
+
+
+def _percentile(sorted_values: list[float], percent: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies_ms: list[float], errors: int, elapsed_sec: float) -> dict[str, float | int]:
+    ordered = sorted(latencies_ms)
+    count = len(ordered)
+    return {
+        "requests": count,
+        "errors": errors,
+        "rps": round(count / elapsed_sec, 1) if elapsed_sec > 0 else 0.0,
+        "mean_ms": round(sum(ordered) / count, 2) if count else 0.0,
+        "p50_ms": round(_percentile(ordered, 50), 2),
+        "p95_ms": round(_percentile(ordered, 95), 2),
+        "p99_ms": round(_percentile(ordered, 99), 2),
+    }
+
+
+def _load_fixtures(database_url: str, assets: int, requests: int, plans: int, sample: int) -> Fixtures:
+    engine = create_engine(database_url)
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(PcPlan.id, PcPlan.entity_id, PcPlan.version)
+            .where(PcPlan.entity_type == "ASSET")
+            .where(PcPlan.plan_status == PlanStatus.PLANNED)
+            .order_by(PcPlan.id.desc())
+            .limit(sample * 2)
+        ).all()
+        versions = {("plan", row.id): row.version for row in rows}
+        assets_rows = conn.execute(select(PcAsset.id, PcAsset.version).where(PcAsset.id > assets - max(1, assets // 10)))
+        versions.update({("asset", row.id): row.version for row in assets_rows})
+    engine.dispose()
+    return Fixtures(
+        assets=assets,
+        requests=requests,
+        plans=plans,
+        asset_plans=[(row.entity_id, row.id) for row in rows],
+        versions=versions,
+    )
+
+
+def build_scenarios(fixtures: Fixtures, seed: int) -> list[Scenario]:
+    rng = random.Random(seed)
+    today = date.today().isoformat()
+
+    def random_id(upper: int) -> int:
+        return rng.randint(1, max(1, upper))
+
+    async def login(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.post("/login", data={"user_id": BENCH_USER_ID, "passcode": BENCH_PASSCODE})
+
+    def get(path_fn: Callable[[int], str], params: dict[str, str] | None = None) -> RunFn:
+        async def run(client: httpx.AsyncClient, i: int) -> httpx.Response:
+            return await client.get(path_fn(i), params=params)
+
+        return run
+
+    def transition(to_status: str) -> RunFn:
+        async def run(client: httpx.AsyncClient, i: int) -> httpx.Response:
+            asset_id = fixtures.assets - (i % max(1, fixtures.assets // 10))
+            key = ("asset", asset_id)
+            res = await client.post(
+                f"/assets/{asset_id}/transition",
+                data={"to_status": to_status, "version": str(fixtures.versions.get(key, 1))},
+            )
+            if res.status_code == 303:
+                fixtures.versions[key] = fixtures.versions.get(key, 1) + 1
+            return res
+
+        return run
+
+    async def plan_add(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        return await client.post(
+            f"/assets/{random_id(fixtures.assets)}/plans",
+            data={"title": f"bench-{i}", "planned_date": today, "planned_owner": "tech01"},
+        )
+
+    half = len(fixtures.asset_plans) // 2
+
+    async def plan_done(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        asset_id, plan_id = fixtures.asset_plans[i % max(1, half)]
+        return await client.post(
+            f"/assets/{asset_id}/plans/{plan_id}/done",
+            data={
+                "actual_date": today,
+                "result_note": "bench",
+                "version": str(fixtures.versions[("plan", plan_id)]),
+            },
+        )
+
+    async def plan_cancel(client: httpx.AsyncClient, i: int) -> httpx.Response:
+        asset_id, plan_id = fixtures.asset_plans[half + i % max(1, len(fixtures.asset_plans) - half)]
+        return await client.post(
+            f"/assets/{asset_id}/plans/{plan_id}/cancel",
+            data={"version": str(fixtures.versions[("plan", plan_id)])},
+        )
+
+    scenarios = [
+        Scenario("login", login, authenticated=False),
+        Scenario("dashboard", get(lambda i: "/dashboard")),
+    ]
+    for name, params in ASSET_FILTERS.items():
+        scenarios.append(Scenario(f"assets[{name}]", get(lambda i: "/assets", params)))
+    scenarios.extend(
+        [
+            Scenario("asset_detail", get(lambda i: f"/assets/{random_id(fixtures.assets)}")),
+            Scenario("requests", get(lambda i: "/requests")),
+            Scenario("request_detail", get(lambda i: f"/requests/{random_id(fixtures.requests)}")),
+            Scenario("plans_overdue", get(lambda i: "/plans/overdue")),
+            Scenario("plan_detail", get(lambda i: f"/plans/{random_id(fixtures.plans)}")),
+            Scenario("asset_transition[to_AUD]", transition("AUD")),
+            Scenario("asset_transition[to_INV]", transition("INV")),
+            Scenario("asset_plan_add", plan_add),
+        ]
+    )
+    if fixtures.asset_plans:
+        scenarios.extend(
+            [
+                Scenario("asset_plan_done", plan_done),
+                Scenario("asset_plan_cancel", plan_cancel),
+            ]
+        )
+    return scenarios
+
+
+async def _login(client: httpx.AsyncClient) -> None:
+    res = await client.post("/login", data={"user_id": BENCH_USER_ID, "passcode": BENCH_PASSCODE})
+    if res.status_code != 303 or res.headers.get("location") != "/dashboard":
+        raise RuntimeError("benchmark login failed; run benchmarks.seed against the server database first")
+
+
+async def run_scenario(
+    scenario: Scenario,
+    *,
+    base_url: str,
+    total: int,
+    concurrency: int,
+) -> dict[str, float | int]:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        if scenario.authenticated:
+            await _login(client)
+
+        latencies: list[float] = []
+        errors = 0
+        next_index = 0
+
+        async def worker() -> None:
+            nonlocal errors, next_index
+            while next_index < total:
+                index = next_index
+                next_index += 1
+                started = time.perf_counter()
+                try:
+                    response = await scenario.run(client, index)
+                    failed = response.status_code >= 400
+                except httpx.HTTPError:
+                    failed = True
+                latencies.append((time.perf_counter() - started) * 1000)
+                if failed:
+                    errors += 1
+
+        started_all = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started_all
+
+    return summarize(latencies, errors, elapsed)
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_all(args: argparse.Namespace) -> dict[str, object]:
+    fixtures = _load_fixtures(args.database_url, args.assets, args.requests, args.plans, args.requests_per_scenario)
+    scenarios = build_scenarios(fixtures, args.seed)
+    if args.only:
+        scenarios = [scenario for scenario in scenarios if any(key in scenario.name for key in args.only)]
+
+    results: dict[str, object] = {}
+    for scenario in scenarios:
+        summary = await run_scenario(
+            scenario,
+            base_url=args.base_url,
+            total=args.requests_per_scenario,
+            concurrency=args.concurrency,
+        )
+        results[scenario.name] = summary
+        print(
+            f"{scenario.name:32} rps={summary['rps']:>8} p50={summary['p50_ms']:>8}ms "
+            f"p95={summary['p95_ms']:>8}ms p99={summary['p99_ms']:>8}ms errors={summary['errors']}"
+        )
+
+    return {
+        "meta": {
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "base_url": args.base_url,
+            "concurrency": args.concurrency,
+            "requests_per_scenario": args.requests_per_scenario,
+            "data": {"assets": args.assets, "requests": args.requests, "plans": args.plans},
+        },
+        "scenarios": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="稼働中のアプリに負荷をかけ、シナリオ別のRPS/レイテンシを計測します。")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--database-url", default="sqlite:///./bench.db")
+    parser.add_argument("--assets", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--plans", type=int, default=300_000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests-per-scenario", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="*", help="シナリオ名の部分一致で絞り込み")
+    parser.add_argument("--output", help="結果JSONの出力先（既定: benchmarks/results/<日時>.json）")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_all(args))
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, delete, insert
+from sqlalchemy.engine import Engine
+
+from app.db import Base
+from app.models import User, UserRole
+from app.security import hash_passcode
+from tools.generate_data import generate
+
+BENCH_USER_ID = "bench"
+BENCH_PASSCODE = "benchpass"
+
+
+def seed(
+    engine: Engine,
+    *,
+    assets: int,
+    requests: int,
+    plans: int,
+    history: int,
+    seed_value: int = 42,
+    batch_size: int = 10_000,
+    workers: int = 1,
+) -> dict[str, int]:
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(delete(User).where(User.user_id == BENCH_USER_ID))
+        conn.execute(
+            insert(User),
+            {
+                "user_id": BENCH_USER_ID,
+                "passcode_hash": hash_passcode(BENCH_PASSCODE),
+                "display_name": "ベンチマーク",
+                "role": UserRole.ADMIN.value,
+                "is_active": True,
+                "created_at": datetime.now(timezone.utc),
+                "updated_at": datetime.now(timezone.utc),
+            },
+        )
+
+    return generate(
+        engine.url.render_as_string(hide_password=False),
+        assets=assets,
+        requests=requests,
+        plans=plans,
+        history=history,
+        seed=seed_value,
+        batch_size=batch_size,
+        workers=workers,
+        reset=True,
+        engine=engine,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ベンチマーク用データを投入します。")
+    parser.add_argument("--database-url", default="sqlite:///./bench.db")
+    parser.add_argument("--assets", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--plans", type=int, default=300_000)
+    parser.add_argument("--history", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    started = time.perf_counter()
+    counts = seed(
+        engine,
+        assets=args.assets,
+        requests=args.requests,
+        plans=args.plans,
+        history=args.history,
+        seed_value=args.seed,
+        batch_size=args.batch_size,
+        workers=args.workers,
+    )
+    elapsed = time.perf_counter() - started
+    print(f"seeded {counts} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
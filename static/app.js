@@ -0,0 +1,84 @@
+// 詳細画面の「さらに表示」: 行断片を取得して表に追記する（ページ全体は再取得しない）
+document.addEventListener("click", async (event) => {
+  const link = event.target.closest("[data-load-more]");
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  if (link.dataset.loading) {
+    return;
+  }
+  link.dataset.loading = "1";
+  try {
+    const response = await fetch(link.href, { credentials: "same-origin" });
+    if (!response.ok) {
+      throw new Error(`HTTP ${response.status}`);
+    }
+    const target = document.querySelector(link.dataset.target);
+    target.insertAdjacentHTML("beforeend", await response.text());
+    const nextUrl = response.headers.get("X-Next-Url");
+    if (nextUrl) {
+      link.href = nextUrl;
+      link.textContent = "さらに表示";
+    } else {
+      link.remove();
+    }
+  } catch (error) {
+    link.textContent = "読み込みに失敗しました（再試行）";
+  } finally {
+    delete link.dataset.loading;
+  }
+});
+
+// 資産一覧の行操作: フォームを fetch で送り、返ってきた行断片でその行だけを置き換える
+document.addEventListener("submit", async (event) => {
+  const form = event.target.closest("form[data-row-action]");
+  if (!form) {
+    return;
+  }
+  const row = form.closest("[data-asset-row]");
+  if (!row) {
+    return;
+  }
+  event.preventDefault();
+  const button = form.querySelector("button[type=submit]");
+  if (button) {
+    button.disabled = true;
+  }
+  row.querySelectorAll(".fragment-error").forEach((node) => node.remove());
+  try {
+    const response = await fetch(form.action, {
+      method: "POST",
+      body: new FormData(form),
+      credentials: "same-origin",
+      headers: { "X-Fragment": "row" },
+    });
+    const kind = response.headers.get("X-Fragment");
+    if (kind === "row") {
+      row.outerHTML = await response.text();
+    } else if (kind === "error") {
+      row.querySelector(".row-actions").insertAdjacentHTML("afterbegin", await response.text());
+    } else {
+      // ログイン切れなど断片以外が返ったときは通常の送信に切り替える
+      form.submit();
+    }
+  } catch (error) {
+    row.querySelector(".row-actions").insertAdjacentHTML(
+      "afterbegin",
+      '<div class="flash flash-error fragment-error" role="alert">送信に失敗しました。再度お試しください。</div>',
+    );
+  } finally {
+    if (button && button.isConnected) {
+      button.disabled = false;
+    }
+  }
+});
+
+// ストリーミング表示の一覧: 本文の最後に届いた件数を見出しへ反映する
+document.addEventListener("DOMContentLoaded", () => {
+  const marker = document.querySelector("[data-list-count]");
+  const target = document.getElementById("list-count");
+  if (marker && target) {
+    target.textContent = `件数: ${marker.dataset.listCount}`;
+  }
+});
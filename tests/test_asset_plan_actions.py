@@ -106,7 +106,7 @@ def test_asset_plan_done():
     db.close()
     res = client.post(
         f"/assets/1/plans/{plan.id}/done",
-        data={"actual_date": date.today().isoformat(), "result_note": "完了"},
+        data={"actual_date": date.today().isoformat(), "result_note": "完了", "version": str(plan.version)},
         follow_redirects=True,
     )
     assert res.status_code == 200
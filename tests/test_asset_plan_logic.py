@@ -1,7 +1,14 @@
 from datetime import date, timedelta
 
-from app.models import PcPlan, PlanStatus
-from app.routes.assets import _has_overdue_plan, _has_today_plan, _select_next_plans
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.db import Base
+from app.models import AssetStatus, PcAsset, PcPlan, PlanStatus
+from app.routes.assets import _build_assets_context, _select_next_plans
+from tools.generate_data import generate
 
 
 def _plan(
@@ -40,11 +47,36 @@ def test_select_next_plan_uses_min_date_and_ignores_null():
 
 
 def test_overdue_and_today_flags():
+    engine = create_engine("sqlite+pysqlite:///:memory:", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
     today = date.today()
-    plans = [
-        _plan(1, today - timedelta(days=1), PlanStatus.PLANNED),
-        _plan(2, today, PlanStatus.PLANNED),
-        _plan(3, today + timedelta(days=1), PlanStatus.PLANNED),
-    ]
-    assert _has_overdue_plan(plans, today) is True
-    assert _has_today_plan(plans, today) is True
+    with Session(engine) as db:
+        db.add(PcAsset(id=1, asset_tag="AST-1", status=AssetStatus.USE))
+        db.add_all(
+            [
+                _plan(1, today - timedelta(days=1), PlanStatus.PLANNED),
+                _plan(2, today, PlanStatus.PLANNED),
+                _plan(3, today + timedelta(days=1), PlanStatus.PLANNED),
+            ]
+        )
+        db.commit()
+        context = _build_assets_context(None, db, None, None, None, None, None, False, False, 1)
+    assert context["overdue_flags"] == {1: True}
+    # 次の予定（期限超過）とは別に今日の予定があれば、今日の予定ありとする
+    assert context["today_flags"] == {1: True}
+    assert [plan.id for plan in context["next_plans"][1]] == [1]
+
+
+def test_assets_context_uses_rows_without_identity_map():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    generate("sqlite+pysqlite:///:memory:", assets=30, requests=5, plans=90, history=60, engine=engine)
+    with Session(engine) as db:
+        context = _build_assets_context(None, db, None, None, None, None, None, False, False, 3)
+        assert len(context["assets"]) == 30
+        assert all(isinstance(asset, Row) for asset in context["assets"])
+        assert all(isinstance(plan, Row) for plans in context["next_plans"].values() for plan in plans)
+        assert len(db.identity_map) == 0
@@ -0,0 +1,73 @@
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.pool import StaticPool
+
+from app.models import PcAsset, PcPlan, PcStatusHistory, User
+from benchmarks.bench_list_rows import run as run_list_rows
+from benchmarks.bench_list_streaming import run as run_list_streaming
+from benchmarks.bench_plan_calendar import SCENARIOS as CALENDAR_SCENARIOS
+from benchmarks.bench_plan_calendar import run as run_plan_calendar
+from benchmarks.bench_row_cache import run as run_row_cache
+from benchmarks.bench_startup import SCENARIOS
+from benchmarks.bench_startup import run as run_startup
+from benchmarks.load_test import summarize
+from benchmarks.seed import BENCH_USER_ID, seed
+
+
+def test_seed_inserts_requested_volumes():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    counts = seed(engine, assets=30, requests=5, plans=60, history=90, batch_size=25)
+    assert counts == {"assets": 30, "requests": 5, "plans": 60, "history": 90}
+
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count(PcAsset.id))).scalar() == 30
+        assert conn.execute(select(func.count(PcPlan.id))).scalar() == 60
+        assert conn.execute(select(func.count(PcStatusHistory.id))).scalar() == 90
+        assert conn.execute(select(User.id).where(User.user_id == BENCH_USER_ID)).first() is not None
+
+
+def test_summarize_reports_percentiles():
+    summary = summarize([float(value) for value in range(1, 101)], errors=2, elapsed_sec=2.0)
+    assert summary["requests"] == 100
+    assert summary["errors"] == 2
+    assert summary["rps"] == 50.0
+    assert summary["p50_ms"] == 50.0
+    assert summary["p95_ms"] == 95.0
+    assert summary["p99_ms"] == 99.0
+
+
+def test_list_rows_benchmark_reports_both_strategies():
+    results = run_list_rows(assets=40, repeat=1)
+    assert set(results) == {"assets", "requests", "plans_overdue"}
+    for result in results.values():
+        assert result["rows"]["peak_kib"] < result["orm"]["peak_kib"]
+
+
+def test_startup_benchmark_measures_each_template_mode():
+    results = run_startup(repeat=1)
+    assert list(results) == SCENARIOS
+    for result in results.values():
+        assert result["first_response_ms"] >= result["import_ms"] > 0
+        assert result["first_pages_ms"] > 0
+
+
+def test_row_cache_benchmark_reports_hit_rate():
+    result = run_row_cache(assets=40, repeat=2)
+    assert set(result) == {"uncached_ms", "cached_ms", "hit_rate"}
+    assert result["hit_rate"] > 0.5
+
+
+def test_list_streaming_benchmark_sends_first_byte_early():
+    results = run_list_streaming(assets=300, repeat=1)
+    assert list(results) == ["buffered", "streaming"]
+    assert results["streaming"]["first_byte_ms"] < results["buffered"]["first_byte_ms"]
+    assert results["streaming"]["peak_kib"] < results["buffered"]["peak_kib"]
+
+
+def test_plan_calendar_benchmark_times_each_view():
+    results = run_plan_calendar(plans=300, repeat=1)
+    assert list(results) == list(CALENDAR_SCENARIOS)
+    assert all(elapsed_ms > 0 for elapsed_ms in results.values())
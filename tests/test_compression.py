@@ -0,0 +1,157 @@
+import asyncio
+import re
+import zlib
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.compression import GzipMiddleware
+from app.db import Base, get_db
+from app.main import app
+from app.models import AssetStatus, PcAsset, User, UserRole
+from app.security import hash_passcode
+from app.static_files import file_version, static_url
+
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def _override_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _seed():
+    db = TestingSessionLocal()
+    db.query(PcAsset).delete()
+    db.query(User).delete()
+    db.add(
+        User(
+            user_id="testuser",
+            passcode_hash=hash_passcode("pass1234"),
+            display_name="テスト太郎",
+            role=UserRole.USER,
+            is_active=True,
+        )
+    )
+    db.add_all(PcAsset(asset_tag=f"AST-GZ-{index:03d}", status=AssetStatus.INV) for index in range(60))
+    db.commit()
+    db.close()
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_db] = _override_db
+    test_client = TestClient(app)
+    login = test_client.post("/login", data={"user_id": "testuser", "passcode": "pass1234"}, follow_redirects=False)
+    assert login.status_code == 303
+    yield test_client
+    app.dependency_overrides.clear()
+
+
+def test_large_html_is_gzipped(client):
+    res = client.get("/assets", headers={"Accept-Encoding": "gzip"})
+    assert res.status_code == 200
+    assert res.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in res.headers["vary"]
+    assert int(res.headers["content-length"]) < len(res.content)
+    assert "AST-GZ-059" in res.text
+    assert res.headers["cache-control"] == "private, no-cache"
+
+
+def test_response_without_accept_encoding_is_plain(client):
+    res = client.get("/assets", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in res.headers
+    assert "AST-GZ-000" in res.text
+
+
+def _call(middleware, headers=(("accept-encoding", "gzip"),)):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(k.encode(), v.encode()) for k, v in headers]}
+    asyncio.run(middleware(scope, receive, send))
+    return messages
+
+
+def _app(content_type: str, chunks: list[bytes]):
+    async def inner(scope, receive, send):
+        headers = [(b"content-type", content_type.encode())]
+        if len(chunks) == 1:
+            headers.append((b"content-length", str(len(chunks[0])).encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        for index, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": index < len(chunks) - 1})
+
+    return inner
+
+
+def test_small_and_binary_responses_are_not_compressed():
+    small = _call(GzipMiddleware(_app("text/html", [b"<p>ok</p>"]), minimum_size=100))
+    assert small[1]["body"] == b"<p>ok</p>"
+    binary = _call(GzipMiddleware(_app("application/octet-stream", [b"x" * 500]), minimum_size=100))
+    assert (b"content-encoding", b"gzip") not in binary[0]["headers"]
+    assert binary[1]["body"] == b"x" * 500
+
+
+def test_streamed_chunks_are_flushed_as_they_arrive():
+    first = b"<h1>" + b"a" * 200 + b"</h1>"
+    second = b"<p>" + b"b" * 200 + b"</p>"
+    messages = _call(GzipMiddleware(_app("text/html; charset=utf-8", [first, second]), minimum_size=10_000))
+
+    start, *bodies = messages
+    assert (b"content-encoding", b"gzip") in start["headers"]
+    assert not any(name == b"content-length" for name, _ in start["headers"])
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert decoder.decompress(bodies[0]["body"]) == first
+    assert decoder.decompress(bodies[1]["body"]) == second
+    assert bodies[-1]["more_body"] is False
+
+
+def test_static_url_carries_content_hash(client):
+    html = client.get("/assets").text
+    css_url = static_url("app.css")
+    assert css_url == f"/static/app.css?v={file_version('static/app.css')}"
+    assert css_url in html
+    assert re.search(r'src="/static/app\.js\?v=[0-9a-f]{12}"', html)
+
+
+def test_hashed_static_is_immutable_and_others_revalidate(client):
+    hashed = client.get(static_url("app.css"))
+    assert hashed.status_code == 200
+    assert "immutable" in hashed.headers["cache-control"]
+    assert "max-age=31536000" in hashed.headers["cache-control"]
+
+    plain = client.get("/static/app.css")
+    assert plain.headers["cache-control"] == "no-cache"
+    stale = client.get("/static/app.css?v=000000000000")
+    assert stale.headers["cache-control"] == "no-cache"
+
+    revalidated = client.get("/static/app.css", headers={"If-None-Match": plain.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["cache-control"] == "no-cache"
+
+
+def test_file_version_changes_with_content(tmp_path):
+    path = tmp_path / "app.css"
+    path.write_text("body { color: red; }")
+    before = file_version(str(path))
+    path.write_text("body { color: blue; }")
+    assert file_version(str(path)) != before
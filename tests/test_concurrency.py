@@ -0,0 +1,210 @@
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy.pool import StaticPool
+
+import app.routes.assets as assets_module
+from app.db import Base, get_db
+from app.main import app
+from app.models import (
+    AssetStatus,
+    PcAsset,
+    PcPlan,
+    PcRequest,
+    PcStatusHistory,
+    PlanStatus,
+    RequestStatus,
+    User,
+    UserRole,
+)
+from app.security import hash_passcode
+
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def _override_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _seed_data() -> dict[str, int]:
+    db = TestingSessionLocal()
+    for model in (PcStatusHistory, PcPlan, PcRequest, PcAsset, User):
+        db.query(model).delete()
+
+    asset = PcAsset(asset_tag="AST-LOCK-01", status=AssetStatus.INV, location="本社")
+    req = PcRequest(status=RequestStatus.RQ, requester="申請者A")
+    db.add_all(
+        [
+            User(
+                user_id="testuser",
+                passcode_hash=hash_passcode("pass1234"),
+                display_name="テスト太郎",
+                role=UserRole.USER,
+                is_active=True,
+            ),
+            asset,
+            req,
+        ]
+    )
+    db.flush()
+    plan = PcPlan(
+        entity_type="ASSET",
+        entity_id=asset.id,
+        title="点検",
+        planned_date=date.today() - timedelta(days=1),
+        plan_status=PlanStatus.PLANNED,
+        created_by="testuser",
+    )
+    db.add(plan)
+    db.commit()
+    ids = {"asset": asset.id, "request": req.id, "plan": plan.id}
+    db.close()
+    return ids
+
+
+@pytest.fixture
+def ids():
+    return _seed_data()
+
+
+@pytest.fixture
+def client(ids):
+    app.dependency_overrides[get_db] = _override_db
+    test_client = TestClient(app)
+    login = test_client.post(
+        "/login",
+        data={"user_id": "testuser", "passcode": "pass1234"},
+        follow_redirects=False,
+    )
+    assert login.status_code == 303
+    yield test_client
+    app.dependency_overrides.clear()
+
+
+def _get(model, entity_id):
+    db = TestingSessionLocal()
+    try:
+        return db.get(model, entity_id)
+    finally:
+        db.close()
+
+
+def test_version_increments_on_update(client, ids):
+    res = client.post(
+        f"/assets/{ids['asset']}/transition",
+        data={"to_status": "READY", "version": "1"},
+        follow_redirects=False,
+    )
+    assert res.status_code == 303
+    assert _get(PcAsset, ids["asset"]).version == 2
+
+
+def test_second_transition_with_same_version_conflicts(client, ids):
+    first = client.post(
+        f"/assets/{ids['asset']}/transition",
+        data={"to_status": "READY", "version": "1"},
+        follow_redirects=False,
+    )
+    second = client.post(
+        f"/assets/{ids['asset']}/transition",
+        data={"to_status": "AUD", "version": "1"},
+        follow_redirects=False,
+    )
+    assert first.status_code == 303
+    assert second.status_code == 409
+    assert "他のユーザーが先に更新しました" in second.text
+
+    db = TestingSessionLocal()
+    assert db.get(PcAsset, ids["asset"]).status == AssetStatus.READY
+    assert db.query(PcStatusHistory).filter(PcStatusHistory.entity_id == ids["asset"]).count() == 1
+    db.close()
+
+
+def test_concurrent_write_after_check_returns_conflict(client, ids, monkeypatch):
+    def racing_writer(entity, submitted):
+        with engine.begin() as conn:
+            conn.execute(update(PcAsset).where(PcAsset.id == entity.id).values(version=PcAsset.version + 1))
+
+    monkeypatch.setattr(assets_module, "ensure_version", racing_writer)
+    res = client.post(
+        f"/assets/{ids['asset']}/transition",
+        data={"to_status": "READY", "version": "1"},
+        follow_redirects=False,
+    )
+    assert res.status_code == 409
+    db = TestingSessionLocal()
+    assert db.get(PcAsset, ids["asset"]).status == AssetStatus.INV
+    assert db.query(PcStatusHistory).count() == 0
+    db.close()
+
+
+def test_stale_forms_conflict(client, ids):
+    asset_res = client.post(
+        f"/assets/{ids['asset']}/edit",
+        data={"asset_tag": "AST-LOCK-01", "status": "INV", "version": "9"},
+        follow_redirects=False,
+    )
+    request_res = client.post(
+        f"/requests/{ids['request']}/transition",
+        data={"to_status": "OP", "version": "9"},
+        follow_redirects=False,
+    )
+    plan_res = client.post(
+        f"/plans/{ids['plan']}/done",
+        data={"result_note": "済", "version": "9"},
+        follow_redirects=False,
+    )
+    assert [asset_res.status_code, request_res.status_code, plan_res.status_code] == [409, 409, 409]
+    assert _get(PcPlan, ids["plan"]).plan_status == PlanStatus.PLANNED
+
+
+@pytest.mark.parametrize("version", [None, "", "abc"])
+def test_missing_or_malformed_version_conflicts(client, ids, version):
+    data = {"to_status": "READY"} if version is None else {"to_status": "READY", "version": version}
+    transition = client.post(f"/assets/{ids['asset']}/transition", data=data, follow_redirects=False)
+    edit_data = {"asset_tag": "AST-LOCK-01", "status": "INV"}
+    if version is not None:
+        edit_data["version"] = version
+    edit = client.post(f"/assets/{ids['asset']}/edit", data=edit_data, follow_redirects=False)
+    assert [transition.status_code, edit.status_code] == [409, 409]
+    asset = _get(PcAsset, ids["asset"])
+    assert asset.status == AssetStatus.INV
+    assert asset.version == 1
+
+
+def test_forms_carry_current_version(client, ids):
+    detail = client.get(f"/assets/{ids['asset']}")
+    edit = client.get(f"/assets/{ids['asset']}/edit")
+    assert 'name="version" value="1"' in detail.text
+    assert 'name="version" value="1"' in edit.text
+
+
+def test_orm_raises_stale_data_for_lost_update():
+    _seed_data()
+    first = TestingSessionLocal()
+    second = TestingSessionLocal()
+    try:
+        a = first.query(PcPlan).first()
+        b = second.query(PcPlan).first()
+        a.title = "先勝ち"
+        first.commit()
+        b.title = "後負け"
+        with pytest.raises(StaleDataError):
+            second.commit()
+    finally:
+        first.close()
+        second.close()
@@ -0,0 +1,204 @@
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.conditional as conditional_module
+from app.db import Base, get_db
+from app.main import app
+from app.models import (
+    AssetStatus,
+    IdempotencyKey,
+    PcAsset,
+    PcPlan,
+    PcRequest,
+    PcStatusHistory,
+    PlanStatus,
+    RequestStatus,
+    User,
+    UserRole,
+)
+from app.security import hash_passcode
+
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def _override_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def ids():
+    db = TestingSessionLocal()
+    for model in (IdempotencyKey, PcStatusHistory, PcPlan, PcRequest, PcAsset, User):
+        db.query(model).delete()
+    for user_id in ("testuser", "otheruser"):
+        db.add(
+            User(
+                user_id=user_id,
+                passcode_hash=hash_passcode("pass1234"),
+                display_name=user_id,
+                role=UserRole.USER,
+                is_active=True,
+            )
+        )
+    asset = PcAsset(asset_tag="AST-ETAG-1", status=AssetStatus.INV)
+    req = PcRequest(status=RequestStatus.RQ, requester="申請者")
+    db.add_all([asset, req])
+    db.flush()
+    plan = PcPlan(
+        entity_type="ASSET",
+        entity_id=asset.id,
+        title="点検",
+        planned_date=date.today() + timedelta(days=3),
+        plan_status=PlanStatus.PLANNED,
+        created_by="testuser",
+    )
+    db.add(plan)
+    db.commit()
+    result = {"asset": asset.id, "request": req.id, "plan": plan.id}
+    db.close()
+    app.dependency_overrides[get_db] = _override_db
+    yield result
+    app.dependency_overrides.clear()
+
+
+def _login(user_id: str = "testuser") -> TestClient:
+    test_client = TestClient(app)
+    login = test_client.post("/login", data={"user_id": user_id, "passcode": "pass1234"}, follow_redirects=False)
+    assert login.status_code == 303
+    return test_client
+
+
+@pytest.fixture
+def client(ids):
+    test_client = _login()
+    # ログイン時の Flash を消費しておく
+    test_client.get("/dashboard")
+    return test_client
+
+
+@pytest.mark.parametrize("kind", ["asset", "plan", "request"])
+def test_unchanged_detail_page_returns_304_after_one_query(client, ids, kind):
+    path = f"/{kind}s/{ids[kind]}"
+    first = client.get(path)
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        res = client.get(path, headers={"If-None-Match": etag})
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert res.status_code == 304
+    assert res.headers["etag"] == etag
+    assert res.content == b""
+    assert len(statements) == 1
+
+
+def test_plan_change_invalidates_asset_etag(client, ids):
+    path = f"/assets/{ids['asset']}"
+    etag = client.get(path).headers["etag"]
+
+    db = TestingSessionLocal()
+    db.get(PcPlan, ids["plan"]).title = "改題"
+    db.commit()
+    db.close()
+    res = client.get(path, headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert "改題" in res.text
+
+    etag = res.headers["etag"]
+    db = TestingSessionLocal()
+    db.delete(db.get(PcPlan, ids["plan"]))
+    db.commit()
+    db.close()
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_history_and_asset_update_invalidate_etag(client, ids):
+    path = f"/assets/{ids['asset']}"
+    etag = client.get(path).headers["etag"]
+    db = TestingSessionLocal()
+    db.add(
+        PcStatusHistory(
+            entity_type="ASSET",
+            entity_id=ids["asset"],
+            from_status="INV",
+            to_status="READY",
+            changed_by="testuser",
+        )
+    )
+    db.commit()
+    db.close()
+    res = client.get(path, headers={"If-None-Match": etag})
+    assert res.status_code == 200
+
+    etag = res.headers["etag"]
+    db = TestingSessionLocal()
+    db.get(PcAsset, ids["asset"]).location = "本社"
+    db.commit()
+    db.close()
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_etag_depends_on_user_and_date(client, ids, monkeypatch):
+    path = f"/plans/{ids['plan']}"
+    etag = client.get(path).headers["etag"]
+
+    other = _login("otheruser")
+    other.get("/dashboard")
+    assert other.get(path, headers={"If-None-Match": etag}).status_code == 200
+
+    tomorrow = date.today() + timedelta(days=1)
+
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return tomorrow
+
+    monkeypatch.setattr(conditional_module, "date", Tomorrow)
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_pending_flash_disables_etag(client, ids):
+    path = f"/plans/{ids['plan']}"
+    etag = client.get(path).headers["etag"]
+    res = client.post(
+        f"/plans/{ids['plan']}/edit",
+        data={
+            "entity_type": "ASSET",
+            "entity_id": str(ids["asset"]),
+            "title": "点検",
+            "planned_date": (date.today() + timedelta(days=3)).isoformat(),
+            "plan_status": "PLANNED",
+            "version": "1",
+        },
+        follow_redirects=False,
+    )
+    assert res.status_code == 303
+
+    with_flash = client.get(path, headers={"If-None-Match": etag})
+    assert with_flash.status_code == 200
+    assert "etag" not in with_flash.headers
+    assert "予定を更新しました" in with_flash.text
+    assert "etag" in client.get(path).headers
@@ -103,6 +103,7 @@ def test_asset_create_update_delete():
             "current_user": "",
             "location": "拠点B",
             "notes": "更新テスト",
+            "version": str(asset.version),
         },
         follow_redirects=False,
     )
@@ -148,6 +149,7 @@ def test_request_create_update_delete():
             "requester": "申請者B",
             "note": "更新テスト",
             "asset_id": "",
+            "version": str(req.version),
         },
         follow_redirects=False,
     )
@@ -205,6 +207,7 @@ def test_plan_create_update_delete():
             "actual_date": date.today().isoformat(),
             "actual_owner": "testuser",
             "result_note": "完了メモ",
+            "version": str(plan.version),
         },
         follow_redirects=False,
     )
@@ -0,0 +1,176 @@
+import re
+from dataclasses import replace
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.routes.assets as assets_module
+import app.routes.requests as requests_module
+from app.db import Base, get_db
+from app.main import app
+from app.models import AssetStatus, PcAsset, PcPlan, PcRequest, PcStatusHistory, PlanStatus, RequestStatus, User, UserRole
+from app.pagination import InvalidCursorError, decode_cursor
+from app.security import hash_passcode
+
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+PAGE_SIZE = 10
+HISTORY_COUNT = 45
+PLAN_COUNT = 25
+
+
+def _override_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _seed_data() -> dict[str, int]:
+    db = TestingSessionLocal()
+    for model in (PcStatusHistory, PcPlan, PcRequest, PcAsset, User):
+        db.query(model).delete()
+    db.add(
+        User(
+            user_id="testuser",
+            passcode_hash=hash_passcode("pass1234"),
+            display_name="テスト太郎",
+            role=UserRole.USER,
+            is_active=True,
+        )
+    )
+    asset = PcAsset(asset_tag="AST-PAGE-01", status=AssetStatus.INV)
+    req = PcRequest(status=RequestStatus.RQ, requester="申請者")
+    db.add_all([asset, req])
+    db.flush()
+
+    base = datetime(2026, 1, 1, 9, 0, 0)
+    for index in range(HISTORY_COUNT):
+        # 3件ずつ同時刻にして、同一 changed_at をまたぐページ境界も確認する
+        changed_at = base + timedelta(minutes=index // 3)
+        for entity_type, entity_id in (("ASSET", asset.id), ("REQUEST", req.id)):
+            db.add(
+                PcStatusHistory(
+                    entity_type=entity_type,
+                    entity_id=entity_id,
+                    from_status="INV",
+                    to_status="AUD",
+                    changed_by="testuser",
+                    reason=f"r-{index:03d}",
+                    changed_at=changed_at,
+                )
+            )
+    for index in range(PLAN_COUNT):
+        db.add(
+            PcPlan(
+                entity_type="ASSET",
+                entity_id=asset.id,
+                title=f"p-{index:03d}",
+                planned_date=None if index % 5 == 0 else date(2026, 1, 1) + timedelta(days=index // 2),
+                plan_status=PlanStatus.PLANNED,
+                created_by="testuser",
+            )
+        )
+    db.commit()
+    ids = {"asset": asset.id, "request": req.id}
+    db.close()
+    return ids
+
+
+@pytest.fixture
+def ids(monkeypatch):
+    for module in (assets_module, requests_module):
+        monkeypatch.setattr(module, "settings", replace(module.settings, detail_page_size=PAGE_SIZE))
+    app.dependency_overrides[get_db] = _override_db
+    yield _seed_data()
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def client(ids):
+    test_client = TestClient(app)
+    login = test_client.post("/login", data={"user_id": "testuser", "passcode": "pass1234"}, follow_redirects=False)
+    assert login.status_code == 303
+    return test_client
+
+
+def _next_url(html: str) -> str | None:
+    match = re.search(r'href="([^"]+)" data-load-more data-target="#history-rows"', html)
+    return match.group(1) if match else None
+
+
+def _load_all(client: TestClient, first_page: str, first_url: str | None, pattern: str) -> list[str]:
+    collected = re.findall(pattern, first_page)
+    url = first_url
+    while url:
+        res = client.get(url)
+        assert res.status_code == 200
+        collected.extend(re.findall(pattern, res.text))
+        url = res.headers["X-Next-Url"] or None
+    return collected
+
+
+def test_asset_detail_renders_first_page_only(client, ids):
+    res = client.get(f"/assets/{ids['asset']}")
+    assert res.status_code == 200
+    assert len(re.findall(r"r-\d{3}", res.text)) == PAGE_SIZE
+    assert "r-044" in res.text
+    assert _next_url(res.text) is not None
+
+
+def test_history_fragments_walk_every_row_once_in_order(client, ids):
+    page = client.get(f"/assets/{ids['asset']}").text
+    reasons = _load_all(client, page, _next_url(page), r"r-\d{3}")
+    assert reasons == [f"r-{index:03d}" for index in range(HISTORY_COUNT - 1, -1, -1)]
+
+
+def test_plan_fragments_include_undated_plans(client, ids):
+    page = client.get(f"/assets/{ids['asset']}").text
+    match = re.search(r'href="([^"]+)" data-load-more data-target="#plan-rows"', page)
+    titles = _load_all(client, page, match.group(1), r"p-\d{3}")
+    assert sorted(titles) == [f"p-{index:03d}" for index in range(PLAN_COUNT)]
+    assert len(titles) == PLAN_COUNT
+    assert titles[-5:] == ["p-020", "p-015", "p-010", "p-005", "p-000"]
+
+
+def test_request_history_fragments(client, ids):
+    page = client.get(f"/requests/{ids['request']}").text
+    reasons = _load_all(client, page, _next_url(page), r"r-\d{3}")
+    assert len(reasons) == HISTORY_COUNT
+    assert len(set(reasons)) == HISTORY_COUNT
+
+
+def test_fragment_does_not_requery_parent(client, ids):
+    page = client.get(f"/assets/{ids['asset']}").text
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        res = client.get(_next_url(page))
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert res.status_code == 200
+    assert statements
+    assert not any("pc_assets" in statement for statement in statements)
+    assert "<html" not in res.text
+
+
+def test_invalid_cursor_is_rejected(client, ids):
+    res = client.get(f"/assets/{ids['asset']}/history", params={"cursor": "not-a-cursor"})
+    assert res.status_code == 400
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("e30")
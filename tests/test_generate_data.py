@@ -0,0 +1,106 @@
+from datetime import date
+from itertools import groupby
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.pool import StaticPool
+
+from app.models import PcAsset, PcPlan, PcRequest, PcStatusHistory
+from app.status_rules import is_allowed_asset_transition, is_allowed_request_transition
+from tools.generate_data import generate, plan_chunks
+
+TODAY = date(2026, 4, 1)
+
+
+def _memory_engine():
+    return create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+
+def _generate(seed: int):
+    engine = _memory_engine()
+    counts = generate(
+        "sqlite+pysqlite:///:memory:",
+        assets=50,
+        requests=10,
+        plans=150,
+        history=400,
+        seed=seed,
+        today=TODAY,
+        batch_size=64,
+        engine=engine,
+    )
+    return engine, counts
+
+
+def _dump(engine):
+    with engine.connect() as conn:
+        return {
+            model.__tablename__: conn.execute(select(model.__table__).order_by(model.id)).all()
+            for model in (PcAsset, PcRequest, PcPlan, PcStatusHistory)
+        }
+
+
+def test_generate_hits_target_counts():
+    engine, counts = _generate(seed=7)
+    assert counts == {"assets": 50, "requests": 10, "plans": 150, "history": 400}
+    dump = _dump(engine)
+    assert len(dump["pc_assets"]) == 50
+    assert len(dump["pc_plans"]) == 150
+    assert len(dump["pc_status_history"]) == 400
+
+
+def test_generate_is_deterministic_per_seed():
+    first, _ = _generate(seed=7)
+    second, _ = _generate(seed=7)
+    other, _ = _generate(seed=8)
+    assert _dump(first) == _dump(second)
+    assert _dump(first)["pc_plans"] != _dump(other)["pc_plans"]
+
+
+def test_generated_history_obeys_status_rules():
+    engine, _ = _generate(seed=11)
+    with engine.connect() as conn:
+        statuses = dict(conn.execute(select(PcAsset.id, PcAsset.status)).all())
+        rows = conn.execute(
+            select(PcStatusHistory).order_by(
+                PcStatusHistory.entity_type,
+                PcStatusHistory.entity_id,
+                PcStatusHistory.id,
+            )
+        ).all()
+
+    for (entity_type, entity_id), chain in groupby(rows, key=lambda row: (row.entity_type, row.entity_id)):
+        chain = list(chain)
+        check = is_allowed_asset_transition if entity_type == "ASSET" else is_allowed_request_transition
+        assert chain[0].from_status is None
+        for previous, row in zip([None, *chain], chain):
+            if previous is not None:
+                assert row.from_status == previous.to_status
+            assert check(row.from_status, row.to_status)
+        if entity_type == "ASSET":
+            assert statuses[entity_id] == chain[-1].to_status
+
+
+def test_plan_chunks_allocate_contiguous_ids():
+    specs = plan_chunks(assets=25_000, plans=75_001, history=250_000)
+    assert [spec.asset_count for spec in specs] == [10_000, 10_000, 5_000]
+    assert sum(spec.plan_count for spec in specs) == 75_001
+    for previous, current in zip(specs, specs[1:]):
+        assert current.first_plan_id == previous.first_plan_id + previous.plan_count
+        assert current.first_history_id == previous.first_history_id + previous.history_count
+
+
+def test_generated_requests_and_assets_link_both_ways():
+    engine, _ = _generate(seed=7)
+    with engine.connect() as conn:
+        request_links = set(
+            conn.execute(select(PcRequest.id, PcRequest.asset_id).where(PcRequest.asset_id.is_not(None))).all()
+        )
+        asset_links = set(
+            conn.execute(select(PcAsset.request_id, PcAsset.id).where(PcAsset.request_id.is_not(None))).all()
+        )
+    assert request_links
+    assert request_links == asset_links
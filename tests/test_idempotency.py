@@ -0,0 +1,165 @@
+from dataclasses import replace
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.idempotency as idempotency_module
+from app.db import Base, get_db
+from app.main import app
+from app.models import (
+    AssetStatus,
+    IdempotencyKey,
+    PcAsset,
+    PcPlan,
+    PcRequest,
+    PcStatusHistory,
+    User,
+    UserRole,
+)
+from app.security import hash_passcode
+
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+KEY = "0123456789abcdef0123456789abcdef"
+
+
+def _override_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _seed_data() -> int:
+    db = TestingSessionLocal()
+    for model in (IdempotencyKey, PcStatusHistory, PcPlan, PcRequest, PcAsset, User):
+        db.query(model).delete()
+    for user_id in ("testuser", "otheruser"):
+        db.add(
+            User(
+                user_id=user_id,
+                passcode_hash=hash_passcode("pass1234"),
+                display_name=user_id,
+                role=UserRole.USER,
+                is_active=True,
+            )
+        )
+    asset = PcAsset(asset_tag="AST-IDEM-01", status=AssetStatus.INV)
+    db.add(asset)
+    db.commit()
+    asset_id = asset.id
+    db.close()
+    return asset_id
+
+
+def _login(user_id: str = "testuser") -> TestClient:
+    client = TestClient(app)
+    login = client.post("/login", data={"user_id": user_id, "passcode": "pass1234"}, follow_redirects=False)
+    assert login.status_code == 303
+    return client
+
+
+@pytest.fixture
+def asset_id():
+    app.dependency_overrides[get_db] = _override_db
+    yield _seed_data()
+    app.dependency_overrides.clear()
+
+
+def _count(model) -> int:
+    db = TestingSessionLocal()
+    try:
+        return db.query(model).count()
+    finally:
+        db.close()
+
+
+def test_double_submitted_plan_add_creates_one_plan(asset_id):
+    client = _login()
+    data = {"title": "点検", "planned_date": date.today().isoformat(), "idempotency_key": KEY}
+    first = client.post(f"/assets/{asset_id}/plans", data=data, follow_redirects=False)
+    second = client.post(f"/assets/{asset_id}/plans", data=data, follow_redirects=False)
+
+    assert first.status_code == second.status_code == 303
+    assert second.headers["location"] == first.headers["location"]
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert _count(PcPlan) == 1
+
+
+def test_double_submitted_transition_writes_one_history_row(asset_id):
+    client = _login()
+    data = {"to_status": "READY", "version": "1", "idempotency_key": KEY}
+    first = client.post(f"/assets/{asset_id}/transition", data=data, follow_redirects=False)
+    second = client.post(f"/assets/{asset_id}/transition", data=data, follow_redirects=False)
+
+    assert first.status_code == second.status_code == 303
+    assert _count(PcStatusHistory) == 1
+
+
+def test_header_key_replays_created_location(asset_id):
+    client = _login()
+    headers = {"Idempotency-Key": KEY}
+    first = client.post("/requests", data={"requester": "申請者"}, headers=headers, follow_redirects=False)
+    second = client.post("/requests", data={"requester": "申請者"}, headers=headers, follow_redirects=False)
+
+    assert first.headers["location"].startswith("/requests/")
+    assert second.headers["location"] == first.headers["location"]
+    assert _count(PcRequest) == 1
+
+
+def test_key_reused_by_other_user_is_rejected(asset_id):
+    data = {"title": "点検", "planned_date": date.today().isoformat(), "idempotency_key": KEY}
+    _login().post(f"/assets/{asset_id}/plans", data=data, follow_redirects=False)
+    res = _login("otheruser").post(f"/assets/{asset_id}/plans", data=data, follow_redirects=False)
+
+    assert res.status_code == 422
+    assert _count(PcPlan) == 1
+
+
+def test_failed_validation_does_not_consume_key(asset_id):
+    client = _login()
+    invalid = client.post("/assets", data={"asset_tag": "", "status": "INV", "idempotency_key": KEY})
+    assert invalid.status_code == 200
+    valid = client.post(
+        "/assets",
+        data={"asset_tag": "AST-IDEM-02", "status": "INV", "idempotency_key": KEY},
+        follow_redirects=False,
+    )
+    assert valid.status_code == 303
+    assert "Idempotent-Replayed" not in valid.headers
+    assert _count(PcAsset) == 2
+
+
+def test_expired_key_executes_again(asset_id, monkeypatch):
+    monkeypatch.setattr(
+        idempotency_module,
+        "settings",
+        replace(idempotency_module.settings, idempotency_ttl_sec=-1),
+    )
+    client = _login()
+    data = {"title": "点検", "planned_date": date.today().isoformat(), "idempotency_key": KEY}
+    client.post(f"/assets/{asset_id}/plans", data=data, follow_redirects=False)
+    client.post(f"/assets/{asset_id}/plans", data=data, follow_redirects=False)
+
+    assert _count(PcPlan) == 2
+    assert _count(IdempotencyKey) == 1
+
+
+def test_forms_embed_fresh_tokens(asset_id):
+    client = _login()
+    first = client.get("/assets/new").text
+    second = client.get("/assets/new").text
+    token = first.split('name="idempotency_key" value="')[1].split('"')[0]
+    assert len(token) == 32
+    assert token not in second
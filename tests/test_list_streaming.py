@@ -0,0 +1,208 @@
+import asyncio
+import re
+from dataclasses import replace
+from datetime import date, timedelta
+
+import pytest
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.routes.assets as assets_module
+import app.routes.plans as plans_module
+import app.routes.requests as requests_module
+import app.streaming as streaming_module
+from app.db import Base, get_db
+from app.main import app
+from app.models import (
+    AssetStatus,
+    PcAsset,
+    PcPlan,
+    PcRequest,
+    PcStatusHistory,
+    PlanStatus,
+    RequestStatus,
+    User,
+    UserRole,
+)
+from app.security import hash_passcode
+
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+ASSET_COUNT = 450
+REQUEST_COUNT = 260
+LIST_MODULES = (assets_module, requests_module, plans_module)
+
+
+def _override_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _seed():
+    db = TestingSessionLocal()
+    for model in (PcStatusHistory, PcPlan, PcRequest, PcAsset, User):
+        db.query(model).delete()
+    db.add(
+        User(
+            user_id="testuser",
+            passcode_hash=hash_passcode("pass1234"),
+            display_name="テスト太郎",
+            role=UserRole.USER,
+            is_active=True,
+        )
+    )
+    assets = [PcAsset(asset_tag=f"AST-STREAM-{index:04d}", status=AssetStatus.INV) for index in range(ASSET_COUNT)]
+    db.add_all(assets)
+    db.add_all(PcRequest(status=RequestStatus.RQ, requester=f"申請者{index}") for index in range(REQUEST_COUNT))
+    db.flush()
+    db.add_all(
+        PcPlan(
+            entity_type="ASSET",
+            entity_id=asset.id,
+            title=f"点検{index}",
+            planned_date=date.today() - timedelta(days=1 + index % 30),
+            plan_status=PlanStatus.PLANNED,
+            created_by="testuser",
+        )
+        for index, asset in enumerate(assets)
+        if index % 3 == 0
+    )
+    db.commit()
+    db.close()
+
+
+def _configure(monkeypatch, *, stream: bool):
+    for module in LIST_MODULES:
+        monkeypatch.setattr(
+            module,
+            "settings",
+            replace(module.settings, stream_lists=stream, list_row_limit=1000),
+        )
+
+
+@pytest.fixture
+def client():
+    assets_module.row_cache.clear()
+    app.dependency_overrides[get_db] = _override_db
+    test_client = TestClient(app)
+    login = test_client.post("/login", data={"user_id": "testuser", "passcode": "pass1234"}, follow_redirects=False)
+    assert login.status_code == 303
+    yield test_client
+    app.dependency_overrides.clear()
+
+
+PAGES = [
+    ("/assets", r'id="asset-row-(\d+)"'),
+    ("/requests", r'<a href="/requests/(\d+)">'),
+    ("/plans/overdue", r'<a href="/plans/(\d+)">'),
+]
+
+
+@pytest.mark.parametrize("path,pattern", PAGES)
+def test_streamed_page_matches_buffered_page(client, monkeypatch, path, pattern):
+    _configure(monkeypatch, stream=False)
+    buffered = client.get(path)
+    _configure(monkeypatch, stream=True)
+    streamed = client.get(path)
+
+    assert streamed.status_code == 200
+    assert "content-length" not in streamed.headers
+    assert "content-length" in buffered.headers
+    ids = re.findall(pattern, streamed.text)
+    assert ids == re.findall(pattern, buffered.text)
+    assert len(ids) >= 150
+    assert f'data-list-count="{len(ids)}"' in streamed.text
+    assert streamed.text.rstrip().endswith("</html>")
+
+
+def test_streamed_assets_apply_plan_filters(client, monkeypatch):
+    _configure(monkeypatch, stream=True)
+    html = client.get("/assets", params={"overdue_only": "true"}).text
+    assert len(re.findall(r'id="asset-row-(\d+)"', html)) == ASSET_COUNT // 3
+    assert "期限超過あり" in html
+
+
+def test_first_chunk_is_sent_before_later_partitions_are_read(monkeypatch):
+    _configure(monkeypatch, stream=True)
+    assets_module.row_cache.clear()
+    sessions = []
+    original_open = streaming_module.open_stream_session
+
+    def capture_session(db):
+        session = original_open(db)
+        sessions.append(session)
+        return session
+
+    monkeypatch.setattr(assets_module, "open_stream_session", capture_session)
+
+    plan_queries: list[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM pc_plans" in statement:
+            plan_queries.append(statement)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/assets",
+        "query_string": b"",
+        "headers": [],
+        "app": app,
+        "session": {"user_id": "testuser", "display_name": "テスト太郎"},
+        "server": ("testserver", 80),
+        "scheme": "http",
+        "root_path": "",
+    }
+
+    async def drive():
+        from starlette.requests import Request
+
+        db = TestingSessionLocal()
+        try:
+            response = await assets_module.assets(
+                Request(scope),
+                status=None,
+                asset_keyword=None,
+                location=None,
+                current_user=None,
+                planned_owner=None,
+                overdue_only=False,
+                today_only=False,
+                next_plan_limit=1,
+                db=db,
+            )
+        finally:
+            db.close()
+        assert isinstance(response, StreamingResponse)
+        chunks = response.body_iterator
+        first = await chunks.__anext__()
+        queries_at_first_chunk = len(plan_queries)
+        still_open = sessions[0].in_transaction()
+        rest = [chunk async for chunk in chunks]
+        return first, queries_at_first_chunk, still_open, rest
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        first, queries_at_first_chunk, still_open, rest = asyncio.run(drive())
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert "<h1>資産一覧</h1>" in first.decode("utf-8")
+    assert queries_at_first_chunk == 1
+    assert len(plan_queries) == -(-ASSET_COUNT // streaming_module.PARTITION_SIZE)
+    assert rest
+    assert still_open
+    assert not sessions[0].in_transaction()
@@ -0,0 +1,84 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import Base, get_db
+from app.main import app
+from app.models import User, UserRole
+from app.security import hash_passcode
+
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def _override_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _login_client(role: UserRole) -> TestClient:
+    app.dependency_overrides[get_db] = _override_db
+    db = TestingSessionLocal()
+    db.query(User).delete()
+    db.add(
+        User(
+            user_id="testuser",
+            passcode_hash=hash_passcode("pass1234"),
+            display_name="テスト太郎",
+            role=role,
+            is_active=True,
+        )
+    )
+    db.commit()
+    db.close()
+    client = TestClient(app)
+    login = client.post(
+        "/login",
+        data={"user_id": "testuser", "passcode": "pass1234"},
+        follow_redirects=False,
+    )
+    assert login.status_code == 303
+    client.cookies.update(login.cookies)
+    return client
+
+
+def test_memory_snapshot_and_diff():
+    client = _login_client(UserRole.ADMIN)
+    try:
+        assert client.post("/admin/memory/start").json()["tracing"] is True
+
+        first = client.post("/admin/memory/snapshots", data={"label": "before"})
+        assert first.status_code == 201
+        client.get("/assets")
+        second = client.post("/admin/memory/snapshots", data={"label": "after"})
+        assert second.status_code == 201
+        assert all(row["file"].startswith("app/") for row in second.json()["top"])
+
+        diff = client.get(
+            "/admin/memory/diff",
+            params={"base": first.json()["id"], "target": second.json()["id"]},
+        )
+        assert diff.status_code == 200
+        body = diff.json()
+        assert body["base"]["label"] == "before"
+        assert body["target"]["label"] == "after"
+        assert "top" in body
+    finally:
+        client.post("/admin/memory/stop")
+        app.dependency_overrides.clear()
+
+
+def test_memory_endpoints_admin_only():
+    client = _login_client(UserRole.USER)
+    assert client.post("/admin/memory/start").status_code == 403
+    assert client.get("/admin/memory").status_code == 403
+    app.dependency_overrides.clear()
@@ -108,7 +108,7 @@ def test_asset_transition_allowed():
 
     res = client.post(
         f"/assets/{asset.id}/transition",
-        data={"to_status": "READY", "reason": "テスト"},
+        data={"to_status": "READY", "reason": "テスト", "version": str(asset.version)},
         follow_redirects=False,
     )
     assert res.status_code == 303
@@ -128,7 +128,7 @@ def test_asset_transition_denied():
 
     res = client.post(
         f"/assets/{asset.id}/transition",
-        data={"to_status": "USE"},
+        data={"to_status": "USE", "version": str(asset.version)},
         follow_redirects=False,
     )
     assert res.status_code == 409
@@ -143,7 +143,7 @@ def test_request_transition_allowed():
 
     res = client.post(
         f"/requests/{req.id}/transition",
-        data={"to_status": "OP", "reason": "テスト"},
+        data={"to_status": "OP", "reason": "テスト", "version": str(req.version)},
         follow_redirects=False,
     )
     assert res.status_code == 303
@@ -163,7 +163,7 @@ def test_plan_done_updates_actuals():
 
     res = client.post(
         f"/plans/{plan.id}/done",
-        data={"result_note": "完了メモ"},
+        data={"result_note": "完了メモ", "version": str(plan.version)},
         follow_redirects=False,
     )
     assert res.status_code == 303
@@ -0,0 +1,210 @@
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import Base, get_db
+from app.main import app
+from app.models import (
+    AssetStatus,
+    PcAsset,
+    PcPlan,
+    PcRequest,
+    PcStatusHistory,
+    PlanStatus,
+    RequestStatus,
+    User,
+    UserRole,
+)
+from app.plan_calendar import CalendarRangeError, build_weeks, calendar_range, shift
+from app.security import hash_passcode
+
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def _override_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _plan(entity_type: str, entity_id: int, planned_date: date, owner: str, status=PlanStatus.PLANNED) -> PcPlan:
+    return PcPlan(
+        entity_type=entity_type,
+        entity_id=entity_id,
+        title="点検",
+        planned_date=planned_date,
+        planned_owner=owner,
+        plan_status=status,
+        actual_date=planned_date if status == PlanStatus.DONE else None,
+        actual_owner=owner if status == PlanStatus.DONE else None,
+        created_by="testuser",
+    )
+
+
+@pytest.fixture
+def client():
+    db = TestingSessionLocal()
+    for model in (PcStatusHistory, PcPlan, PcRequest, PcAsset, User):
+        db.query(model).delete()
+    db.add(
+        User(
+            user_id="testuser",
+            passcode_hash=hash_passcode("pass1234"),
+            display_name="テスト太郎",
+            role=UserRole.USER,
+            is_active=True,
+        )
+    )
+    tokyo = PcAsset(asset_tag="AST-CAL-1", status=AssetStatus.USE, location="本社")
+    osaka = PcAsset(asset_tag="AST-CAL-2", status=AssetStatus.USE, location="大阪支社")
+    req = PcRequest(status=RequestStatus.RQ, requester="申請者")
+    db.add_all([tokyo, osaka, req])
+    db.flush()
+    db.add_all(
+        [
+            _plan("ASSET", tokyo.id, date(2026, 3, 2), "tech01"),
+            _plan("ASSET", tokyo.id, date(2026, 3, 2), "tech01"),
+            _plan("ASSET", osaka.id, date(2026, 3, 2), "tech02"),
+            _plan("REQUEST", req.id, date(2026, 3, 31), "tech02"),
+            _plan("ASSET", osaka.id, date(2026, 3, 10), "tech01", status=PlanStatus.DONE),
+            _plan("ASSET", tokyo.id, date(2026, 4, 1), "tech01"),
+        ]
+    )
+    db.commit()
+    db.close()
+    app.dependency_overrides[get_db] = _override_db
+    test_client = TestClient(app)
+    login = test_client.post("/login", data={"user_id": "testuser", "passcode": "pass1234"}, follow_redirects=False)
+    assert login.status_code == 303
+    test_client.get("/dashboard")
+    yield test_client
+    app.dependency_overrides.clear()
+
+
+def test_month_range_covers_whole_weeks():
+    first, last, grid_start, grid_end = calendar_range("month", "2026-02", date(2026, 10, 19))
+    assert (first, last) == (date(2026, 2, 1), date(2026, 2, 28))
+    assert grid_start == date(2026, 1, 26) and grid_start.weekday() == 0
+    assert grid_end == date(2026, 3, 1) and grid_end.weekday() == 6
+    assert shift("month", date(2026, 12, 1), 1) == date(2027, 1, 1)
+    assert shift("month", date(2026, 1, 1), -1) == date(2025, 12, 1)
+
+
+def test_week_range_starts_on_monday():
+    assert calendar_range("week", "2026-10-22", date(2026, 10, 19))[:2] == (date(2026, 10, 19), date(2026, 10, 25))
+    assert shift("week", date(2026, 10, 19), -1) == date(2026, 10, 12)
+
+
+@pytest.mark.parametrize(
+    "view,start",
+    [
+        ("month", "2026-13"),
+        ("month", "march"),
+        ("week", "2026-02-30"),
+        ("month", "9999-12"),
+        ("week", "9999-12-31"),
+        ("month", "0001-01"),
+        ("month", "0000-01"),
+    ],
+)
+def test_invalid_range_is_rejected(view, start):
+    with pytest.raises(CalendarRangeError):
+        calendar_range(view, start, date(2026, 10, 19))
+
+
+def test_build_weeks_limits_owners_per_day():
+    day = date(2026, 3, 2)
+    weeks = build_weeks(day, date(2026, 3, 8), {day: {"a": 1, "b": 5, "c": 2, "d": 3}})
+    assert len(weeks) == 1
+    cell = weeks[0][0]
+    assert cell["total"] == 11
+    assert cell["owners"] == [("b", 5), ("d", 3), ("c", 2)]
+    assert cell["others"] == 1
+
+
+def test_json_feed_aggregates_planned_per_day_in_one_query(client):
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        res = client.get("/plans/calendar.json", params={"start": "2026-03"})
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert res.status_code == 200
+    assert len(statements) == 1
+    assert "GROUP BY" in statements[0]
+    assert res.json() == {
+        "view": "month",
+        "start": "2026-03-01",
+        "end": "2026-03-31",
+        "days": [
+            {"date": "2026-03-02", "count": 3, "owners": {"tech01": 2, "tech02": 1}},
+            {"date": "2026-03-31", "count": 1, "owners": {"tech02": 1}},
+        ],
+    }
+
+
+def test_json_feed_filters_by_owner_and_location(client):
+    by_owner = client.get("/plans/calendar.json", params={"start": "2026-03", "planned_owner": "tech02"}).json()
+    assert [(day["date"], day["count"]) for day in by_owner["days"]] == [("2026-03-02", 1), ("2026-03-31", 1)]
+
+    by_location = client.get("/plans/calendar.json", params={"start": "2026-03", "location": "本社"}).json()
+    assert by_location["days"] == [{"date": "2026-03-02", "count": 2, "owners": {"tech01": 2}}]
+
+    week = client.get("/plans/calendar.json", params={"view": "week", "start": "2026-03-04"}).json()
+    assert (week["start"], week["end"]) == ("2026-03-02", "2026-03-08")
+    assert [day["count"] for day in week["days"]] == [3]
+
+
+def test_json_feed_rejects_invalid_month(client):
+    res = client.get("/plans/calendar.json", params={"start": "2026-13"})
+    assert res.status_code == 400
+    assert "YYYY-MM" in res.json()["error"]
+
+
+def test_calendar_page_renders_month(client):
+    res = client.get("/plans/calendar", params={"start": "2026-03"})
+    assert res.status_code == 200
+    assert "2026年3月" in res.text
+    assert "件数: 4" in res.text
+    assert "/plans?plan_status=PLANNED&date_from=2026-03-02&date_to=2026-03-02" in res.text
+    assert "tech01: 2" in res.text
+    # 4/1 は3月の表の末尾（翌月の端数日）として表示する
+    assert "date_from=2026-04-01" in res.text
+
+
+def test_shift_outside_date_range_is_rejected():
+    with pytest.raises(CalendarRangeError):
+        shift("month", date(9999, 12, 1), 1)
+    with pytest.raises(CalendarRangeError):
+        shift("week", date(1, 1, 1), -1)
+
+
+@pytest.mark.parametrize("params", [{"start": "9999-12"}, {"view": "week", "start": "9999-12-31"}, {"start": "0001-01"}])
+def test_calendar_rejects_years_at_the_date_limits(client, params):
+    assert client.get("/plans/calendar.json", params=params).status_code == 400
+    res = client.get("/plans/calendar", params=params)
+    assert res.status_code == 200
+    assert "表示できるのは 2年から9998年までです" in res.text
+
+
+def test_calendar_page_falls_back_on_invalid_start(client):
+    res = client.get("/plans/calendar", params={"view": "week", "start": "bad"})
+    assert res.status_code == 200
+    assert "週は YYYY-MM-DD 形式で指定してください" in res.text
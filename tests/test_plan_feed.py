@@ -0,0 +1,242 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.requests import Request
+
+import app.routes.feeds as feeds_module
+from app.db import Base, get_db
+from app.main import app
+from app.models import AssetStatus, PcAsset, PcPlan, PcRequest, PlanStatus, RequestStatus, User, UserRole
+from app.plan_feed import escape_text, feed_token, fold
+from app.security import hash_passcode
+from app.streaming import CHUNK_SIZE
+
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+TODAY = date.today()
+
+
+def _override_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _plan(entity_type: str, entity_id: int, offset: int, owner: str, status=PlanStatus.PLANNED, title="点検") -> PcPlan:
+    return PcPlan(
+        entity_type=entity_type,
+        entity_id=entity_id,
+        title=title,
+        planned_date=TODAY + timedelta(days=offset),
+        planned_owner=owner,
+        plan_status=status,
+        created_by="testuser",
+    )
+
+
+@pytest.fixture
+def ids():
+    db = TestingSessionLocal()
+    for model in (PcPlan, PcRequest, PcAsset):
+        db.query(model).delete()
+    tokyo = PcAsset(asset_tag="AST-ICS-1", status=AssetStatus.USE, location="本社")
+    osaka = PcAsset(asset_tag="AST-ICS-2", status=AssetStatus.USE, location="大阪支社")
+    req = PcRequest(status=RequestStatus.RQ, requester="申請者")
+    db.add_all([tokyo, osaka, req])
+    db.flush()
+    db.add_all(
+        [
+            _plan("ASSET", tokyo.id, 3, "tech01", title="メモリ増設; 再起動, 要確認"),
+            _plan("ASSET", osaka.id, 5, "tech01"),
+            _plan("REQUEST", req.id, 7, "tech01"),
+            _plan("ASSET", tokyo.id, 3, "tech02"),
+            _plan("ASSET", tokyo.id, 4, "tech01", status=PlanStatus.DONE),
+            _plan("ASSET", tokyo.id, -365, "tech01"),
+        ]
+    )
+    db.commit()
+    result = {"tokyo": tokyo.id, "osaka": osaka.id, "request": req.id}
+    db.close()
+    return result
+
+
+@pytest.fixture
+def client(ids):
+    app.dependency_overrides[get_db] = _override_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def _feed(client, owner="", location="", headers=None):
+    params = {"owner": owner, "location": location, "token": feed_token(owner, location)}
+    return client.get("/feeds/plans.ics", params=params, headers=headers or {})
+
+
+def _unfold(text: str) -> list[str]:
+    return text.replace("\r\n ", "").split("\r\n")
+
+
+def test_feed_is_served_without_login_and_lists_owner_plans(client, ids):
+    res = _feed(client, owner="tech01")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/calendar")
+    assert res.headers["etag"].startswith('W/"')
+    assert "last-modified" not in res.headers
+    assert res.text.startswith("BEGIN:VCALENDAR\r\n")
+    assert res.text.endswith("END:VCALENDAR\r\n")
+
+    lines = _unfold(res.text)
+    assert lines.count("BEGIN:VEVENT") == 3  # 完了/期間外/他の担当は含めない
+    assert f"DTSTART;VALUE=DATE:{TODAY + timedelta(days=3):%Y%m%d}" in lines
+    assert f"DTEND;VALUE=DATE:{TODAY + timedelta(days=4):%Y%m%d}" in lines
+    assert "SUMMARY:メモリ増設\\; 再起動\\, 要確認（AST-ICS-1）" in lines
+    assert "LOCATION:大阪支社" in lines
+    assert f"SUMMARY:点検（要求 #{ids['request']}）" in lines
+    assert all(len(line.encode("utf-8")) <= 75 for line in res.text.split("\r\n"))
+
+
+def test_feed_filters_by_location(client):
+    lines = _unfold(_feed(client, location="本社").text)
+    assert lines.count("BEGIN:VEVENT") == 2
+    assert "LOCATION:大阪支社" not in lines
+    assert "X-WR-CALNAME:PC管理 予定（本社）" in lines
+
+
+@pytest.mark.parametrize("params", [{}, {"owner": "tech01", "token": feed_token("tech02", "")}, {"token": "x" * 32}])
+def test_feed_rejects_missing_or_foreign_token(client, params):
+    res = client.get("/feeds/plans.ics", params=params)
+    assert res.status_code == 403
+
+
+def test_feed_answers_304_until_a_plan_changes(client, ids):
+    first = _feed(client, owner="tech01")
+    etag = first.headers["etag"]
+
+    cached = _feed(client, owner="tech01", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert cached.content == b""
+
+
+    db = TestingSessionLocal()
+    db.query(PcPlan).filter(PcPlan.planned_owner == "tech02").delete()
+    db.commit()
+    db.close()
+    # 他の担当の予定の削除では変わらない
+    assert _feed(client, owner="tech01", headers={"If-None-Match": etag}).status_code == 304
+
+    db = TestingSessionLocal()
+    db.query(PcPlan).filter(PcPlan.entity_type == "REQUEST").delete()
+    db.commit()
+    db.close()
+    # 削除は最終更新日時を変えないが、フィード対象の件数が変わるため ETag は変わる
+    assert _feed(client, owner="tech01", headers={"If-None-Match": etag}).status_code == 200
+
+
+
+def test_feed_ignores_if_modified_since(client, ids):
+    # 日付だけの再検証では削除を検知できないため、If-Modified-Since だけでは 304 にしない
+    since = "Fri, 31 Dec 9999 23:59:59 GMT"
+    assert _feed(client, owner="tech01", headers={"If-Modified-Since": since}).status_code == 200
+
+
+def test_feed_revision_follows_asset_changes(client, ids):
+    etag = _feed(client, owner="tech01").headers["etag"]
+    db = TestingSessionLocal()
+    db.get(PcAsset, ids["tokyo"]).asset_tag = "AST-ICS-1B"
+    db.commit()
+    db.close()
+    # 資産番号はフィードの SUMMARY に載るため、資産の更新でも版が変わる
+    renamed = _feed(client, owner="tech01", headers={"If-None-Match": etag})
+    assert renamed.status_code == 200
+    assert "AST-ICS-1B" in renamed.text
+
+    etag = _feed(client, location="本社").headers["etag"]
+    db = TestingSessionLocal()
+    db.execute(update(PcAsset).where(PcAsset.id == ids["tokyo"]).values(location="大阪支社", updated_at=PcAsset.updated_at))
+    db.commit()
+    db.close()
+    # 更新日時が変わらなくても、設置場所の絞り込みに入る件数が変われば版が変わる
+    moved = _feed(client, location="本社", headers={"If-None-Match": etag})
+    assert moved.status_code == 200
+    assert "BEGIN:VEVENT" not in moved.text
+
+
+def test_feed_is_streamed_in_chunks(client, ids):
+    db = TestingSessionLocal()
+    db.add_all([_plan("ASSET", ids["tokyo"], day % 30, "tech09", title="定期点検" * 5) for day in range(400)])
+    db.commit()
+    db.close()
+
+    token = feed_token("tech09", "")
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/feeds/plans.ics",
+        "query_string": f"owner=tech09&token={token}".encode(),
+        "headers": [],
+        "app": app,
+        "server": ("testserver", 80),
+        "scheme": "http",
+        "root_path": "",
+    }
+
+    async def drive():
+        db = TestingSessionLocal()
+        try:
+            response = await feeds_module.plans_feed(Request(scope), owner="tech09", location="", token=token, db=db)
+        finally:
+            db.close()
+        assert isinstance(response, StreamingResponse)
+        return [chunk async for chunk in response.body_iterator]
+
+    chunks = asyncio.run(drive())
+    assert len(chunks) > 1
+    assert all(len(chunk) >= CHUNK_SIZE for chunk in chunks[:-1])
+    assert b"".join(chunks).decode("utf-8").count("BEGIN:VEVENT") == 400
+
+
+def test_calendar_page_shows_subscription_url(client):
+    db = TestingSessionLocal()
+    db.query(User).delete()
+    db.add(
+        User(
+            user_id="testuser",
+            passcode_hash=hash_passcode("pass1234"),
+            display_name="テスト太郎",
+            role=UserRole.USER,
+            is_active=True,
+        )
+    )
+    db.commit()
+    db.close()
+    login = client.post("/login", data={"user_id": "testuser", "passcode": "pass1234"}, follow_redirects=False)
+    assert login.status_code == 303
+    client.get("/dashboard")
+
+    res = client.get("/plans/calendar", params={"planned_owner": "tech01"})
+    assert f"/feeds/plans.ics?owner=tech01&amp;token={feed_token('tech01', '')}" in res.text
+
+
+def test_fold_and_escape():
+    line = "SUMMARY:" + "あ" * 40
+    folded = fold(line)
+    assert folded.endswith("\r\n")
+    parts = folded[:-2].split("\r\n")
+    assert all(len(part.encode("utf-8")) <= 75 for part in parts)
+    assert "".join(part[1:] if index else part for index, part in enumerate(parts)) == line
+    assert escape_text("a\\b;c,d\ne") == "a\\\\b\\;c\\,d\\ne"
@@ -0,0 +1,192 @@
+from dataclasses import replace
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert, select, update
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.routes.assets as assets_module
+from app.db import Base, get_db
+from app.main import app
+from app.models import AssetStatus, PcAsset, PcPlan, PlanStatus, User, UserRole
+from app.plan_summary import count_stale_summaries, rebuild_asset_plan_summaries
+from app.security import hash_passcode
+from tools.generate_data import generate
+
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+TODAY = date.today()
+
+
+def _override_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def ids():
+    db = TestingSessionLocal()
+    for model in (PcPlan, PcAsset, User):
+        db.query(model).delete()
+    db.add(
+        User(
+            user_id="testuser",
+            passcode_hash=hash_passcode("pass1234"),
+            display_name="テスト太郎",
+            role=UserRole.USER,
+            is_active=True,
+        )
+    )
+    older = PcAsset(asset_tag="AST-SUM-OLD", status=AssetStatus.USE)
+    db.add(older)
+    db.flush()
+    newer = [PcAsset(asset_tag=f"AST-SUM-{index}", status=AssetStatus.INV) for index in range(5)]
+    db.add_all(newer)
+    db.commit()
+    result = {"older": older.id, "other": newer[0].id}
+    db.close()
+    assets_module.row_cache.clear()
+    yield result
+
+
+@pytest.fixture
+def client(ids):
+    app.dependency_overrides[get_db] = _override_db
+    test_client = TestClient(app)
+    login = test_client.post("/login", data={"user_id": "testuser", "passcode": "pass1234"}, follow_redirects=False)
+    assert login.status_code == 303
+    test_client.get("/dashboard")
+    yield test_client
+    app.dependency_overrides.clear()
+
+
+def _summary(asset_id: int) -> tuple:
+    db = TestingSessionLocal()
+    try:
+        asset = db.get(PcAsset, asset_id)
+        return asset.next_plan_date, asset.next_plan_id, asset.open_plan_count, asset.version
+    finally:
+        db.close()
+
+
+def _create_plan(client, asset_id: int, planned_date: date | None, title: str = "点検") -> int:
+    res = client.post(
+        "/plans",
+        data={
+            "entity_type": "ASSET",
+            "entity_id": str(asset_id),
+            "title": title,
+            "planned_date": planned_date.isoformat() if planned_date else "",
+            "plan_status": "PLANNED",
+        },
+        follow_redirects=False,
+    )
+    assert res.status_code == 303
+    return int(res.headers["location"].rsplit("/", 1)[-1])
+
+
+def test_plan_routes_keep_the_asset_summary(client, ids):
+    asset_id, other_id = ids["older"], ids["other"]
+    later = _create_plan(client, asset_id, TODAY + timedelta(days=5))
+    sooner = _create_plan(client, asset_id, TODAY - timedelta(days=1))
+    undated = _create_plan(client, asset_id, None)
+    assert _summary(asset_id) == (TODAY - timedelta(days=1), sooner, 3, 1)
+
+    # 完了すると次の予定が繰り上がる（資産の version は変わらない）
+    assert client.post(f"/plans/{sooner}/done", data={"version": "1"}, follow_redirects=False).status_code == 303
+    assert _summary(asset_id) == (TODAY + timedelta(days=5), later, 2, 1)
+
+    # 別の資産へ付け替えると、元の資産と付け替え先の両方が変わる
+    res = client.post(
+        f"/plans/{later}/edit",
+        data={
+            "entity_type": "ASSET",
+            "entity_id": str(other_id),
+            "title": "点検",
+            "planned_date": (TODAY + timedelta(days=2)).isoformat(),
+            "plan_status": "PLANNED",
+            "version": "1",
+        },
+        follow_redirects=False,
+    )
+    assert res.status_code == 303
+    assert _summary(asset_id) == (None, None, 1, 1)
+    assert _summary(other_id) == (TODAY + timedelta(days=2), later, 1, 1)
+
+    assert client.post(f"/assets/{other_id}/plans/{later}/cancel", data={"version": "2"}).status_code == 200
+    assert _summary(other_id) == (None, None, 0, 1)
+
+    assert client.post(f"/plans/{undated}/delete", follow_redirects=False).status_code == 303
+    assert _summary(asset_id) == (None, None, 0, 1)
+
+
+def test_list_filters_are_applied_before_the_row_limit(client, ids, monkeypatch):
+    monkeypatch.setattr(assets_module, "settings", replace(assets_module.settings, list_row_limit=3))
+    overdue = _create_plan(client, ids["older"], TODAY - timedelta(days=3), title="回収")
+    _create_plan(client, ids["older"], TODAY + timedelta(days=1))
+
+    # 一覧の上位3件（新しい資産）には期限超過がないが、絞り込みは LIMIT の前に掛かる
+    html = client.get("/assets", params={"overdue_only": "true"}).text
+    assert f'id="asset-row-{ids["older"]}"' in html
+    assert html.count("data-asset-row") == 1
+    assert "期限超過あり" in html
+    assert "今日の予定あり" not in html
+    assert "ほか1件" in html
+    assert client.get("/assets", params={"today_only": "true"}).text.count("data-asset-row") == 0
+
+    # 期限超過の資産に今日の予定が増えると、次の予定は変わらなくても行が描き直される
+    _create_plan(client, ids["older"], TODAY, title="搬入")
+    html = client.get("/assets", params={"today_only": "true"}).text
+    assert f'id="asset-row-{ids["older"]}"' in html
+    assert "今日の予定あり" in html
+    assert "ほか2件" in html
+    assert f"/plans/{overdue}/done" in html
+
+    html = client.get("/assets", params={"planned_owner": "", "next_plan_limit": "3"}).text
+    assert html.count("data-asset-row") == 3
+
+
+def test_rebuild_repairs_summaries_written_around_the_orm(ids):
+    db = TestingSessionLocal()
+    plan_id = db.execute(
+        insert(PcPlan).values(
+            entity_type="ASSET",
+            entity_id=ids["older"],
+            title="一括投入",
+            planned_date=TODAY,
+            plan_status=PlanStatus.PLANNED,
+            created_by="testuser",
+        )
+    ).inserted_primary_key[0]
+    db.execute(update(PcAsset).where(PcAsset.id == ids["other"]).values(open_plan_count=4))
+    db.commit()
+    assert count_stale_summaries(db) == 2
+
+    assert rebuild_asset_plan_summaries(db, batch_size=2) == 2
+    assert count_stale_summaries(db) == 0
+    db.close()
+    assert _summary(ids["older"]) == (TODAY, plan_id, 1, 1)
+    assert _summary(ids["other"]) == (None, None, 0, 1)
+
+
+def test_generated_summaries_match_the_plans():
+    generated = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    generate("sqlite+pysqlite:///:memory:", assets=60, requests=5, plans=300, history=50, engine=generated)
+    with Session(generated) as db:
+        assert count_stale_summaries(db) == 0
+        assert db.execute(select(PcAsset.id).where(PcAsset.open_plan_count > 0)).first() is not None
@@ -0,0 +1,236 @@
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import Base, get_db
+from app.main import app
+from app.models import (
+    AssetStatus,
+    PcAsset,
+    PcPlan,
+    PcRequest,
+    PcStatusHistory,
+    PlanEntityType,
+    PlanStatus,
+    RequestStatus,
+    User,
+    UserRole,
+)
+from app.security import hash_passcode
+from tools.cleanup_orphan_plans import cleanup
+
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def _override_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _plan(entity_type: str, entity_id: int, title: str, days: int = 1) -> PcPlan:
+    return PcPlan(
+        entity_type=entity_type,
+        entity_id=entity_id,
+        title=title,
+        planned_date=date.today() + timedelta(days=days),
+        plan_status=PlanStatus.PLANNED,
+        created_by="testuser",
+    )
+
+
+@pytest.fixture
+def ids():
+    db = TestingSessionLocal()
+    for model in (PcStatusHistory, PcPlan, PcRequest, PcAsset, User):
+        db.query(model).delete()
+    db.add(
+        User(
+            user_id="testuser",
+            passcode_hash=hash_passcode("pass1234"),
+            display_name="テスト太郎",
+            role=UserRole.USER,
+            is_active=True,
+        )
+    )
+    asset = PcAsset(asset_tag="AST-TARGET-1", status=AssetStatus.INV)
+    other_asset = PcAsset(asset_tag="AST-TARGET-2", status=AssetStatus.INV)
+    req = PcRequest(status=RequestStatus.RQ, requester="申請者A")
+    db.add_all([asset, other_asset, req])
+    db.flush()
+    db.add_all(
+        [
+            _plan("ASSET", asset.id, "キッティング", days=1),
+            _plan("ASSET", other_asset.id, "回収", days=2),
+            _plan("REQUEST", req.id, "手配", days=3),
+            # 資産と同じ ID を指す要求の予定は、資産の削除で消えないことを確認する
+            _plan("REQUEST", asset.id, "別要求の予定", days=4),
+        ]
+    )
+    db.commit()
+    result = {"asset": asset.id, "other_asset": other_asset.id, "request": req.id}
+    db.close()
+    app.dependency_overrides[get_db] = _override_db
+    yield result
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def client(ids):
+    test_client = TestClient(app)
+    login = test_client.post("/login", data={"user_id": "testuser", "passcode": "pass1234"}, follow_redirects=False)
+    assert login.status_code == 303
+    test_client.get("/dashboard")
+    return test_client
+
+
+def _plans(entity_type: str, entity_id: int) -> list[str]:
+    db = TestingSessionLocal()
+    try:
+        return [
+            plan.title
+            for plan in db.query(PcPlan).filter(PcPlan.entity_type == entity_type, PcPlan.entity_id == entity_id)
+        ]
+    finally:
+        db.close()
+
+
+def test_check_constraint_rejects_unknown_entity_type(ids):
+    db = TestingSessionLocal()
+    try:
+        with pytest.raises(IntegrityError):
+            db.execute(
+                text(
+                    "INSERT INTO pc_plans (entity_type, entity_id, title, plan_status, created_by, created_at, "
+                    "updated_at, version) VALUES ('DEVICE', 1, 'x', 'PLANNED', 'u', '2026-01-01', '2026-01-01', 1)"
+                )
+            )
+    finally:
+        db.rollback()
+        db.close()
+
+
+@pytest.mark.parametrize(
+    "entity_type, entity_id, message",
+    [
+        ("DEVICE", "asset", "種別は ASSET または REQUEST"),
+        ("ASSET", "missing", "対象の資産（ID: 999999）が見つかりません"),
+        ("REQUEST", "missing", "対象の要求（ID: 999999）が見つかりません"),
+    ],
+)
+def test_plan_create_validates_target(client, ids, entity_type, entity_id, message):
+    target = ids["asset"] if entity_id == "asset" else 999999
+    res = client.post(
+        "/plans",
+        data={"entity_type": entity_type, "entity_id": str(target), "title": "点検", "plan_status": "PLANNED"},
+    )
+    assert res.status_code == 200
+    assert message in res.text
+    assert _plans(entity_type, target) == []
+
+
+def test_plan_create_accepts_request_target(client, ids):
+    res = client.post(
+        "/plans",
+        data={"entity_type": "request", "entity_id": str(ids["request"]), "title": "貸出準備", "plan_status": "PLANNED"},
+        follow_redirects=False,
+    )
+    assert res.status_code == 303
+    assert "貸出準備" in _plans("REQUEST", ids["request"])
+
+
+def test_asset_delete_removes_only_its_plans(client, ids):
+    res = client.post(f"/assets/{ids['asset']}/delete", follow_redirects=False)
+    assert res.status_code == 303
+    assert _plans("ASSET", ids["asset"]) == []
+    assert _plans("ASSET", ids["other_asset"]) == ["回収"]
+    assert "別要求の予定" in _plans("REQUEST", ids["asset"])
+
+
+def test_request_delete_removes_its_plans(client, ids):
+    res = client.post(f"/requests/{ids['request']}/delete", follow_redirects=False)
+    assert res.status_code == 303
+    assert _plans("REQUEST", ids["request"]) == []
+    assert _plans("ASSET", ids["asset"]) == ["キッティング"]
+
+
+def test_plan_search_spans_entity_types_in_one_query(client, ids):
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        res = client.get("/plans")
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert res.status_code == 200
+    assert len(statements) == 1
+    assert "件数: 4" in res.text
+    assert "AST-TARGET-1" in res.text
+    assert f"#{ids['request']} 申請者A" in res.text
+
+
+def test_plan_search_filters_by_target_and_type(client, ids):
+    by_requester = client.get("/plans", params={"target": "申請者A"})
+    assert "手配" in by_requester.text
+    assert "キッティング" not in by_requester.text
+
+    by_tag = client.get("/plans", params={"target": "AST-TARGET-2"})
+    assert "回収" in by_tag.text
+    assert "件数: 1" in by_tag.text
+
+    requests_only = client.get("/plans", params={"entity_type": "REQUEST"})
+    assert "件数: 2" in requests_only.text
+    assert "キッティング" not in requests_only.text
+
+
+def test_plan_search_marks_orphans(client, ids):
+    db = TestingSessionLocal()
+    db.add(_plan("ASSET", 999999, "孤立予定"))
+    db.commit()
+    db.close()
+    res = client.get("/plans", params={"title": "孤立予定"})
+    assert "999999（対象なし）" in res.text
+
+
+def test_cleanup_tool_deletes_orphan_plans(tmp_path):
+    url = f"sqlite:///{tmp_path / 'orphans.db'}"
+    file_engine = create_engine(url)
+    Base.metadata.create_all(bind=file_engine)
+    with file_engine.begin() as conn:
+        asset_id = conn.execute(
+            insert(PcAsset).values(asset_tag="AST-KEEP", status=AssetStatus.INV).returning(PcAsset.id)
+        ).scalar_one()
+        for entity_type, entity_id in (("ASSET", asset_id), ("ASSET", asset_id + 1), ("REQUEST", 1)):
+            conn.execute(
+                insert(PcPlan).values(
+                    entity_type=entity_type, entity_id=entity_id, title="t", plan_status="PLANNED", created_by="u"
+                )
+            )
+    file_engine.dispose()
+
+    assert cleanup(url, dry_run=True) == {"ASSET": 1, "REQUEST": 1}
+    assert cleanup(url) == {"ASSET": 1, "REQUEST": 1}
+    assert cleanup(url) == {}
+
+    file_engine = create_engine(url)
+    with file_engine.connect() as conn:
+        rows = conn.execute(text("SELECT entity_type, entity_id FROM pc_plans")).all()
+    file_engine.dispose()
+    assert rows == [(PlanEntityType.ASSET.value, asset_id)]
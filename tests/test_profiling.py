@@ -0,0 +1,130 @@
+from dataclasses import replace
+
+import pstats
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.profiling as profiling_module
+import app.routes.assets as assets_module
+from app.db import Base, get_db
+from app.main import app
+from app.models import User, UserRole
+from app.security import hash_passcode
+
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def _override_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _login_client(role: UserRole) -> TestClient:
+    app.dependency_overrides[get_db] = _override_db
+    db = TestingSessionLocal()
+    db.query(User).delete()
+    db.add(
+        User(
+            user_id="testuser",
+            passcode_hash=hash_passcode("pass1234"),
+            display_name="テスト太郎",
+            role=role,
+            is_active=True,
+        )
+    )
+    db.commit()
+    db.close()
+    client = TestClient(app)
+    login = client.post(
+        "/login",
+        data={"user_id": "testuser", "passcode": "pass1234"},
+        follow_redirects=False,
+    )
+    assert login.status_code == 303
+    client.cookies.update(login.cookies)
+    return client
+
+
+@pytest.fixture
+def profile_settings(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        profiling_module,
+        "settings",
+        replace(profiling_module.settings, profile_dir=str(tmp_path), profile_min_interval_sec=60.0),
+    )
+    monkeypatch.setattr(profiling_module, "_last_started_at", None)
+    yield tmp_path
+    app.dependency_overrides.clear()
+
+
+def test_admin_profile_is_saved_and_downloadable(profile_settings):
+    client = _login_client(UserRole.ADMIN)
+    res = client.get("/assets", headers={"X-Profile": "1"})
+    assert res.status_code == 200
+    name = res.headers["X-Profile-Id"]
+    assert (profile_settings / name).is_file()
+
+    listing = client.get("/admin/profiles")
+    assert name in listing.text
+
+    download = client.get(f"/admin/profiles/{name}")
+    assert download.status_code == 200
+    summary = client.get(f"/admin/profiles/{name}?format=text")
+    assert "cumulative" in summary.text
+
+
+def test_profile_rate_limited(profile_settings):
+    client = _login_client(UserRole.ADMIN)
+    first = client.get("/assets?_profile=1")
+    second = client.get("/assets?_profile=1")
+    assert "X-Profile-Id" in first.headers
+    assert "X-Profile-Id" not in second.headers
+
+
+def test_streamed_body_is_profiled(profile_settings, monkeypatch):
+    monkeypatch.setattr(assets_module, "settings", replace(assets_module.settings, stream_lists=True))
+    client = _login_client(UserRole.ADMIN)
+    res = client.get("/assets", headers={"X-Profile": "1"})
+    assert res.status_code == 200
+    stats = pstats.Stats(str(profile_settings / res.headers["X-Profile-Id"]))
+    # 本文（テンプレートの描画）は call_next の後、イベントループのスレッドで描画される
+    assert any(func == "_buffered" for _, _, func in stats.stats)
+
+
+def test_profile_not_started_while_other_requests_run(profile_settings):
+    profiling_module.note_request_started()
+    profiling_module.note_request_started()
+    try:
+        assert not profiling_module.acquire_profile_slot()
+    finally:
+        profiling_module.note_request_finished()
+    assert profiling_module.acquire_profile_slot()
+    # 計測中に始まった要求は数えて記録する
+    profiling_module.note_request_started()
+    profiling_module.note_request_finished()
+    assert profiling_module.release_profile_slot() == 1
+    profiling_module.note_request_finished()
+
+
+def test_profile_ignored_for_non_admin(profile_settings):
+    client = _login_client(UserRole.USER)
+    res = client.get("/assets", headers={"X-Profile": "1"})
+    assert res.status_code == 200
+    assert "X-Profile-Id" not in res.headers
+
+    denied = client.get("/admin/profiles", follow_redirects=False)
+    assert denied.status_code == 303
+    assert denied.headers["location"] == "/dashboard"
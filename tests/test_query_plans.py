@@ -0,0 +1,242 @@
+import re
+from contextlib import contextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import get_db
+from app.main import app
+from app.models import PcAsset, SchedulerLock, SchedulerRun, User, UserRole, refresh_asset_plan_summaries
+from app.overdue import forget_ready
+from app.plan_feed import feed_token
+from app.scheduler import run_due_jobs
+from app.security import hash_passcode
+from tools.generate_data import generate
+
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+LARGE_TABLES = {"pc_assets", "pc_plans", "pc_status_history", "pc_requests"}
+SCAN_PATTERN = re.compile(r"^SCAN (?:TABLE )?(\w+)(.*)$")
+
+ASSET_FILTERS: dict[str, dict[str, str]] = {
+    "none": {},
+    "status": {"status": "USE"},
+    "asset_keyword": {"asset_keyword": "AST-000012"},
+    "location": {"location": "大阪支社"},
+    "current_user": {"current_user": "user001"},
+    "planned_owner": {"planned_owner": "tech07"},
+    "overdue_only": {"overdue_only": "true"},
+    "today_only": {"today_only": "true"},
+    "next_plan_limit": {"next_plan_limit": "3"},
+    "combined": {"status": "USE", "location": "大阪支社", "overdue_only": "true"},
+}
+
+HOT_QUERIES: list[tuple[str, str, dict[str, str]]] = [
+    *[(f"assets[{name}]", "/assets", params) for name, params in ASSET_FILTERS.items()],
+    ("asset_detail", "/assets/120", {}),
+    ("plans_overdue", "/plans/overdue", {}),
+    ("plans_overdue[owner]", "/plans/overdue", {"planned_owner": "tech07"}),
+    ("plans[status]", "/plans", {"plan_status": "PLANNED"}),
+    ("plans[entity_type]", "/plans", {"entity_type": "REQUEST", "plan_status": "PLANNED"}),
+    ("plans_calendar", "/plans/calendar", {}),
+    ("plans_calendar[location]", "/plans/calendar.json", {"location": "本社"}),
+    ("reports_workload", "/reports/workload", {"refresh": "1"}),
+    ("reports_workload[week]", "/reports/workload", {"bucket": "week", "refresh": "1"}),
+    ("plans_feed[owner]", "/feeds/plans.ics", {"owner": "tech07", "token": feed_token("tech07", "")}),
+    ("plans_feed[location]", "/feeds/plans.ics", {"location": "本社", "token": feed_token("", "本社")}),
+    ("dashboard", "/dashboard", {}),
+    ("requests", "/requests", {}),
+    ("requests[status]", "/requests", {"status": "OP"}),
+    ("requests[asset_status]", "/requests", {"asset_status": "USE"}),
+    ("request_detail", "/requests/15", {}),
+]
+
+
+_LIKE_SCAN = "部分一致（LIKE '%…%'）は索引を使えない。主キーの降順に読み、表示件数の上限で打ち切る"
+_SUMMARY_SCAN = "統計のない SQLite は並べ替えを避けて主キーの降順に読む。統計があれば ix_pc_assets_next_plan_date を使う"
+
+# 大きなテーブルの走査を許す (クエリ名, テーブル) と理由。
+# ここにない組み合わせの走査は、LIMIT 付きでも失敗にする（新しい絞り込みが索引を外れたら気付けるように）。
+ALLOWED_SCANS: dict[tuple[str, str], str] = {
+    ("assets[none]", "pc_assets"): "条件なしの一覧。主キーの降順に読み、表示件数の上限で打ち切る",
+    ("assets[next_plan_limit]", "pc_assets"): "条件なしの一覧。主キーの降順に読み、表示件数の上限で打ち切る",
+    ("assets[asset_keyword]", "pc_assets"): _LIKE_SCAN,
+    ("assets[location]", "pc_assets"): _LIKE_SCAN,
+    ("assets[current_user]", "pc_assets"): _LIKE_SCAN,
+    ("assets[planned_owner]", "pc_assets"): "担当予定者の部分一致は索引を使えないため、資産を新しい順に読み予定を ix_pc_plans_entity で確かめる",
+    ("assets[overdue_only]", "pc_assets"): _SUMMARY_SCAN,
+    ("assets[today_only]", "pc_assets"): _SUMMARY_SCAN,
+    ("requests", "pc_requests"): "条件なしの一覧。主キーの降順に読み、表示件数の上限で打ち切る",
+}
+
+
+def _override_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture(scope="module")
+def client():
+    generate(
+        "sqlite+pysqlite:///:memory:",
+        assets=400,
+        requests=40,
+        plans=1200,
+        history=2000,
+        seed=31,
+        engine=engine,
+    )
+    db = TestingSessionLocal()
+    db.add(
+        User(
+            user_id="testuser",
+            passcode_hash=hash_passcode("pass1234"),
+            display_name="テスト太郎",
+            role=UserRole.USER,
+            is_active=True,
+        )
+    )
+    db.commit()
+    db.close()
+
+    app.dependency_overrides[get_db] = _override_db
+    test_client = TestClient(app)
+    login = test_client.post(
+        "/login",
+        data={"user_id": "testuser", "passcode": "pass1234"},
+        follow_redirects=False,
+    )
+    assert login.status_code == 303
+    yield test_client
+    app.dependency_overrides.clear()
+
+
+@contextmanager
+def _capture_selects():
+    captured: list[tuple[str, tuple]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, tuple(parameters or ())))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _explain(statement: str, parameters: tuple) -> list[str]:
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in rows]
+
+
+def _full_scans(name: str, statement: str, plan: list[str]) -> list[str]:
+    """大きなテーブルの全件走査に当たる行を返す。
+
+    カバリングインデックスのみの走査と、ALLOWED_SCANS にある (クエリ名, テーブル) の
+    ソートなしで主キー順に読み LIMIT で打ち切る走査は許容する。
+    """
+    bounded = "LIMIT" in statement.upper() and not any("TEMP B-TREE FOR ORDER BY" in line for line in plan)
+    violations = []
+    for line in plan:
+        match = SCAN_PATTERN.match(line)
+        if match is None or match.group(1) not in LARGE_TABLES:
+            continue
+        rest = match.group(2)
+        if "COVERING INDEX" in rest:
+            continue
+        if not rest.strip() and bounded and (name, match.group(1)) in ALLOWED_SCANS:
+            continue
+        violations.append(line)
+    return violations
+
+
+@pytest.mark.parametrize("name,path,params", HOT_QUERIES, ids=[query[0] for query in HOT_QUERIES])
+def test_hot_queries_avoid_full_scans(client, name, path, params):
+    with _capture_selects() as captured:
+        res = client.get(path, params=params)
+    assert res.status_code == 200
+
+    statements = [(statement, parameters) for statement, parameters in captured if "users" not in statement]
+    assert statements, f"{name}: no SQL captured"
+    for statement, parameters in statements:
+        plan = _explain(statement, parameters)
+        violations = _full_scans(name, statement, plan)
+        assert not violations, f"{name}: full scan {violations}\n{statement}\n" + "\n".join(plan)
+
+
+def test_overdue_flag_queries_avoid_full_scans(client):
+    db = TestingSessionLocal()
+    run_due_jobs(db, worker="test", interval_sec=86400, lease_sec=300)
+    db.close()
+    try:
+        for path in ("/plans/overdue", "/dashboard", "/assets"):
+            with _capture_selects() as captured:
+                assert client.get(path, params={"overdue_only": "true"}).status_code == 200
+            flagged = [(statement, parameters) for statement, parameters in captured if "is_overdue IS 1" in statement]
+            assert flagged or path == "/assets", path
+            for statement, parameters in captured:
+                plan = _explain(statement, parameters)
+                name = "assets[overdue_only]" if path == "/assets" else path
+                assert not _full_scans(name, statement, plan), f"{path}: {statement}\n" + "\n".join(plan)
+    finally:
+        db = TestingSessionLocal()
+        db.query(SchedulerRun).delete()
+        db.query(SchedulerLock).delete()
+        db.commit()
+        db.close()
+        forget_ready()
+
+
+def test_asset_summary_refresh_reads_plans_per_asset(client):
+    """予定の保存ごとに走る要約の更新が、資産の予定だけを ix_pc_plans_entity で読むこと。"""
+    updates: list[tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE"):
+            updates.append((statement, tuple(parameters or ())))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        with engine.connect() as conn:
+            refresh_asset_plan_summaries(conn, PcAsset.id.in_([120]))
+            conn.rollback()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    (statement, parameters), = updates
+    plan = _explain(statement, parameters)
+    plan_reads = [line for line in plan if "pc_plans" in line]
+    assert plan_reads
+    assert all("ix_pc_plans_entity (entity_type=? AND entity_id=?" in line for line in plan_reads), "\n".join(plan)
+
+
+def test_full_scan_detection_flags_unindexed_filter():
+    statement = "SELECT id, title FROM pc_plans WHERE actual_owner = ?"
+    plan = _explain(statement, ("tech07",))
+    assert _full_scans("plans", statement, plan)
+
+
+def test_bounded_scan_is_allowed_only_for_listed_queries():
+    statement = "SELECT id FROM pc_assets WHERE location LIKE '%' || ? || '%' ORDER BY id DESC LIMIT 10"
+    plan = _explain(statement, ("本社",))
+    assert _full_scans("assets[new_filter]", statement, plan)
+    assert not _full_scans("assets[location]", statement, plan)
+
+
+def test_allowed_scans_name_hot_queries():
+    names = {query[0] for query in HOT_QUERIES}
+    assert {name for name, _ in ALLOWED_SCANS} <= names
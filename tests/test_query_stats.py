@@ -0,0 +1,114 @@
+import logging
+from dataclasses import replace
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.main as main_module
+import app.query_stats as query_stats_module
+from app.db import Base, get_db
+from app.main import app
+from app.models import User, UserRole
+from app.query_stats import track_queries
+from app.security import hash_passcode
+
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+
+def _override_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _login_client() -> TestClient:
+    app.dependency_overrides[get_db] = _override_db
+    db = TestingSessionLocal()
+    db.query(User).delete()
+    db.add(
+        User(
+            user_id="testuser",
+            passcode_hash=hash_passcode("pass1234"),
+            display_name="テスト太郎",
+            role=UserRole.USER,
+            is_active=True,
+        )
+    )
+    db.commit()
+    db.close()
+    client = TestClient(app)
+    login = client.post(
+        "/login",
+        data={"user_id": "testuser", "passcode": "pass1234"},
+        follow_redirects=False,
+    )
+    assert login.status_code == 303
+    client.cookies.update(login.cookies)
+    return client
+
+
+def test_track_queries_counts_statements():
+    with track_queries() as stats:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+    assert stats.count == 2
+    assert stats.total_ms >= 0
+
+
+def test_slow_query_logged_with_redacted_params(monkeypatch, caplog):
+    monkeypatch.setattr(
+        query_stats_module,
+        "settings",
+        replace(query_stats_module.settings, slow_query_ms=0.0001),
+    )
+    with caplog.at_level(logging.WARNING, logger="sql"):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT :secret"), {"secret": "top-secret-value"})
+    assert "slow query" in caplog.text
+    assert "top-secret-value" not in caplog.text
+    assert "<redacted count=1>" in caplog.text
+
+
+def test_debug_headers_report_query_counts(monkeypatch):
+    monkeypatch.setattr(main_module, "settings", replace(main_module.settings, debug_headers=True))
+    client = _login_client()
+    res = client.get("/dashboard")
+    assert res.status_code == 200
+    assert int(res.headers["X-DB-Queries"]) >= 4
+    assert "X-DB-Time-Ms" in res.headers
+    app.dependency_overrides.clear()
+
+
+def test_failed_statement_does_not_leave_start_time():
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("SELECT * FROM no_such_table"))
+        except Exception:
+            pass
+        assert conn.info.get(query_stats_module._START_KEY) == []
+
+
+def test_streamed_body_queries_are_logged(monkeypatch, caplog):
+    import app.routes.assets as assets_module
+
+    monkeypatch.setattr(assets_module, "settings", replace(assets_module.settings, stream_lists=True))
+    client = _login_client()
+    with caplog.at_level(logging.INFO, logger="app"):
+        res = client.get("/assets")
+    assert res.status_code == 200
+    finished = [record.getMessage() for record in caplog.records if "stream finished" in record.getMessage()]
+    assert len(finished) == 1
+    assert "path=/assets" in finished[0]
+    assert int(finished[0].split("db_queries=")[1].split()[0]) >= 1
+    app.dependency_overrides.clear()
@@ -0,0 +1,142 @@
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import Base, get_db
+from app.main import app
+from app.models import AssetStatus, PcAsset, PcRequest, PcStatusHistory, RequestStatus, User, UserRole
+from app.security import hash_passcode
+
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+LINKED = 30
+
+
+def _override_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def ids():
+    db = TestingSessionLocal()
+    for model in (PcStatusHistory, PcRequest, PcAsset, User):
+        db.query(model).delete()
+    db.add(
+        User(
+            user_id="testuser",
+            passcode_hash=hash_passcode("pass1234"),
+            display_name="テスト太郎",
+            role=UserRole.USER,
+            is_active=True,
+        )
+    )
+    assets = [
+        PcAsset(asset_tag=f"AST-LINK-{index:02d}", status=AssetStatus.USE if index % 2 else AssetStatus.INV)
+        for index in range(LINKED)
+    ]
+    db.add_all(assets)
+    db.flush()
+    requests = [
+        PcRequest(status=RequestStatus.RQ, requester=f"申請者{index}", asset_id=asset.id)
+        for index, asset in enumerate(assets)
+    ]
+    requests.append(PcRequest(status=RequestStatus.OP, requester="未紐づけ"))
+    db.add_all(requests)
+    db.commit()
+    result = {"assets": [asset.id for asset in assets], "requests": [req.id for req in requests]}
+    db.close()
+    app.dependency_overrides[get_db] = _override_db
+    yield result
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def client(ids):
+    test_client = TestClient(app)
+    login = test_client.post("/login", data={"user_id": "testuser", "passcode": "pass1234"}, follow_redirects=False)
+    assert login.status_code == 303
+    test_client.get("/dashboard")
+    return test_client
+
+
+def _count_queries(client, path, **params):
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        res = client.get(path, params=params)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return res, statements
+
+
+def test_request_list_shows_linked_assets_in_one_query(client, ids):
+    res, statements = _count_queries(client, "/requests")
+    assert res.status_code == 200
+    assert len(statements) == 1
+    assert "JOIN pc_assets" in statements[0]
+    assert res.text.count("AST-LINK-") == LINKED
+    assert f'<a href="/assets/{ids["assets"][1]}">AST-LINK-01</a>' in res.text
+    assert "利用中" in res.text
+    assert "未紐づけ" in res.text
+
+
+def test_request_list_filters_by_asset_status(client, ids):
+    res, statements = _count_queries(client, "/requests", asset_status="USE")
+    shown = re.findall(r"AST-LINK-(\d+)", res.text)
+    assert len(shown) == LINKED // 2
+    assert all(int(index) % 2 for index in shown)
+    assert "未紐づけ" not in res.text
+    assert "資産の状態=USE" in res.text
+    assert len(statements) == 1
+
+
+def test_request_detail_loads_asset_with_join(client, ids):
+    request_id = ids["requests"][3]
+    res, statements = _count_queries(client, f"/requests/{request_id}")
+    assert res.status_code == 200
+    assert f'<a href="/assets/{ids["assets"][3]}">AST-LINK-03</a>' in res.text
+    assert "（利用中）" in res.text
+    assert sum("pc_assets" in statement for statement in statements) == 2  # ETag の版 + 要求と資産の結合
+
+
+def test_asset_change_invalidates_request_detail_etag(client, ids):
+    path = f"/requests/{ids['requests'][0]}"
+    etag = client.get(path).headers["etag"]
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+
+    db = TestingSessionLocal()
+    db.get(PcAsset, ids["assets"][0]).status = AssetStatus.READY
+    db.commit()
+    db.close()
+    res = client.get(path, headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert "（利用準備完了）" in res.text
+
+
+def test_relationships_follow_both_foreign_keys(ids):
+    db = TestingSessionLocal()
+    req = db.get(PcRequest, ids["requests"][2])
+    asset = req.asset
+    assert asset.asset_tag == "AST-LINK-02"
+    asset.request_id = req.id
+    db.commit()
+    assert db.get(PcAsset, asset.id).request.id == req.id
+    db.close()
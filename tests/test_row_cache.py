@@ -0,0 +1,163 @@
+import re
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.routes.assets as assets_module
+from app.db import Base, get_db
+from app.fragment_cache import TOKEN_PLACEHOLDER, FragmentCache, fill_tokens
+from app.main import app
+from app.models import AssetStatus, IdempotencyKey, PcAsset, PcPlan, PcStatusHistory, User, UserRole
+from app.security import hash_passcode
+
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+ASSET_COUNT = 5
+TOKEN_PATTERN = r'name="idempotency_key" value="([0-9a-f]{32})"'
+
+
+def _override_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _seed_data() -> list[int]:
+    db = TestingSessionLocal()
+    for model in (IdempotencyKey, PcStatusHistory, PcPlan, PcAsset, User):
+        db.query(model).delete()
+    db.add(
+        User(
+            user_id="testuser",
+            passcode_hash=hash_passcode("pass1234"),
+            display_name="テスト太郎",
+            role=UserRole.USER,
+            is_active=True,
+        )
+    )
+    assets = [PcAsset(asset_tag=f"AST-CACHE-{index}", status=AssetStatus.INV) for index in range(ASSET_COUNT)]
+    db.add_all(assets)
+    db.commit()
+    ids = [asset.id for asset in assets]
+    db.close()
+    return ids
+
+
+@pytest.fixture
+def asset_ids():
+    assets_module.row_cache.clear()
+    app.dependency_overrides[get_db] = _override_db
+    yield _seed_data()
+    app.dependency_overrides.clear()
+    assets_module.row_cache.clear()
+
+
+@pytest.fixture
+def client(asset_ids):
+    test_client = TestClient(app)
+    login = test_client.post("/login", data={"user_id": "testuser", "passcode": "pass1234"}, follow_redirects=False)
+    assert login.status_code == 303
+    return test_client
+
+
+def _row(html: str, asset_id: int) -> str:
+    start = html.index(f'id="asset-row-{asset_id}"')
+    return html[start : html.index("</tr>", start)]
+
+
+def test_lru_evicts_least_recently_used():
+    cache = FragmentCache(maxsize=2)
+    cache.get_or_render("a", lambda: "A")
+    cache.get_or_render("b", lambda: "B")
+    cache.get_or_render("a", lambda: "unused")
+    cache.get_or_render("c", lambda: "C")
+
+    assert len(cache) == 2
+    assert cache.get_or_render("a", lambda: "A2") == "A"
+    assert cache.get_or_render("b", lambda: "B2") == "B2"
+    assert (cache.hits, cache.misses) == (2, 4)
+
+
+def test_zero_size_disables_cache():
+    cache = FragmentCache(maxsize=0)
+    assert cache.get_or_render("a", lambda: "A") == "A"
+    assert cache.get_or_render("a", lambda: "A2") == "A2"
+    assert len(cache) == 0
+
+
+def test_fill_tokens_gives_each_form_its_own_key():
+    filled = fill_tokens(f"<i>{TOKEN_PLACEHOLDER}</i><i>{TOKEN_PLACEHOLDER}</i>")
+    tokens = re.findall(r"<i>([0-9a-f]{32})</i>", filled)
+    assert len(tokens) == 2
+    assert tokens[0] != tokens[1]
+
+
+def test_second_list_render_is_served_from_cache(client, asset_ids):
+    first = client.get("/assets").text
+    second = client.get("/assets").text
+    cache = assets_module.row_cache
+
+    assert (cache.misses, cache.hits) == (ASSET_COUNT, ASSET_COUNT)
+    assert TOKEN_PLACEHOLDER not in second
+    first_tokens = re.findall(TOKEN_PATTERN, first)
+    second_tokens = re.findall(TOKEN_PATTERN, second)
+    assert len(second_tokens) == ASSET_COUNT
+    assert not set(first_tokens) & set(second_tokens)
+
+
+def test_plan_change_rerenders_only_that_row(client, asset_ids):
+    client.get("/assets")
+    target = asset_ids[0]
+    res = client.post(
+        f"/assets/{target}/plans",
+        data={"title": "キャッシュ確認", "planned_date": date.today().isoformat()},
+        follow_redirects=False,
+    )
+    assert res.status_code == 303
+
+    html = client.get("/assets").text
+    assert "キャッシュ確認" in _row(html, target)
+    assert assets_module.row_cache.misses == ASSET_COUNT + 1
+
+    db = TestingSessionLocal()
+    plan = db.query(PcPlan).one()
+    plan.title = "改題"
+    db.commit()
+    db.close()
+    assert "改題" in _row(client.get("/assets").text, target)
+
+
+def test_asset_update_rerenders_row(client, asset_ids):
+    client.get("/assets")
+    target = asset_ids[1]
+    db = TestingSessionLocal()
+    db.get(PcAsset, target).location = "新拠点"
+    db.commit()
+    db.close()
+    assert "新拠点" in _row(client.get("/assets").text, target)
+
+
+def test_date_change_rerenders_rows(client, asset_ids, monkeypatch):
+    client.get("/assets")
+    tomorrow = date.today() + timedelta(days=1)
+
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return tomorrow
+
+    monkeypatch.setattr(assets_module, "date", Tomorrow)
+    client.get("/assets")
+    assert assets_module.row_cache.misses == ASSET_COUNT * 2
@@ -0,0 +1,188 @@
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db import Base, get_db
+from app.main import app
+from app.models import (
+    AssetStatus,
+    IdempotencyKey,
+    PcAsset,
+    PcPlan,
+    PcStatusHistory,
+    PlanStatus,
+    User,
+    UserRole,
+)
+from app.security import hash_passcode
+
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+ROW = {"X-Fragment": "row"}
+KEY = "fragment-key-0001"
+
+
+def _override_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _seed_data() -> dict[str, int]:
+    db = TestingSessionLocal()
+    for model in (IdempotencyKey, PcStatusHistory, PcPlan, PcAsset, User):
+        db.query(model).delete()
+    db.add(
+        User(
+            user_id="testuser",
+            passcode_hash=hash_passcode("pass1234"),
+            display_name="テスト太郎",
+            role=UserRole.USER,
+            is_active=True,
+        )
+    )
+    assets = [PcAsset(asset_tag=f"AST-ROW-{index:03d}", status=AssetStatus.INV) for index in range(30)]
+    db.add_all(assets)
+    db.flush()
+    target = assets[-1]
+    plan = PcPlan(
+        entity_type="ASSET",
+        entity_id=target.id,
+        title="期限切れ点検",
+        planned_date=date.today() - timedelta(days=2),
+        plan_status=PlanStatus.PLANNED,
+        created_by="testuser",
+    )
+    db.add(plan)
+    db.commit()
+    ids = {"asset": target.id, "plan": plan.id}
+    db.close()
+    return ids
+
+
+@pytest.fixture
+def ids():
+    app.dependency_overrides[get_db] = _override_db
+    yield _seed_data()
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def client(ids):
+    test_client = TestClient(app)
+    login = test_client.post("/login", data={"user_id": "testuser", "passcode": "pass1234"}, follow_redirects=False)
+    assert login.status_code == 303
+    return test_client
+
+
+def test_list_page_wraps_rows_with_ids(client, ids):
+    res = client.get("/assets")
+    assert res.status_code == 200
+    assert f'id="asset-row-{ids["asset"]}"' in res.text
+    assert res.text.count("data-asset-row") == 30
+
+
+def test_plan_done_returns_only_the_row(client, ids):
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        res = client.post(
+            f"/assets/{ids['asset']}/plans/{ids['plan']}/done",
+            data={"actual_date": date.today().isoformat(), "version": "1"},
+            headers=ROW,
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert res.status_code == 200
+    assert res.headers["X-Fragment"] == "row"
+    assert res.text.strip().startswith(f'<tr id="asset-row-{ids["asset"]}"')
+    assert res.text.count("<tr") == 1
+    assert "期限超過あり" not in res.text
+    assert "予定なし" in res.text
+    # 一覧の再構築（200件 LIMIT）を伴わない
+    assert not any("LIMIT" in statement and "pc_assets" in statement for statement in statements)
+
+
+def test_plan_add_fragment_shows_new_plan_without_flash(client, ids):
+    res = client.post(
+        f"/assets/{ids['asset']}/plans",
+        data={"title": "搬入", "planned_date": date.today().isoformat(), "next_plan_limit": "3"},
+        headers=ROW,
+    )
+    assert res.status_code == 200
+    assert "搬入" in res.text
+    assert "期限切れ点検" in res.text
+    assert "今日の予定あり" in res.text
+    assert 'name="next_plan_limit" value="3"' in res.text
+    assert "予定を追加しました" not in client.get("/assets/new").text
+
+
+def test_invalid_transition_returns_error_snippet(client, ids):
+    res = client.post(f"/assets/{ids['asset']}/transition", data={"to_status": "USE", "version": "1"}, headers=ROW)
+    assert res.status_code == 409
+    assert res.headers["X-Fragment"] == "error"
+    assert "状態遷移が許可されていません。" in res.text
+    assert "<html" not in res.text
+
+
+def test_invalid_transition_without_fragment_skips_list_rebuild(client, ids):
+    res = client.post(f"/assets/{ids['asset']}/transition", data={"to_status": "USE", "version": "1"})
+    assert res.status_code == 409
+    assert "状態遷移エラー" in res.text
+    assert "AST-ROW-000" not in res.text
+
+
+def test_stale_version_returns_conflict_snippet(client, ids):
+    res = client.post(
+        f"/assets/{ids['asset']}/plans/{ids['plan']}/cancel",
+        data={"version": "7"},
+        headers=ROW,
+    )
+    assert res.status_code == 409
+    assert res.headers["X-Fragment"] == "error"
+    assert "他のユーザーが先に更新しました" in res.text
+
+
+def test_missing_date_returns_error_snippet(client, ids):
+    res = client.post(f"/assets/{ids['asset']}/plans", data={"title": "搬入"}, headers=ROW)
+    assert res.status_code == 422
+    assert "予定日が未入力です" in res.text
+
+
+def test_replayed_fragment_returns_current_row(client, ids):
+    data = {"title": "搬入", "planned_date": date.today().isoformat(), "idempotency_key": KEY}
+    first = client.post(f"/assets/{ids['asset']}/plans", data=data, headers=ROW)
+    second = client.post(f"/assets/{ids['asset']}/plans", data=data, headers=ROW)
+    assert first.status_code == second.status_code == 200
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert second.headers["X-Fragment"] == "row"
+    db = TestingSessionLocal()
+    assert db.query(PcPlan).count() == 2
+    db.close()
+
+
+def test_redirect_flow_is_unchanged_without_header(client, ids):
+    res = client.post(
+        f"/assets/{ids['asset']}/plans/{ids['plan']}/done",
+        data={"actual_date": date.today().isoformat(), "version": "1"},
+        follow_redirects=False,
+    )
+    assert res.status_code == 303
+    assert res.headers["location"] == "/assets"
@@ -3,15 +3,23 @@ import os
 import sys
 import tempfile
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__) + '/../'))
-from app.db import Base, SessionLocal, engine
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.db as db_module
+import tools.create_sample_data as create_sample_data_module
+from app.db import Base
 from app.models import User
 from tools.create_sample_data import main as create_sample_data_main
 
-def test_sample_user_created():
-    # テスト用DBファイルを一時作成
+def test_sample_user_created(monkeypatch):
+    # テスト用DBファイルを一時作成（app.db の engine は開発用DBに接続済みのため、別に作って差し替える）
     db_fd, db_path = tempfile.mkstemp(suffix='.db')
     os.close(db_fd)
-    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    engine = create_engine(f'sqlite:///{db_path}')
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    monkeypatch.setattr(db_module, 'engine', engine)
+    monkeypatch.setattr(create_sample_data_module, 'SessionLocal', SessionLocal)
     try:
         # テーブル作成＆サンプルデータ投入
         Base.metadata.create_all(bind=engine)
@@ -22,5 +30,6 @@ def test_sample_user_created():
         assert user.user_id == "shuiei"
         session.close()
     finally:
+        engine.dispose()
         if os.path.exists(db_path):
             os.remove(db_path)
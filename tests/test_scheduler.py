@@ -0,0 +1,253 @@
+import asyncio
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.overdue as overdue_module
+from app.db import Base, get_db
+from app.main import app
+from app.models import PcPlan, PlanStatus, SchedulerLock, SchedulerRun, User, UserRole
+from app.scheduler import Job, Scheduler, acquire_lease, run_due_jobs
+from app.security import hash_passcode
+from tools import run_scheduled_jobs
+
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+TODAY = date.today()
+STAMP = datetime(2026, 1, 5, 9, 0, 0)
+
+
+def _override_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _raw_plan(db, offset: int, *, is_overdue: bool, status=PlanStatus.PLANNED, owner="tech01") -> int:
+    """ORM を通さずに入れる（日付が変わった直後の、印がまだ古い状態を作るため）。"""
+    return db.execute(
+        insert(PcPlan).values(
+            entity_type="ASSET",
+            entity_id=1,
+            title="点検",
+            planned_date=TODAY + timedelta(days=offset),
+            planned_owner=owner,
+            plan_status=status,
+            is_overdue=is_overdue,
+            created_by="testuser",
+            created_at=STAMP,
+            updated_at=STAMP,
+            version=1,
+        )
+    ).inserted_primary_key[0]
+
+
+@pytest.fixture
+def ids():
+    db = TestingSessionLocal()
+    for model in (SchedulerRun, SchedulerLock, PcPlan, User):
+        db.query(model).delete()
+    db.add(
+        User(
+            user_id="admin",
+            passcode_hash=hash_passcode("pass1234"),
+            display_name="管理者",
+            role=UserRole.ADMIN,
+            is_active=True,
+        )
+    )
+    result = {
+        "stale": _raw_plan(db, -1, is_overdue=False),
+        "wrong": _raw_plan(db, 3, is_overdue=True),
+        "done": _raw_plan(db, -5, is_overdue=True, status=PlanStatus.DONE),
+        "future": _raw_plan(db, 2, is_overdue=False),
+    }
+    db.commit()
+    db.close()
+    overdue_module.forget_ready()
+    yield result
+    overdue_module.forget_ready()
+
+
+@pytest.fixture
+def client(ids):
+    app.dependency_overrides[get_db] = _override_db
+    test_client = TestClient(app)
+    login = test_client.post("/login", data={"user_id": "admin", "passcode": "pass1234"}, follow_redirects=False)
+    assert login.status_code == 303
+    test_client.get("/dashboard")
+    yield test_client
+    app.dependency_overrides.clear()
+
+
+def _flags() -> dict[int, tuple[bool, int, datetime]]:
+    db = TestingSessionLocal()
+    try:
+        return {plan.id: (plan.is_overdue, plan.version, plan.updated_at) for plan in db.execute(select(PcPlan)).scalars()}
+    finally:
+        db.close()
+
+
+def test_run_marks_and_clears_flags_without_touching_versions(ids):
+    db = TestingSessionLocal()
+    runs = run_due_jobs(db, worker="w1", interval_sec=86400, lease_sec=300)
+    db.close()
+
+    assert [(run.job, run.status, run.changed_count) for run in runs] == [("mark_overdue", "OK", 3)]
+    assert runs[0].run_for == TODAY
+    assert runs[0].duration_ms >= 0
+    flags = _flags()
+    assert flags[ids["stale"]] == (True, 1, STAMP)
+    assert flags[ids["wrong"]] == (False, 1, STAMP)
+    assert flags[ids["done"]] == (False, 1, STAMP)
+    assert flags[ids["future"]] == (False, 1, STAMP)
+
+
+def test_orm_writes_keep_the_flag(ids):
+    db = TestingSessionLocal()
+    plan = PcPlan(
+        entity_type="ASSET",
+        entity_id=1,
+        title="追加",
+        planned_date=TODAY - timedelta(days=2),
+        plan_status=PlanStatus.PLANNED,
+        created_by="testuser",
+    )
+    db.add(plan)
+    db.commit()
+    assert plan.is_overdue is True
+
+    plan.plan_status = PlanStatus.DONE
+    db.commit()
+    assert plan.is_overdue is False
+    db.close()
+
+
+def test_jobs_run_once_per_day_unless_forced(ids):
+    db = TestingSessionLocal()
+    assert len(run_due_jobs(db, worker="w1", interval_sec=86400, lease_sec=300)) == 1
+    assert run_due_jobs(db, worker="w1", interval_sec=86400, lease_sec=300) == []
+    assert len(run_due_jobs(db, worker="w1", interval_sec=86400, lease_sec=300, today=TODAY + timedelta(days=1))) == 1
+    assert len(run_due_jobs(db, worker="w1", interval_sec=86400, lease_sec=300, force=True)) == 1
+    assert db.query(SchedulerRun).count() == 3
+    db.close()
+
+
+def test_only_the_lease_holder_runs_jobs(ids):
+    db = TestingSessionLocal()
+    now = datetime(2026, 3, 1, 0, 0, 0)
+    assert acquire_lease(db, "w1", 300, now=now)
+    assert not acquire_lease(db, "w2", 300, now=now + timedelta(seconds=10))
+    assert acquire_lease(db, "w1", 300, now=now + timedelta(seconds=20))
+    # 延長されなくなったリースは期限後に他のワーカーが引き継ぐ
+    assert acquire_lease(db, "w2", 300, now=now + timedelta(seconds=400))
+    assert db.get(SchedulerLock, "scheduler").owner == "w2"
+
+    # 現在時刻で w2 が期限内のリースを持っていれば w1 は実行しない
+    assert acquire_lease(db, "w2", 300)
+    assert run_due_jobs(db, worker="w1", interval_sec=86400, lease_sec=300) == []
+    assert db.query(SchedulerRun).count() == 0
+    db.close()
+
+
+def test_failed_job_is_recorded_and_flags_are_not_trusted(ids, monkeypatch):
+    def broken(db, today):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr("app.scheduler.JOBS", (Job("mark_overdue", broken),))
+    db = TestingSessionLocal()
+    (run,) = run_due_jobs(db, worker="w1", interval_sec=86400, lease_sec=300)
+    assert (run.status, run.detail) == ("ERROR", "RuntimeError: boom")
+    assert not overdue_module.flags_ready(db, TODAY)
+    # 失敗した日は成功するまで毎回実行する
+    assert len(run_due_jobs(db, worker="w1", interval_sec=86400, lease_sec=300)) == 1
+    db.close()
+
+
+def test_read_paths_fall_back_until_todays_run_then_use_flags(client, ids):
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "pc_plans" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        before = client.get("/plans/overdue")
+        before_sql = list(statements)
+        db = TestingSessionLocal()
+        run_due_jobs(db, worker="w1", interval_sec=86400, lease_sec=300)
+        db.close()
+        statements.clear()
+        after = client.get("/plans/overdue")
+        after_sql = list(statements)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    # 今日の判定前は日付で比べるため、印の古い予定も期限超過として出る
+    assert f'href="/plans/{ids["stale"]}"' in before.text
+    assert f'href="/plans/{ids["wrong"]}"' not in before.text
+    assert not any("WHERE pc_plans.is_overdue IS 1" in sql for sql in before_sql)
+
+    assert f'href="/plans/{ids["stale"]}"' in after.text
+    assert f'href="/plans/{ids["wrong"]}"' not in after.text
+    assert any("WHERE pc_plans.is_overdue IS 1" in sql for sql in after_sql)
+
+    dashboard = client.get("/dashboard")
+    assert dashboard.status_code == 200
+
+
+def test_scheduler_task_runs_and_releases_lease(ids):
+    scheduler = Scheduler(TestingSessionLocal, interval_sec=86400, lease_sec=300)
+
+    async def drive():
+        scheduler.start()
+        for _ in range(100):
+            await asyncio.sleep(0.02)
+            db = TestingSessionLocal()
+            count = db.query(SchedulerRun).count()
+            db.close()
+            if count:
+                break
+        await scheduler.stop()
+
+    asyncio.run(drive())
+    db = TestingSessionLocal()
+    assert db.query(SchedulerRun).filter(SchedulerRun.worker == scheduler.worker).count() == 1
+    assert db.get(SchedulerLock, "scheduler") is None
+    db.close()
+
+
+def test_cli_run_releases_lease(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'jobs.db'}"
+    file_engine = create_engine(database_url)
+    Base.metadata.create_all(bind=file_engine)
+
+    results = run_scheduled_jobs.run(database_url, force=True)
+    assert results and all(status == "OK" for _, status, _ in results)
+    with sessionmaker(bind=file_engine)() as db:
+        assert db.get(SchedulerLock, "scheduler") is None
+        # リースの期限を待たずに別のワーカーが実行権を取れる
+        assert acquire_lease(db, "other-worker", 300)
+    file_engine.dispose()
+
+
+def test_admin_jobs_page_runs_jobs_on_demand(client):
+    res = client.post("/admin/jobs/run", follow_redirects=False)
+    assert res.status_code == 303
+    page = client.get("/admin/jobs")
+    assert page.status_code == 200
+    assert "定期処理を実行しました。" in page.text
+    assert "mark_overdue" in page.text
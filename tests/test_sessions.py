@@ -0,0 +1,300 @@
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import app.sessions as sessions_module
+from app.db import Base, get_db
+from app.main import app
+from app.models import HttpSession, User, UserRole
+from app.security import hash_passcode
+from app.sessions import (
+    SESSION_COOKIE,
+    CookieBackend,
+    DatabaseBackend,
+    MemoryBackend,
+    SessionMiddleware,
+    _storage_key,
+)
+from app.utils import add_flash, consume_flash
+
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+TTL = 3600
+
+
+def _override_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def _login(request: Request):
+    request.session["user_id"] = request.query_params["user"]
+    return JSONResponse({})
+
+
+async def _read(request: Request):
+    return JSONResponse({"user_id": request.session.get("user_id"), "flashes": consume_flash(request.session)})
+
+
+async def _flash(request: Request):
+    add_flash(request.session, "success", "保存しました。")
+    return JSONResponse({})
+
+
+async def _logout(request: Request):
+    request.session.clear()
+    return JSONResponse({})
+
+
+def _session_app(backend, anonymous_backend=None) -> TestClient:
+    routes = [
+        Route("/login", _login),
+        Route("/read", _read, methods=["GET", "POST"]),
+        Route("/flash", _flash),
+        Route("/logout", _logout),
+    ]
+    session_app = Starlette(routes=routes)
+    session_app.add_middleware(
+        SessionMiddleware, backend=backend, max_age=TTL, anonymous_backend=anonymous_backend
+    )
+    return TestClient(session_app)
+
+
+def _backends():
+    return {
+        "cookie": CookieBackend("secret", TTL),
+        "memory": MemoryBackend(TTL),
+        "database": DatabaseBackend(TestingSessionLocal, TTL),
+    }
+
+
+@pytest.fixture(params=["cookie", "memory", "database"])
+def backend(request):
+    db = TestingSessionLocal()
+    db.query(HttpSession).delete()
+    db.commit()
+    db.close()
+    return _backends()[request.param]
+
+
+def test_cookie_is_written_only_when_session_changes(backend):
+    client = _session_app(backend)
+    assert "set-cookie" not in client.get("/read").headers
+
+    login = client.get("/login", params={"user": "testuser"})
+    assert SESSION_COOKIE in login.headers["set-cookie"]
+    assert "httponly" in login.headers["set-cookie"]
+
+    read = client.get("/read")
+    assert read.json()["user_id"] == "testuser"
+    assert "set-cookie" not in read.headers
+
+
+def test_flash_survives_until_read(backend):
+    client = _session_app(backend)
+    client.get("/login", params={"user": "testuser"})
+    client.get("/flash")
+    assert client.get("/read").json()["flashes"] == [{"level": "success", "message": "保存しました。"}]
+    assert client.get("/read").json()["flashes"] == []
+
+
+@pytest.mark.parametrize("kind", ["memory", "database"])
+def test_server_side_cookie_holds_only_an_opaque_id(kind):
+    backend = _backends()[kind]
+    client = _session_app(backend)
+    client.get("/login", params={"user": "testuser"})
+    for _ in range(5):
+        client.get("/flash")
+    session_id = client.cookies[SESSION_COOKIE]
+    assert "testuser" not in session_id
+    assert len(session_id) < 64
+    assert backend.load(session_id).data["user_id"] == "testuser"
+
+
+@pytest.mark.parametrize("kind", ["memory", "database"])
+def test_login_and_logout_rotate_the_session_id(kind):
+    backend = _backends()[kind]
+    client = _session_app(backend, CookieBackend("secret", TTL))
+    client.get("/flash")
+    anonymous_id = client.cookies[SESSION_COOKIE]
+
+    client.get("/login", params={"user": "testuser"})
+    logged_in_id = client.cookies[SESSION_COOKIE]
+    assert logged_in_id != anonymous_id
+    assert backend.load(anonymous_id) is None
+
+    logout = client.get("/logout")
+    assert "1970" in logout.headers["set-cookie"]
+    assert backend.load(logged_in_id) is None
+
+
+@pytest.mark.parametrize("kind", ["memory", "database"])
+def test_unknown_session_id_is_not_adopted(kind):
+    backend = _backends()[kind]
+    client = _session_app(backend)
+    client.cookies.set(SESSION_COOKIE, "attacker-chosen-id")
+    login = client.get("/login", params={"user": "testuser"})
+    issued = login.headers["set-cookie"].split(";", 1)[0].split("=", 1)[1]
+    assert issued != "attacker-chosen-id"
+    assert backend.load(issued).data["user_id"] == "testuser"
+    assert backend.load("attacker-chosen-id") is None
+
+
+def test_anonymous_sessions_are_not_stored_server_side():
+    db = TestingSessionLocal()
+    db.query(HttpSession).delete()
+    db.commit()
+    db.close()
+    backend = DatabaseBackend(TestingSessionLocal, TTL)
+    client = _session_app(backend, CookieBackend("secret", TTL))
+    for _ in range(3):
+        client.get("/flash")
+    assert client.get("/read").json()["flashes"] == [{"level": "success", "message": "保存しました。"}] * 3
+    db = TestingSessionLocal()
+    assert db.query(HttpSession).count() == 0
+    db.close()
+
+    # 保存先がなければ Cookie も発行しない
+    bare = _session_app(DatabaseBackend(TestingSessionLocal, TTL))
+    assert "set-cookie" not in bare.get("/flash").headers
+
+
+def test_signed_anonymous_cookie_cannot_carry_a_login():
+    backend = MemoryBackend(TTL)
+    anonymous = CookieBackend("secret", TTL)
+    client = _session_app(backend, anonymous)
+    client.cookies.set(SESSION_COOKIE, anonymous.save(None, {"user_id": "testuser"}))
+    assert client.get("/read").json()["user_id"] is None
+
+
+@pytest.mark.parametrize("kind", ["memory", "database"])
+def test_active_session_expiry_is_extended(kind, monkeypatch):
+    backend = _backends()[kind]
+    client = _session_app(backend)
+    client.get("/login", params={"user": "testuser"})
+    session_id = client.cookies[SESSION_COOKIE]
+    first_expiry = backend.load(session_id).expires_at
+
+    # 残りが半分以上あるうちは保存し直さない
+    now = sessions_module._utcnow()
+    monkeypatch.setattr(sessions_module, "_utcnow", lambda: now + timedelta(seconds=TTL * 0.4))
+    assert "set-cookie" not in client.get("/read").headers
+
+    # 読み取りだけの要求では延ばさない
+    monkeypatch.setattr(sessions_module, "_utcnow", lambda: now + timedelta(seconds=TTL * 0.6))
+    read = client.get("/read")
+    assert read.json()["user_id"] == "testuser"
+    assert "set-cookie" not in read.headers
+    assert backend.load(session_id).expires_at == first_expiry
+
+    # 更新系の要求で保存先の期限と Cookie の Max-Age を延ばす
+    posted = client.post("/read")
+    assert f"Max-Age={TTL}" in posted.headers["set-cookie"]
+    assert client.cookies[SESSION_COOKIE] == session_id
+    assert backend.load(session_id).expires_at > first_expiry
+
+    # 延長後は、最初の期限を過ぎてもログインしたまま
+    monkeypatch.setattr(sessions_module, "_utcnow", lambda: now + timedelta(seconds=TTL * 1.2))
+    assert client.get("/read").json()["user_id"] == "testuser"
+
+
+def test_read_only_request_past_half_life_sets_no_cookie(backend, monkeypatch):
+    client = _session_app(backend)
+    client.get("/login", params={"user": "testuser"})
+
+    later = sessions_module._utcnow() + timedelta(seconds=TTL * 0.6)
+    monkeypatch.setattr(sessions_module, "_utcnow", lambda: later)
+    for method in ("GET", "HEAD"):
+        res = client.request(method, "/read")
+        assert res.status_code == 200
+        assert "set-cookie" not in res.headers
+
+
+def test_database_backend_stores_hashed_id_and_expires(monkeypatch):
+    backend = DatabaseBackend(TestingSessionLocal, TTL)
+    session_id = backend.save(None, {"user_id": "testuser"})
+    db = TestingSessionLocal()
+    row = db.get(HttpSession, _storage_key(session_id))
+    assert row is not None
+    assert session_id not in row.id
+    db.close()
+
+    later = sessions_module._utcnow() + timedelta(seconds=TTL + 1)
+    monkeypatch.setattr(sessions_module, "_utcnow", lambda: later)
+    assert backend.load(session_id) is None
+
+
+def test_cookie_backend_reads_starlette_cookies():
+    from starlette.middleware.sessions import SessionMiddleware as StarletteSessionMiddleware
+
+    legacy = Starlette(routes=[Route("/login", _login)])
+    legacy.add_middleware(StarletteSessionMiddleware, secret_key="secret")
+    cookie = TestClient(legacy).get("/login", params={"user": "testuser"}).cookies[SESSION_COOKIE]
+    assert CookieBackend("secret", TTL).load(cookie).data == {"user_id": "testuser"}
+    assert CookieBackend("other", TTL).load(cookie) is None
+
+
+@pytest.fixture
+def app_client():
+    db = TestingSessionLocal()
+    db.query(User).delete()
+    db.add(
+        User(
+            user_id="testuser",
+            passcode_hash=hash_passcode("pass1234"),
+            display_name="テスト太郎",
+            role=UserRole.USER,
+            is_active=True,
+        )
+    )
+    db.commit()
+    db.close()
+    app.dependency_overrides[get_db] = _override_db
+    client = TestClient(app)
+    login = client.post("/login", data={"user_id": "testuser", "passcode": "pass1234"}, follow_redirects=False)
+    assert login.status_code == 303
+    yield client
+    app.dependency_overrides.clear()
+
+
+def test_read_only_pages_do_not_set_cookie(app_client):
+    assert "set-cookie" in app_client.get("/dashboard").headers  # ログイン時の Flash を消費
+
+    for path in ("/dashboard", "/assets", "/requests", "/plans/overdue"):
+        res = app_client.get(path)
+        assert res.status_code == 200
+        assert "set-cookie" not in res.headers, path
+
+
+def test_asset_list_flash_only_for_real_filters(app_client):
+    app_client.get("/dashboard")
+    assert "フィルタを適用しました" not in app_client.get("/assets").text
+    filtered = app_client.get("/assets", params={"status": "INV"})
+    assert "フィルタを適用しました" in filtered.text
+    assert "set-cookie" not in filtered.headers
+
+
+def test_session_backend_requires_all_operations():
+    class LoadOnly(sessions_module.SessionBackend):
+        def load(self, cookie):
+            return None
+
+    with pytest.raises(TypeError):
+        LoadOnly()
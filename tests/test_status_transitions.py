@@ -1,6 +1,8 @@
 import pytest
 
 from app.status_rules import (
+    ASSET_TRANSITIONS,
+    TransitionTable,
     is_allowed_asset_transition,
     is_allowed_request_transition,
     list_allowed_asset_targets,
@@ -81,3 +83,30 @@ def test_list_allowed_targets_for_asset():
     assert "IT" in allowed_from_ret
     assert "DIS" in allowed_from_ret
     assert "AUD" in allowed_from_ret
+
+
+def test_validate_many_matches_single_checks():
+    pairs = [(None, "INV"), ("INV", "READY"), ("READY", "DIS"), ("AUD", "LOST"), ("LOST", "INV"), ("USE", "XX")]
+    assert ASSET_TRANSITIONS.validate_many(pairs) == [
+        is_allowed_asset_transition(from_status, to_status) for from_status, to_status in pairs
+    ]
+
+
+def test_transition_table_from_definition_adds_states():
+    table = TransitionTable.from_definition(
+        {
+            "statuses": ["A", "B", "C"],
+            "rules": [{"from": ["NR"], "to": ["A"]}, {"from": ["A", "B"], "to": ["C"]}, {"from": ["A"], "to": ["B"]}],
+        }
+    )
+    assert table.allowed_targets(None) == ["A"]
+    assert table.allowed_targets("A") == ["B", "C"]
+    assert table.is_allowed("B", "C")
+    assert not table.is_allowed("C", "A")
+    with pytest.raises(TypeError):
+        table._targets["C"] = frozenset({"A"})
+
+
+def test_transition_table_rejects_unknown_status():
+    with pytest.raises(ValueError):
+        TransitionTable.from_definition({"statuses": ["A"], "rules": [{"from": ["A"], "to": ["Z"]}]})
@@ -0,0 +1,60 @@
+import gc
+from dataclasses import replace
+
+import jinja2
+import pytest
+
+from app.config import get_settings
+from app.templating import create_templates, precompile_templates
+
+
+@pytest.fixture(autouse=True)
+def _unfreeze():
+    yield
+    # production モードは gc.freeze() するので、テストプロセスでは元に戻す
+    gc.unfreeze()
+
+
+def _settings(tmp_path, mode: str):
+    return replace(get_settings(), template_mode=mode, template_cache_dir=str(tmp_path / "cache"))
+
+
+def test_production_mode_precompiles_every_template(tmp_path):
+    templates = create_templates(_settings(tmp_path, "production"))
+    env = templates.env
+    names = env.list_templates(extensions=["html"])
+
+    assert env.auto_reload is False
+    assert len(env.cache) == len(names)
+    assert len(list((tmp_path / "cache").iterdir())) == len(names)
+    assert env.filters["format_jst"] is not None
+    assert "idempotency_token" in env.globals
+    assert gc.get_freeze_count() > 0
+
+
+def test_warm_bytecode_cache_skips_compilation(tmp_path, monkeypatch):
+    settings = _settings(tmp_path, "production")
+    create_templates(settings)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("template was compiled again")
+
+    monkeypatch.setattr(jinja2.Environment, "compile", fail)
+    templates = create_templates(settings)
+    html = templates.env.get_template("_fragment_error.html").render(message="<競合>")
+    assert "&lt;競合&gt;" in html
+
+
+def test_development_mode_keeps_lazy_reloading(tmp_path):
+    templates = create_templates(_settings(tmp_path, "development"))
+    assert templates.env.auto_reload is True
+    assert templates.env.bytecode_cache is None
+    assert len(templates.env.cache) == 0
+    assert not (tmp_path / "cache").exists()
+
+
+def test_precompile_reports_broken_template(tmp_path):
+    (tmp_path / "broken.html").write_text("{% if %}", encoding="utf-8")
+    env = jinja2.Environment(loader=jinja2.FileSystemLoader(str(tmp_path)))
+    with pytest.raises(jinja2.TemplateSyntaxError):
+        precompile_templates(env)
@@ -0,0 +1,193 @@
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.dialects import mysql, postgresql
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.routes.reports as reports_module
+from app.db import Base, get_db
+from app.main import app
+from app.models import PcPlan, PlanStatus, User, UserRole
+from app.security import hash_passcode
+from app.workload import ReportCache, WorkloadRangeError, days_between, report_period, week_start
+
+engine = create_engine(
+    "sqlite+pysqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+Base.metadata.create_all(bind=engine)
+
+TODAY = date.today()
+
+
+def _override_db():
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _plan(status: PlanStatus, owner: str, planned: int, actual: int | None = None, actual_owner: str | None = None):
+    return PcPlan(
+        entity_type="ASSET",
+        entity_id=1,
+        title="点検",
+        planned_date=TODAY + timedelta(days=planned),
+        planned_owner=owner,
+        plan_status=status,
+        actual_date=None if actual is None else TODAY + timedelta(days=actual),
+        actual_owner=actual_owner or (owner if actual is not None else None),
+        created_by="testuser",
+    )
+
+
+@pytest.fixture
+def client():
+    db = TestingSessionLocal()
+    for model in (PcPlan, User):
+        db.query(model).delete()
+    db.add(
+        User(
+            user_id="testuser",
+            passcode_hash=hash_passcode("pass1234"),
+            display_name="テスト太郎",
+            role=UserRole.USER,
+            is_active=True,
+        )
+    )
+    db.add_all(
+        [
+            _plan(PlanStatus.PLANNED, "tech01", -2),
+            _plan(PlanStatus.PLANNED, "tech01", 1),
+            _plan(PlanStatus.PLANNED, "tech02", 1),
+            _plan(PlanStatus.PLANNED, "tech01", 100),
+            _plan(PlanStatus.DONE, "tech01", -5, actual=-3),
+            _plan(PlanStatus.DONE, "tech01", -3, actual=-2),
+            _plan(PlanStatus.DONE, "tech01", -4, actual=-4, actual_owner="tech02"),
+            _plan(PlanStatus.CANCELLED, "tech01", 1),
+        ]
+    )
+    db.commit()
+    db.close()
+    reports_module.report_cache.clear()
+    app.dependency_overrides[get_db] = _override_db
+    test_client = TestClient(app)
+    login = test_client.post("/login", data={"user_id": "testuser", "passcode": "pass1234"}, follow_redirects=False)
+    assert login.status_code == 303
+    test_client.get("/dashboard")
+    yield test_client
+    app.dependency_overrides.clear()
+    reports_module.report_cache.clear()
+
+
+PARAMS = {
+    "date_from": (TODAY - timedelta(days=10)).isoformat(),
+    "date_to": (TODAY + timedelta(days=10)).isoformat(),
+}
+
+
+def _csv_rows(res) -> list[list[str]]:
+    assert res.text.startswith("\ufeff")
+    return [line.split(",") for line in res.text.lstrip("\ufeff").strip().split("\r\n")]
+
+
+def test_daily_report_counts_planned_overdue_done_and_lead_time(client):
+    res = client.get("/reports/workload.csv", params=PARAMS)
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/csv")
+    assert "attachment" in res.headers["content-disposition"]
+    rows = _csv_rows(res)
+    assert rows[0] == reports_module.CSV_HEADER
+    day = lambda offset: (TODAY + timedelta(days=offset)).isoformat()  # noqa: E731
+    assert rows[1:] == [
+        ["tech01", day(-3), "0", "0", "1", "2.0"],
+        ["tech01", day(-2), "1", "1", "1", "1.0"],
+        ["tech01", day(1), "1", "0", "0", ""],
+        ["tech02", day(-4), "0", "0", "1", "0.0"],
+        ["tech02", day(1), "1", "0", "0", ""],
+    ]
+
+
+def test_aggregation_runs_as_group_by_queries(client):
+    statements: list[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "pc_plans" in statement:
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        res = client.get("/reports/workload", params=PARAMS)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    assert res.status_code == 200
+    assert len(statements) == 2
+    assert all("GROUP BY" in statement for statement in statements)
+    assert "julianday" in statements[1]
+    assert "担当者別合計" in res.text
+    assert "1.5" in res.text  # tech01 の完了2件のリードタイム平均
+
+
+def test_weekly_buckets_start_on_monday(client):
+    res = client.get("/reports/workload.csv", params={**PARAMS, "bucket": "week"})
+    rows = _csv_rows(res)[1:]
+    assert rows
+    assert all(date.fromisoformat(row[1]).weekday() == 0 for row in rows)
+    assert sum(int(row[2]) for row in rows) == 3
+    assert sum(int(row[4]) for row in rows) == 3
+
+
+def test_owner_filter(client):
+    rows = _csv_rows(client.get("/reports/workload.csv", params={**PARAMS, "owner": "tech02"}))[1:]
+    assert {row[0] for row in rows} == {"tech02"}
+
+
+def test_report_is_cached_for_the_day_until_refresh(client):
+    client.get("/reports/workload", params=PARAMS)
+    db = TestingSessionLocal()
+    db.add(_plan(PlanStatus.PLANNED, "tech09", 2))
+    db.commit()
+    db.close()
+
+    assert "tech09" not in client.get("/reports/workload", params=PARAMS).text
+    assert "tech09" in client.get("/reports/workload", params={**PARAMS, "refresh": "1"}).text
+
+
+def test_invalid_period(client):
+    res = client.get("/reports/workload.csv", params={"date_from": "2026-03-10", "date_to": "2026-03-01"})
+    assert res.status_code == 400
+
+    page = client.get("/reports/workload", params={"date_from": "bad"})
+    assert page.status_code == 200
+    assert "期間は YYYY-MM-DD 形式で指定してください" in page.text
+
+
+def test_report_period_defaults_and_limits():
+    assert report_period(None, None, date(2026, 2, 14)) == (date(2026, 2, 1), date(2026, 2, 28))
+    with pytest.raises(WorkloadRangeError):
+        report_period("2025-01-01", "2026-01-02", date(2026, 2, 14))
+
+
+def test_cache_drops_previous_day():
+    cache = ReportCache(8)
+    assert cache.get_or_compute(date(2026, 3, 1), ("a",), lambda: 1) == 1
+    assert cache.get_or_compute(date(2026, 3, 1), ("a",), lambda: 2) == 1
+    assert cache.get_or_compute(date(2026, 3, 2), ("a",), lambda: 3) == 3
+    assert len(cache) == 1
+
+
+def test_date_expressions_follow_dialect():
+    statement = select(week_start(PcPlan.planned_date), days_between(PcPlan.actual_date, PcPlan.planned_date))
+    mysql_sql = str(statement.compile(dialect=mysql.dialect()))
+    assert "WEEKDAY(pc_plans.planned_date)" in mysql_sql
+    assert "DATEDIFF(pc_plans.actual_date, pc_plans.planned_date)" in mysql_sql
+    postgresql_sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "date_trunc('week', pc_plans.planned_date)" in postgresql_sql
+    assert "(pc_plans.actual_date - pc_plans.planned_date)" in postgresql_sql
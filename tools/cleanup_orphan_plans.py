@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import argparse
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.plan_targets import count_orphan_plans, delete_orphan_plans
+
+
+def cleanup(database_url: str, *, dry_run: bool = False) -> dict[str, int]:
+    """対象（資産/要求）が存在しない予定を削除し、削除前の種別ごとの件数を返す。"""
+    engine = create_engine(database_url)
+    session_factory = sessionmaker(bind=engine)
+    try:
+        with session_factory() as db:
+            counts = count_orphan_plans(db)
+            if counts and not dry_run:
+                delete_orphan_plans(db)
+                db.commit()
+            return counts
+    finally:
+        engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="対象が削除済みの予定（孤立した予定）を削除します。")
+    parser.add_argument("--database-url", default="sqlite:///./pc_management.db")
+    parser.add_argument("--dry-run", action="store_true", help="件数の表示だけ行い、削除しない")
+    args = parser.parse_args()
+
+    counts = cleanup(args.database_url, dry_run=args.dry_run)
+    action = "found" if args.dry_run else "deleted"
+    print(f"{action} {sum(counts.values())} orphan plans {counts}")
+
+
+if __name__ == "__main__":
+    main()
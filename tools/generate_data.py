@@ -0,0 +1,439 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+
+from sqlalchemy import bindparam, create_engine, delete, event, insert, update
+from sqlalchemy.engine import Engine
+
+from app.db import Base
+from app.models import PcAsset, PcPlan, PcRequest, PcStatusHistory, PlanStatus
+from app.plan_summary import summarize_plans
+from app.status_rules import list_allowed_asset_targets, list_allowed_request_targets
+
+CHUNK_ASSETS = 10_000
+GENERATOR_USER = "generator"
+
+ASSET_TARGET_WEIGHTS: dict[str, float] = {
+    "INV": 3.0,
+    "READY": 3.0,
+    "USE": 6.0,
+    "RET": 3.0,
+    "IT": 1.0,
+    "DIS": 0.5,
+    "AUD": 0.2,
+    "LOST": 0.3,
+}
+REQUEST_STATUS_WEIGHTS: dict[str, float] = {"RQ": 3.0, "OP": 3.0, "RP": 4.0}
+LOCATIONS = ["本社", "大阪支社", "名古屋支社", "福岡支社", "札幌支社"] + [f"拠点{i}" for i in range(1, 16)]
+LOCATION_WEIGHTS = [1.0 / (rank + 1) for rank in range(len(LOCATIONS))]
+OWNERS = [f"tech{i:02}" for i in range(1, 51)]
+OWNER_WEIGHTS = [1.0 / (rank + 1) ** 0.5 for rank in range(len(OWNERS))]
+PLAN_TITLES = ["キッティング", "貸出準備", "回収", "データ消去", "棚卸確認", "修理受付", "OS更新", "廃棄手配"]
+
+
+@dataclass(frozen=True)
+class ChunkSpec:
+    index: int
+    first_asset_id: int
+    asset_count: int
+    plan_count: int
+    first_plan_id: int
+    history_count: int
+    first_history_id: int
+
+
+def _chunk_rng(seed: int, stream: str, index: int) -> random.Random:
+    return random.Random(f"{seed}:{stream}:{index}")
+
+
+def _split_evenly(total: int, parts: list[int], whole: int) -> list[int]:
+    if whole <= 0:
+        return [0 for _ in parts]
+    shares = [total * part // whole for part in parts]
+    remainder = total - sum(shares)
+    for offset in range(remainder):
+        shares[offset % len(shares)] += 1
+    return shares
+
+
+def _distribute(rng: random.Random, total: int, slots: int) -> list[int]:
+    if slots <= 0:
+        return []
+    weights = [rng.random() + 0.5 for _ in range(slots)]
+    weight_sum = sum(weights)
+    counts = [int(total * weight / weight_sum) for weight in weights]
+    for _ in range(total - sum(counts)):
+        counts[rng.randrange(slots)] += 1
+    return counts
+
+
+def _weighted_choice(rng: random.Random, options: list[str], weights: dict[str, float]) -> str:
+    return rng.choices(options, weights=[weights.get(option, 1.0) for option in options])[0]
+
+
+def _asset_chain(rng: random.Random, length: int) -> list[tuple[str | None, str]]:
+    steps: list[tuple[str | None, str]] = []
+    current: str | None = None
+    for _ in range(length):
+        targets = list_allowed_asset_targets(current)
+        following = _weighted_choice(rng, targets, ASSET_TARGET_WEIGHTS)
+        steps.append((current, following))
+        current = following
+    return steps
+
+
+def _request_chain(status: str) -> list[tuple[str | None, str]]:
+    steps: list[tuple[str | None, str]] = []
+    current: str | None = None
+    while current != status:
+        following = list_allowed_request_targets(current)[0]
+        steps.append((current, following))
+        current = following
+    return steps
+
+
+def _plan_row(
+    rng: random.Random,
+    *,
+    plan_id: int,
+    entity_type: str,
+    entity_id: int,
+    today: date,
+    now: datetime,
+) -> dict:
+    offset = max(-180, min(180, int(rng.gauss(0, 45))))
+    planned_date = today + timedelta(days=offset)
+    owner = rng.choices(OWNERS, weights=OWNER_WEIGHTS)[0]
+    if offset < -14:
+        weights = (0.10, 0.85, 0.05)
+    elif offset < 0:
+        weights = (0.50, 0.45, 0.05)
+    else:
+        weights = (0.95, 0.0, 0.05)
+    status = rng.choices(
+        [PlanStatus.PLANNED.value, PlanStatus.DONE.value, PlanStatus.CANCELLED.value],
+        weights=weights,
+    )[0]
+    done = status == PlanStatus.DONE.value
+    actual_date = min(today, planned_date + timedelta(days=rng.randint(-2, 7))) if done else None
+    return {
+        "id": plan_id,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "title": rng.choice(PLAN_TITLES),
+        "planned_date": planned_date,
+        "planned_owner": owner,
+        "plan_status": status,
+        "actual_date": actual_date,
+        "actual_owner": owner if done else None,
+        "result_note": None,
+        "is_overdue": status == PlanStatus.PLANNED.value and offset < 0,
+        "created_by": GENERATOR_USER,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _chunk_rows(spec: ChunkSpec, *, seed: int, today: date) -> tuple[list[dict], list[dict], list[dict]]:
+    rng = _chunk_rng(seed, "assets", spec.index)
+    now = datetime.combine(today, dt_time(9, 0), tzinfo=timezone.utc)
+    history_lengths = _distribute(rng, spec.history_count, spec.asset_count)
+    plan_counts = _distribute(rng, spec.plan_count, spec.asset_count)
+
+    assets: list[dict] = []
+    history: list[dict] = []
+    plans: list[dict] = []
+    history_id = spec.first_history_id
+    plan_id = spec.first_plan_id
+
+    for offset in range(spec.asset_count):
+        asset_id = spec.first_asset_id + offset
+        created_at = now - timedelta(days=rng.randint(30, 3 * 365), minutes=rng.randint(0, 1439))
+        changed_at = created_at
+        chain = _asset_chain(rng, history_lengths[offset])
+        for from_status, to_status in chain:
+            history.append(
+                {
+                    "id": history_id,
+                    "entity_type": "ASSET",
+                    "entity_id": asset_id,
+                    "from_status": from_status,
+                    "to_status": to_status,
+                    "changed_by": GENERATOR_USER,
+                    "reason": None,
+                    "ticket_no": None,
+                    "changed_at": changed_at,
+                }
+            )
+            history_id += 1
+            changed_at += timedelta(days=rng.randint(0, 20), minutes=rng.randint(1, 600))
+
+        if chain:
+            status = chain[-1][1]
+        else:
+            status = _weighted_choice(rng, list_allowed_asset_targets(None), ASSET_TARGET_WEIGHTS)
+        assets.append(
+            {
+                "id": asset_id,
+                "asset_tag": f"AST-{asset_id:08}",
+                "serial_no": f"SN-{asset_id:010}",
+                "hostname": f"pc-{asset_id:08}",
+                "status": status,
+                "current_user": f"user{rng.randint(1, 20000):05}" if status == "USE" else None,
+                "location": rng.choices(LOCATIONS, weights=LOCATION_WEIGHTS)[0],
+                "request_id": None,
+                "notes": None,
+                "created_at": created_at,
+                "updated_at": min(changed_at, now),
+            }
+        )
+
+        asset_plans = []
+        for _ in range(plan_counts[offset]):
+            asset_plans.append(
+                _plan_row(rng, plan_id=plan_id, entity_type="ASSET", entity_id=asset_id, today=today, now=now)
+            )
+            plan_id += 1
+        # 一括投入は ORM のイベントを通らないため、予定の要約もここで埋める
+        summary = summarize_plans(asset_plans)
+        assets[-1].update(
+            next_plan_date=summary.next_plan_date,
+            next_plan_id=summary.next_plan_id,
+            open_plan_count=summary.open_plan_count,
+        )
+        plans.extend(asset_plans)
+
+    return assets, history, plans
+
+
+def _make_engine(database_url: str) -> Engine:
+    if not database_url.startswith("sqlite"):
+        return create_engine(database_url)
+
+    engine = create_engine(database_url, connect_args={"timeout": 120})
+
+    @event.listens_for(engine, "connect")
+    def _sqlite_bulk_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.close()
+
+    return engine
+
+
+def _insert_batches(conn, table, rows: list[dict], batch_size: int) -> None:
+    for start in range(0, len(rows), batch_size):
+        conn.execute(insert(table), rows[start : start + batch_size])
+
+
+def _load_chunk(database_url: str, spec: ChunkSpec, seed: int, today: date, batch_size: int) -> int:
+    assets, history, plans = _chunk_rows(spec, seed=seed, today=today)
+    engine = _make_engine(database_url)
+    try:
+        with engine.begin() as conn:
+            _insert_batches(conn, PcAsset.__table__, assets, batch_size)
+            _insert_batches(conn, PcStatusHistory.__table__, history, batch_size)
+            _insert_batches(conn, PcPlan.__table__, plans, batch_size)
+    finally:
+        engine.dispose()
+    return spec.index
+
+
+def _request_rows(
+    *,
+    count: int,
+    asset_count: int,
+    seed: int,
+    today: date,
+    first_history_id: int,
+) -> tuple[list[dict], list[dict]]:
+    rng = _chunk_rng(seed, "requests", 0)
+    now = datetime.combine(today, dt_time(9, 0), tzinfo=timezone.utc)
+    statuses = list(REQUEST_STATUS_WEIGHTS)
+    requests: list[dict] = []
+    history: list[dict] = []
+    history_id = first_history_id
+    # 資産側の request_id と対にするため、1つの資産は1つの要求にだけ紐付ける
+    linked_assets = iter(rng.sample(range(1, asset_count + 1), min(count, asset_count)))
+    for request_id in range(1, count + 1):
+        status = _weighted_choice(rng, statuses, REQUEST_STATUS_WEIGHTS)
+        changed_at = now - timedelta(days=rng.randint(1, 365))
+        for from_status, to_status in _request_chain(status):
+            history.append(
+                {
+                    "id": history_id,
+                    "entity_type": "REQUEST",
+                    "entity_id": request_id,
+                    "from_status": from_status,
+                    "to_status": to_status,
+                    "changed_by": GENERATOR_USER,
+                    "reason": None,
+                    "ticket_no": None,
+                    "changed_at": changed_at,
+                }
+            )
+            history_id += 1
+            changed_at += timedelta(days=rng.randint(0, 10))
+        requests.append(
+            {
+                "id": request_id,
+                "status": status,
+                "requester": f"user{rng.randint(1, 20000):05}",
+                "note": None,
+                "asset_id": next(linked_assets, None) if rng.random() < 0.6 else None,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+    return requests, history
+
+
+def _link_assets(conn, requests: list[dict], batch_size: int) -> None:
+    """要求の asset_id に合わせて資産の request_id を埋める（資産は要求より先に投入するため後から更新する）。"""
+    links = [
+        {"link_asset_id": row["asset_id"], "link_request_id": row["id"]}
+        for row in requests
+        if row["asset_id"] is not None
+    ]
+    table = PcAsset.__table__
+    # updated_at の onupdate で生成結果が実行時刻に依存しないよう、元の値のまま更新する
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("link_asset_id"))
+        .values(request_id=bindparam("link_request_id"), updated_at=table.c.updated_at)
+    )
+    for start in range(0, len(links), batch_size):
+        conn.execute(statement, links[start : start + batch_size])
+
+
+def plan_chunks(*, assets: int, plans: int, history: int, first_history_id: int = 1) -> list[ChunkSpec]:
+    sizes = [min(CHUNK_ASSETS, assets - start) for start in range(0, assets, CHUNK_ASSETS)]
+    plan_shares = _split_evenly(plans, sizes, assets)
+    history_shares = _split_evenly(history, sizes, assets)
+
+    specs: list[ChunkSpec] = []
+    next_asset_id = 1
+    next_plan_id = 1
+    next_history_id = first_history_id
+    for index, size in enumerate(sizes):
+        specs.append(
+            ChunkSpec(
+                index=index,
+                first_asset_id=next_asset_id,
+                asset_count=size,
+                plan_count=plan_shares[index],
+                first_plan_id=next_plan_id,
+                history_count=history_shares[index],
+                first_history_id=next_history_id,
+            )
+        )
+        next_asset_id += size
+        next_plan_id += plan_shares[index]
+        next_history_id += history_shares[index]
+    return specs
+
+
+def generate(
+    database_url: str,
+    *,
+    assets: int,
+    requests: int,
+    plans: int,
+    history: int,
+    seed: int = 42,
+    today: date | None = None,
+    batch_size: int = 10_000,
+    workers: int = 1,
+    reset: bool = False,
+    engine: Engine | None = None,
+) -> dict[str, int]:
+    today = today or date.today()
+    owned_engine = engine is None
+    engine = engine or _make_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    if reset:
+        with engine.begin() as conn:
+            for model in (PcStatusHistory, PcPlan, PcRequest, PcAsset):
+                conn.execute(delete(model))
+
+    request_rows, request_history = _request_rows(
+        count=requests,
+        asset_count=assets,
+        seed=seed,
+        today=today,
+        first_history_id=1,
+    )
+    request_history = request_history[:history]
+    specs = plan_chunks(
+        assets=assets,
+        plans=plans,
+        history=max(0, history - len(request_history)),
+        first_history_id=len(request_history) + 1,
+    )
+
+    if workers > 1 and ":memory:" not in database_url:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_load_chunk, database_url, spec, seed, today, batch_size) for spec in specs]
+            for future in futures:
+                future.result()
+    else:
+        for spec in specs:
+            chunk_assets, chunk_history, chunk_plans = _chunk_rows(spec, seed=seed, today=today)
+            with engine.begin() as conn:
+                _insert_batches(conn, PcAsset.__table__, chunk_assets, batch_size)
+                _insert_batches(conn, PcStatusHistory.__table__, chunk_history, batch_size)
+                _insert_batches(conn, PcPlan.__table__, chunk_plans, batch_size)
+
+    with engine.begin() as conn:
+        _insert_batches(conn, PcRequest.__table__, request_rows, batch_size)
+        _insert_batches(conn, PcStatusHistory.__table__, request_history, batch_size)
+        _link_assets(conn, request_rows, batch_size)
+    if owned_engine:
+        engine.dispose()
+
+    return {
+        "assets": assets,
+        "requests": requests,
+        "plans": sum(spec.plan_count for spec in specs),
+        "history": len(request_history) + sum(spec.history_count for spec in specs),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="再現可能な大量データを生成して投入します。")
+    # --reset は投入先のデータを消すため、既定は開発用DBではなくベンチマーク用DBにする
+    parser.add_argument("--database-url", default="sqlite:///./bench.db")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--assets", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--plans", type=int, default=300_000)
+    parser.add_argument("--history", type=int, default=1_000_000)
+    parser.add_argument("--today", type=date.fromisoformat, help="予定日の基準日（既定: 今日）")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=1, help="チャンクを並列投入するプロセス数")
+    parser.add_argument("--reset", action="store_true", help="投入前に資産/要求/予定/履歴を削除する")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = generate(
+        args.database_url,
+        assets=args.assets,
+        requests=args.requests,
+        plans=args.plans,
+        history=args.history,
+        seed=args.seed,
+        today=args.today,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        reset=args.reset,
+    )
+    print(f"generated {counts} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
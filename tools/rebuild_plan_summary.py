@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import argparse
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import get_settings
+from app.plan_summary import REBUILD_BATCH_SIZE, count_stale_summaries, rebuild_asset_plan_summaries
+
+
+def rebuild(database_url: str, *, dry_run: bool = False, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    """資産の予定の要約（次の予定日/次の予定ID/予定件数）を pc_plans から作り直し、食い違っていた件数を返す。"""
+    engine = create_engine(database_url)
+    session_factory = sessionmaker(bind=engine)
+    try:
+        with session_factory() as db:
+            if dry_run:
+                return count_stale_summaries(db)
+            return rebuild_asset_plan_summaries(db, batch_size=batch_size)
+    finally:
+        engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="資産の予定の要約を予定から作り直します（列の追加後や一括投入後に実行）。")
+    parser.add_argument("--database-url", default=get_settings().database_url)
+    parser.add_argument("--dry-run", action="store_true", help="食い違っている件数の表示だけ行い、更新しない")
+    parser.add_argument("--batch-size", type=int, default=REBUILD_BATCH_SIZE, help="1回のコミットで扱う資産IDの範囲")
+    args = parser.parse_args()
+
+    changed = rebuild(args.database_url, dry_run=args.dry_run, batch_size=args.batch_size)
+    action = "found" if args.dry_run else "rebuilt"
+    print(f"{action} {changed} stale asset plan summaries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import argparse
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import get_settings
+from app.scheduler import release_lease, run_due_jobs, worker_id
+
+
+def run(database_url: str, *, force: bool = False) -> list[tuple[str, str, int]]:
+    """定期処理を1回実行する（cron などアプリの外から動かす場合）。(処理名, 結果, 変更件数) を返す。"""
+    settings = get_settings()
+    engine = create_engine(database_url)
+    session_factory = sessionmaker(bind=engine)
+    worker = worker_id()
+    try:
+        with session_factory() as db:
+            try:
+                runs = run_due_jobs(
+                    db,
+                    worker=worker,
+                    interval_sec=settings.scheduler_interval_sec,
+                    lease_sec=settings.scheduler_lease_sec,
+                    force=force,
+                )
+                return [(run.job, run.status, run.changed_count) for run in runs]
+            finally:
+                # 1回きりの実行なので、リースの期限を待たずに他のワーカーへ実行権を返す
+                db.rollback()
+                release_lease(db, worker)
+    finally:
+        engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="期限超過の判定などの定期処理を1回実行します。")
+    parser.add_argument("--database-url", default=get_settings().database_url)
+    parser.add_argument("--force", action="store_true", help="実行間隔に関係なく全ての処理を実行する")
+    args = parser.parse_args()
+
+    results = run(args.database_url, force=args.force)
+    if not results:
+        print("nothing to run (not due, or another worker holds the lease)")
+    for job, status, changed in results:
+        print(f"{job} {status} changed={changed}")
+
+
+if __name__ == "__main__":
+    main()